@@ -0,0 +1,83 @@
+"""
+Benchmark: inference throughput (pages/sec) at different batch sizes
+
+Renders a synthetic multi-page PDF once, then runs
+DeepSeekOCRInference.infer_batch() over the pages at each batch size and
+reports pages per second. The model is loaded and warmed up on one page
+before timing starts.
+
+DeepSeekOCRInference decodes one image at a time (its remote code has no
+batched generate), so its throughput is expected to stay flat across batch
+sizes; the benchmark is for backends with a batched forward pass.
+
+Requires the DeepSeek-OCR model (GPU recommended). With --backend stub the
+same loop runs against the StubBackend and its simulated latency instead.
+
+Usage:
+    python benchmarks/bench_batch_throughput.py [--pages 16] [--batch-sizes 1 4 8]
+    python benchmarks/bench_batch_throughput.py --backend stub --latency-ms 50 --batch-overhead-ms 200
+"""
+
+import argparse
+import time
+
+import fitz  # PyMuPDF
+
+from deepseek_visor_agent.backends import StubBackend, create_backend
+from deepseek_visor_agent.utils.pdf_processor import pixmap_to_image
+
+
+def make_pages(num_pages: int, dpi: int):
+    """Render a synthetic invoice-like PDF to PIL images"""
+    doc = fitz.open()
+    for i in range(num_pages):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text(fitz.Point(50, 60), f"INVOICE INV-{i:04d}", fontsize=18)
+        for line in range(20):
+            page.insert_text(
+                fitz.Point(50, 100 + line * 18),
+                f"Item {line}: Widget x{line + 1} ${(line + 1) * 9.99:.2f}",
+                fontsize=10,
+            )
+        page.insert_text(fitz.Point(50, 500), "Total: $2,099.79", fontsize=12)
+
+    zoom = dpi / 72.0
+    matrix = fitz.Matrix(zoom, zoom)
+    return [pixmap_to_image(page.get_pixmap(matrix=matrix, alpha=False)) for page in doc]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--pages", type=int, default=16)
+    parser.add_argument("--dpi", type=int, default=144)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--mode", default="auto", help="Inference mode (default: auto)")
+    parser.add_argument("--device", default="auto")
+    parser.add_argument("--backend", default="deepseek", choices=["deepseek", "stub"])
+    parser.add_argument("--latency-ms", type=float, default=50.0,
+                        help="Stub backend: simulated inference time per page")
+    parser.add_argument("--batch-overhead-ms", type=float, default=200.0,
+                        help="Stub backend: simulated fixed cost per batch")
+    args = parser.parse_args()
+
+    pages = make_pages(args.pages, args.dpi)
+    if args.backend == "stub":
+        engine = StubBackend(latency_ms=args.latency_ms, batch_overhead_ms=args.batch_overhead_ms)
+    else:
+        engine = create_backend("deepseek", inference_mode=args.mode, device=args.device)
+
+    # Load weights and warm up kernels outside the timed region
+    engine.infer_batch(pages[:1], batch_size=1)
+
+    print(f"Pages: {args.pages}, mode: {engine.config['inference_mode']}, "
+          f"device: {engine.config['device']}")
+    print(f"{'batch':>6} {'seconds':>10} {'pages/sec':>10}")
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        engine.infer_batch(pages, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"{batch_size:>6} {elapsed:>10.2f} {args.pages / elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Benchmark: cold-start model loading with and without a weight snapshot
+
+Each variant loads the weights in a fresh Python process, the way a
+restarted worker would, and reports the load time and how much the
+process RSS grew by the end of the load:
+
+- checkpoint: build the model, read a bfloat16 checkpoint and cast it to
+  float32 (what from_pretrained() followed by .to(torch.float32) does on CPU)
+- snapshot:   build the model on the meta device and memory-map a float32
+  snapshot written by utils.snapshot (what DeepSeekOCRInference does with
+  snapshot_dir set)
+
+By default a synthetic transformer-sized stack of linear layers is used
+(--size-gb), so the benchmark runs on CPU without the DeepSeek-OCR model.
+With --model, the real DeepSeekOCRInference._load_model() is timed instead;
+the first snapshot run writes the snapshot, so use --runs 2 or more.
+
+Snapshot tensors are mapped, not read: their pages are faulted in on first
+use (from the page cache, if another worker already touched them).
+
+Usage:
+    python benchmarks/bench_cold_start.py [--size-gb 1.0] [--runs 3]
+    python benchmarks/bench_cold_start.py --model --snapshot-dir /var/cache/visor --device cpu
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Hidden size of the synthetic model's layers
+_HIDDEN = 2048
+
+
+def build_model(size_gb: float):
+    """Stack of square linear layers with about size_gb of float32 weights"""
+    import torch
+
+    layers = max(1, int(size_gb * 1e9 / (_HIDDEN * _HIDDEN * 4)))
+    return torch.nn.Sequential(*(torch.nn.Linear(_HIDDEN, _HIDDEN) for _ in range(layers)))
+
+
+def prepare(directory: str, size_gb: float):
+    """Write the synthetic bfloat16 checkpoint and its float32 snapshot"""
+    import torch
+    from safetensors.torch import save_file
+
+    from deepseek_visor_agent.utils.snapshot import save_snapshot
+
+    model = build_model(size_gb)
+    state = {k: v.to(torch.bfloat16).contiguous() for k, v in model.state_dict().items()}
+    save_file(state, os.path.join(directory, "checkpoint.safetensors"))
+    save_snapshot(model, os.path.join(directory, "snapshot.safetensors"))
+
+
+def load_synthetic(variant: str, directory: str, size_gb: float):
+    """Child process: load one synthetic variant"""
+    import torch
+
+    if variant == "checkpoint":
+        from safetensors.torch import load_file
+
+        model = build_model(size_gb)
+        model.load_state_dict(load_file(os.path.join(directory, "checkpoint.safetensors")))
+        model.to(torch.float32)
+    else:
+        from deepseek_visor_agent.utils.snapshot import load_snapshot
+
+        with torch.device("meta"):
+            model = build_model(size_gb)
+        load_snapshot(model, os.path.join(directory, "snapshot.safetensors"), "cpu")
+    return model
+
+
+def load_real(variant: str, directory: str, device: str):
+    """Child process: load DeepSeek-OCR with or without the snapshot"""
+    from deepseek_visor_agent.infer import DeepSeekOCRInference
+
+    engine = DeepSeekOCRInference(
+        device=device, snapshot_dir=directory if variant == "snapshot" else None
+    )
+    return engine._load_model()
+
+
+def child(args):
+    """Time one load in this (fresh) process and print the result as JSON"""
+    import psutil
+    import torch  # noqa: F401  (import time is not load time)
+
+    rss_before = psutil.Process().memory_info().rss
+    start = time.perf_counter()
+    if args.model:
+        model = load_real(args.child, args.snapshot_dir, args.device)
+    else:
+        model = load_synthetic(args.child, args.snapshot_dir, args.size_gb)
+    load_s = time.perf_counter() - start
+
+    print(json.dumps({
+        "load_s": load_s,
+        "rss_gb": (psutil.Process().memory_info().rss - rss_before) / 1e9,
+        "parameters": sum(p.numel() for p in model.parameters()),
+    }))
+
+
+def run_child(args, variant: str):
+    """Run one variant in a fresh interpreter"""
+    command = [sys.executable, __file__, "--child", variant, "--snapshot-dir", args.snapshot_dir,
+               "--size-gb", str(args.size_gb), "--device", args.device]
+    if args.model:
+        command.append("--model")
+    completed = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--size-gb", type=float, default=1.0,
+                        help="Float32 weight size of the synthetic model")
+    parser.add_argument("--runs", type=int, default=3, help="Loads per variant; the best is reported")
+    parser.add_argument("--model", action="store_true", help="Load the real DeepSeek-OCR model")
+    parser.add_argument("--device", default="cpu", help="Device for --model")
+    parser.add_argument("--snapshot-dir", default=None,
+                        help="Snapshot directory (default: a temporary directory)")
+    parser.add_argument("--child", choices=["checkpoint", "snapshot"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    with tempfile.TemporaryDirectory(prefix="visor_cold_start_") as scratch:
+        args.snapshot_dir = args.snapshot_dir or scratch
+        if not args.model:
+            prepare(args.snapshot_dir, args.size_gb)
+
+        print(f"{'variant':<12} {'load (s)':>9} {'+RSS (GB)':>9}")
+        best = {}
+        for variant in ("checkpoint", "snapshot"):
+            results = [run_child(args, variant) for _ in range(args.runs)]
+            best[variant] = min(results, key=lambda r: r["load_s"])
+            print(f"{variant:<12} {best[variant]['load_s']:>9.2f} {best[variant]['rss_gb']:>9.2f}")
+
+        speedup = best["checkpoint"]["load_s"] / max(best["snapshot"]["load_s"], 1e-9)
+        print(f"\nSnapshot cold start is {speedup:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
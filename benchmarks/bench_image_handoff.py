@@ -0,0 +1,86 @@
+"""
+Benchmark: per-page overhead of handing a rendered PDF page to the model
+
+Compares the previous path (pixmap -> PNG bytes -> Image.open, then PNG
+re-encode into a temporary file for model.infer()) against the in-memory path
+(Image.frombuffer over the raw pixmap samples, no file written).
+
+Model inference itself is excluded; this measures only the image handoff.
+
+Usage:
+    python benchmarks/bench_image_handoff.py [--pages 20] [--dpi 144]
+"""
+
+import argparse
+import io
+import os
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from deepseek_visor_agent.utils.pdf_processor import pixmap_to_image
+
+
+def make_pdf(num_pages: int) -> fitz.Document:
+    """Create an in-memory A4 PDF with some text on each page"""
+    doc = fitz.open()
+    for i in range(num_pages):
+        page = doc.new_page(width=595, height=842)
+        for line in range(40):
+            page.insert_text(
+                fitz.Point(50, 60 + line * 18),
+                f"Page {i + 1} line {line}: Invoice INV-{i:04d} Total: ${line * 13.37:.2f}",
+                fontsize=10,
+            )
+    return doc
+
+
+def png_round_trip(pixmap) -> None:
+    """Previous path: PNG encode/decode, then PNG re-encode to a temp file"""
+    img = Image.open(io.BytesIO(pixmap.tobytes("png")))
+    img.load()
+    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
+        img.save(tmp.name, "PNG")
+        path = tmp.name
+    os.unlink(path)
+
+
+def in_memory(pixmap) -> None:
+    """New path: wrap raw samples; the image is handed to the model from memory"""
+    img = pixmap_to_image(pixmap)
+    img.load()
+
+
+def run(doc: fitz.Document, dpi: int, handoff) -> float:
+    """Return mean milliseconds per page for the handoff step"""
+    zoom = dpi / 72.0
+    matrix = fitz.Matrix(zoom, zoom)
+    pixmaps = [page.get_pixmap(matrix=matrix, alpha=False) for page in doc]
+
+    start = time.perf_counter()
+    for pixmap in pixmaps:
+        handoff(pixmap)
+    return (time.perf_counter() - start) * 1000 / len(pixmaps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--dpi", type=int, default=144)
+    args = parser.parse_args()
+
+    doc = make_pdf(args.pages)
+
+    before = run(doc, args.dpi, png_round_trip)
+    after = run(doc, args.dpi, in_memory)
+
+    print(f"Pages: {args.pages} at {args.dpi} DPI")
+    print(f"PNG round trip + temp file: {before:8.2f} ms/page")
+    print(f"In-memory frombuffer:       {after:8.2f} ms/page")
+    print(f"Speedup:                    {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: import time of the package and its torch-free entry points
+
+Imports each target in a fresh interpreter with `python -X importtime` and
+reports the cumulative import time, the slowest modules it pulled in, and
+whether any heavy inference dependency (torch, transformers, psutil) was
+loaded. Parsers, the classifier and the PDF utilities must not load them;
+the script exits with status 1 if one does, or if a target takes longer
+than --max-ms, so it can guard the import path in CI.
+
+Usage:
+    python benchmarks/bench_import_time.py [--max-ms 500] [--top 5] [--repeat 3]
+"""
+
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Modules whose import should be reserved for actual inference
+HEAVY_MODULES = ("torch", "transformers", "psutil")
+
+TARGETS = [
+    "deepseek_visor_agent",
+    "deepseek_visor_agent.tool",
+    "deepseek_visor_agent.parsers.classifier",
+    "deepseek_visor_agent.parsers.invoice",
+    "deepseek_visor_agent.parsers.contract",
+    "deepseek_visor_agent.utils.pdf_processor",
+]
+
+
+def import_times(target: str) -> Dict[str, Tuple[int, int]]:
+    """(self, cumulative) microseconds per module imported by `import target`"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, check=True
+    )
+
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--max-ms", type=float, default=500,
+                        help="Fail if a target's best cumulative import time exceeds this")
+    parser.add_argument("--top", type=int, default=5,
+                        help="Slowest modules to list per target (by self time)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Fresh interpreters per target; the fastest run is reported")
+    args = parser.parse_args()
+
+    failures: List[str] = []
+    for target in TARGETS:
+        runs = [import_times(target) for _ in range(args.repeat)]
+        best = min(runs, key=lambda times: times[target][1])
+        total_ms = best[target][1] / 1000
+
+        heavy = sorted({name.split(".")[0] for name in best} & set(HEAVY_MODULES))
+        slowest = sorted(best.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+
+        print(f"{target:<45} {total_ms:>8.1f} ms  heavy: {', '.join(heavy) or 'none'}")
+        for name, (self_us, _) in slowest:
+            print(f"    {name:<41} {self_us / 1000:>8.1f} ms")
+
+        if heavy:
+            failures.append(f"{target} imports {', '.join(heavy)}")
+        if total_ms > args.max_ms:
+            failures.append(f"{target} takes {total_ms:.0f} ms (limit {args.max_ms:.0f} ms)")
+
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
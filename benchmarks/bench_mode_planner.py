@@ -0,0 +1,101 @@
+"""
+Benchmark: inference time saved by per-page (adaptive) mode selection
+
+Builds a mixed synthetic corpus (receipts, business cards, cover pages,
+letters, dense A4 and A3 scans), then runs it through the StubBackend once
+with a fixed inference mode and once with inference_mode="adaptive". The
+stub's per-mode latency is proportional to the number of vision tokens each
+mode produces (DeepSeek-OCR: tiny 64, small 100, base 256, large 400,
+gundam ~n x 100 + 256), so the totals show how much model time the planner
+saves, and the planning overhead per page is reported separately.
+
+Runs on CPU without the DeepSeek-OCR model.
+
+Usage:
+    python benchmarks/bench_mode_planner.py [--fixed-mode gundam] [--ms-per-token 0.05]
+"""
+
+import argparse
+import time
+
+from PIL import Image, ImageDraw
+
+from deepseek_visor_agent import ModePlanner, StubBackend
+from deepseek_visor_agent.mode_planner import MODE_ORDER
+
+# Vision tokens per page for each mode (gundam: about 6 crops)
+VISION_TOKENS = {"tiny": 64, "small": 100, "base": 256, "large": 400, "gundam": 856}
+
+# (name, size in pixels, text lines, line height, copies)
+CORPUS = [
+    ("receipt", (420, 1000), 25, 3, 6),
+    ("business card", (600, 350), 5, 8, 4),
+    ("cover page", (1191, 1684), 3, 10, 3),
+    ("letter (A4)", (1191, 1684), 30, 4, 6),
+    ("dense report (A4)", (1191, 1684), 90, 4, 6),
+    ("dense scan (A3)", (2339, 3308), 160, 14, 3),
+]
+
+
+def make_page(size, lines: int, line_height: int) -> Image.Image:
+    """White page with evenly spaced dark bars standing in for lines of text"""
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    margin = size[0] // 12
+    spacing = (size[1] - 2 * margin) / max(lines, 1)
+    for i in range(lines):
+        y = int(margin + i * spacing)
+        draw.rectangle([margin, y, size[0] - margin, y + line_height], fill=(60, 60, 60))
+    return image
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--fixed-mode", default="gundam", choices=MODE_ORDER,
+                        help="Mode every page uses without planning")
+    parser.add_argument("--ms-per-token", type=float, default=0.05,
+                        help="Simulated inference time per vision token")
+    parser.add_argument("--batch-size", type=int, default=4)
+    args = parser.parse_args()
+
+    pages = []
+    for name, size, lines, line_height, copies in CORPUS:
+        pages.extend([(name, make_page(size, lines, line_height))] * copies)
+    images = [image for _, image in pages]
+    latency = {mode: tokens * args.ms_per_token for mode, tokens in VISION_TOKENS.items()}
+
+    fixed = StubBackend(markdown="page", inference_mode=args.fixed_mode, latency_ms=latency)
+    adaptive = StubBackend(markdown="page", inference_mode="adaptive", latency_ms=latency)
+    adaptive.mode_planner = ModePlanner(max_mode=args.fixed_mode)
+
+    start = time.perf_counter()
+    fixed.infer_batch(images, batch_size=args.batch_size)
+    fixed_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = adaptive.infer_batch(images, batch_size=args.batch_size)
+    adaptive_s = time.perf_counter() - start
+
+    planner = ModePlanner(max_mode=args.fixed_mode)
+    start = time.perf_counter()
+    for image in images:
+        planner.plan(image)
+    planning_ms = (time.perf_counter() - start) * 1000 / len(images)
+
+    print(f"Corpus: {len(images)} pages")
+    print(f"{'document':<20} {'size':>11} {'mode':>8}")
+    seen = set()
+    for (name, image), result in zip(pages, results):
+        if name not in seen:
+            seen.add(name)
+            size = f"{image.size[0]}x{image.size[1]}"
+            print(f"{name:<20} {size:>11} {result['metadata']['inference_mode']:>8}")
+
+    print(f"\nPages per mode: {adaptive.mode_planner.stats()}")
+    print(f"Planning overhead: {planning_ms:.2f} ms/page")
+    print(f"Fixed {args.fixed_mode:<8} {fixed_s:>8.2f} s")
+    print(f"Adaptive       {adaptive_s:>8.2f} s  ({(1 - adaptive_s / fixed_s) * 100:.0f}% less)")
+
+
+if __name__ == "__main__":
+    main()
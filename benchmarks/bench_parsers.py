@@ -0,0 +1,108 @@
+"""
+Benchmark: field extraction over large combined documents
+
+Builds synthetic multi-page markdown (as produced by run() on a long PDF)
+and times InvoiceParser.parse() on document shapes that exercise the
+pattern priority rules: totals on the last page only, no matching fields
+at all, and the highest-priority field on the first page. Then times
+classify_document() on the same documents, with and without the
+prefix early exit, and finally page-by-page merging (DocumentAnalysis)
+against classifying and parsing the combined markdown.
+
+Usage:
+    python benchmarks/bench_parsers.py [--pages 500] [--repeat 5]
+"""
+
+import argparse
+import time
+
+from deepseek_visor_agent.parsers.classifier import classify_document
+from deepseek_visor_agent.parsers.contract import ContractParser
+from deepseek_visor_agent.parsers.incremental import DocumentAnalysis
+from deepseek_visor_agent.parsers.invoice import InvoiceParser
+from deepseek_visor_agent.tool import PAGE_SEPARATOR
+
+PAGE = (
+    "# Statement of Work\n\n"
+    "Services rendered under the master agreement between the parties.\n\n"
+    "| Item | Qty | Unit Price |\n|---|---|---|\n"
+    "| Consulting | 12 | 150.00 |\n| Travel | 1 | 420.00 |\n\n"
+    "Subtotal: 2,220.00\nService period 12 jan to 19 jan\n"
+)
+
+
+def make_documents(pages: int):
+    """Synthetic combined markdown for each benchmark scenario"""
+    body = PAGE_SEPARATOR.join([PAGE] * pages)
+    return {
+        "total on last page": body + "\nVendor: Acme Corp\nDate: 2024-01-15\nTotal: $2,640.00\n",
+        "no fields": body,
+        "grand total first": "Grand Total: $2,640.00\nDate: 2024-01-15\nVendor: Acme\n" + body,
+    }
+
+
+def best_time(func, repeat: int) -> float:
+    """Best wall time of repeat calls, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    invoice_parser = InvoiceParser()
+    documents = make_documents(args.pages)
+
+    print(f"Pages: {args.pages}, best of {args.repeat}")
+    print(f"{'scenario':<20} {'size KB':>8} {'ms/parse':>10} {'MB/s':>8}")
+    for name, markdown in documents.items():
+        best = best_time(lambda: invoice_parser.parse(markdown), args.repeat)
+        size_kb = len(markdown) / 1024
+        print(f"{name:<20} {size_kb:>8.0f} {best * 1000:>10.2f} {size_kb / 1024 / best:>8.1f}")
+
+    print()
+    print(f"{'scenario':<20} {'label':>8} {'ms/classify':>12} {'ms (no prefix)':>15}")
+    for name, markdown in documents.items():
+        label = classify_document(markdown)
+        best = best_time(lambda: classify_document(markdown), args.repeat)
+        full = best_time(lambda: classify_document(markdown, prefix_chars=0), args.repeat)
+        print(f"{name:<20} {label:>8} {best * 1000:>12.2f} {full * 1000:>15.2f}")
+
+    parsers = {"invoice": InvoiceParser(), "contract": ContractParser()}
+    pages = [PAGE] * (args.pages - 1) + ["Vendor: Acme Corp\nDate: 2024-01-15\nTotal: $2,640.00\n"]
+
+    def combined(num_pages: int):
+        markdown = PAGE_SEPARATOR.join(pages[:num_pages])
+        document_type = classify_document(markdown, prefix_chars=0)
+        if document_type in parsers:
+            parsers[document_type].parse(markdown)
+
+    def combined_after_every_page():
+        # What a streaming caller needs for up-to-date fields without incremental merging
+        for num_pages in range(1, len(pages) + 1):
+            combined(num_pages)
+
+    def incremental():
+        analysis = DocumentAnalysis(parsers)
+        for page_num, page in enumerate(pages):
+            analysis.add(page_num, page)
+        return analysis.fields
+
+    print()
+    print(f"{'merged fields, ' + str(args.pages) + ' pages':<28} {'ms':>8}")
+    print(f"{'combined, once at the end':<28} "
+          f"{best_time(lambda: combined(len(pages)), args.repeat) * 1000:>8.2f}")
+    print(f"{'combined, after every page':<28} "
+          f"{best_time(combined_after_every_page, 1) * 1000:>8.2f}")
+    print(f"{'page by page (incremental)':<28} {best_time(incremental, args.repeat) * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: end-to-end document pipeline without the model
+
+Writes a synthetic multi-page invoice PDF and runs VisionDocumentTool.run()
+on it with the StubBackend, so PDF rendering, classification, parsing and
+result merging are measured in isolation. Model latency can be simulated
+with --latency-ms / --batch-overhead-ms.
+
+Runs on CPU without the DeepSeek-OCR model.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--pages 32] [--runs 3] [--profile]
+"""
+
+import argparse
+import cProfile
+import os
+import pstats
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+from deepseek_visor_agent import StubBackend, VisionDocumentTool
+
+
+def make_pdf(path: str, num_pages: int):
+    """Write a synthetic invoice-like PDF"""
+    doc = fitz.open()
+    for i in range(num_pages):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text(fitz.Point(50, 60), f"INVOICE INV-{i:04d}", fontsize=18)
+        for line in range(30):
+            page.insert_text(
+                fitz.Point(50, 100 + line * 18),
+                f"Item {line}: Widget x{line + 1} ${(line + 1) * 9.99:.2f}",
+                fontsize=10,
+            )
+    doc.save(path)
+    doc.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--pages", type=int, default=32)
+    parser.add_argument("--dpi", type=int, default=144)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="Simulated inference time per page")
+    parser.add_argument("--batch-overhead-ms", type=float, default=0.0,
+                        help="Simulated fixed cost per inference call")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print the top functions by cumulative time")
+    args = parser.parse_args()
+
+    backend = StubBackend(latency_ms=args.latency_ms, batch_overhead_ms=args.batch_overhead_ms)
+    tool = VisionDocumentTool(backend=backend)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = os.path.join(tmp_dir, "bench.pdf")
+        make_pdf(pdf_path, args.pages)
+
+        def run():
+            return tool.run(pdf_path, pdf_dpi=args.dpi, pdf_batch_size=args.batch_size)
+
+        # Warm up imports and caches outside the timed region
+        run()
+
+        print(f"Pages: {args.pages}, dpi: {args.dpi}, batch: {args.batch_size}, "
+              f"simulated latency: {args.latency_ms}ms/page")
+        print(f"{'run':>4} {'seconds':>10} {'pages/sec':>10} {'ms/page':>10}")
+        for i in range(args.runs):
+            start = time.perf_counter()
+            result = run()
+            elapsed = time.perf_counter() - start
+            print(f"{i + 1:>4} {elapsed:>10.3f} {args.pages / elapsed:>10.2f} "
+                  f"{elapsed * 1000 / args.pages:>10.2f}")
+
+        # Stages overlap, so their busy times can add up to more than the wall time
+        print("Stage busy time (last run): " + ", ".join(
+            f"{stage} {ms:.0f}ms" for stage, ms in result["metadata"]["stage_timings_ms"].items()
+        ) + f"; wall {result['metadata']['wall_time_ms']}ms")
+
+        if args.profile:
+            profiler = cProfile.Profile()
+            profiler.runcall(run)
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+
+
+if __name__ == "__main__":
+    main()
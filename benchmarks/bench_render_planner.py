@@ -0,0 +1,75 @@
+"""
+Benchmark: PDF rasterization at a fixed DPI vs. the resolution each mode uses
+
+Writes a synthetic multi-page A4 PDF and renders it with iter_pdf_pages()
+once at the fixed --dpi and once per inference mode with a RenderPlanner,
+reporting render time, pixels and bitmap memory per page. The model consumes
+the same input either way; the difference is rasterization work that the
+model would have thrown away when resizing to the mode's input size.
+
+Usage:
+    python benchmarks/bench_render_planner.py [--pages 24] [--dpi 144]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+from deepseek_visor_agent.mode_planner import MODE_ORDER
+from deepseek_visor_agent.render_planner import RenderPlanner
+from deepseek_visor_agent.utils.pdf_processor import iter_pdf_pages
+
+
+def make_pdf(path: str, num_pages: int):
+    """Write a synthetic text-heavy A4 PDF"""
+    doc = fitz.open()
+    for i in range(num_pages):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text(fitz.Point(50, 60), f"CONTRACT SECTION {i + 1}", fontsize=18)
+        for line in range(40):
+            page.insert_text(
+                fitz.Point(50, 100 + line * 17),
+                f"Clause {i}.{line}: The parties agree to the terms set out herein.",
+                fontsize=10,
+            )
+    doc.save(path)
+    doc.close()
+
+
+def run(pdf_path: str, pages: int, dpi: int, planner=None):
+    """(ms per page, megapixels per page, MB per page) of rendering every page"""
+    pixels = 0
+    start = time.perf_counter()
+    for _, image in iter_pdf_pages(pdf_path, dpi=dpi, render_planner=planner):
+        pixels += image.size[0] * image.size[1]
+    elapsed = time.perf_counter() - start
+    return elapsed * 1000 / pages, pixels / pages / 1e6, pixels * 3 / pages / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--pages", type=int, default=24)
+    parser.add_argument("--dpi", type=int, default=144, help="Fixed resolution to compare against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = os.path.join(tmp_dir, "bench.pdf")
+        make_pdf(pdf_path, args.pages)
+
+        print(f"{'render':<14} {'DPI':>6} {'ms/page':>8} {'MP/page':>8} {'MB/page':>8} {'speedup':>8}")
+        fixed_ms, megapixels, megabytes = run(pdf_path, args.pages, args.dpi)
+        print(f"{'fixed':<14} {args.dpi:>6} {fixed_ms:>8.1f} {megapixels:>8.2f} {megabytes:>8.2f} "
+              f"{1.0:>7.1f}x")
+
+        for mode in MODE_ORDER:
+            planner = RenderPlanner(mode)
+            ms, megapixels, megabytes = run(pdf_path, args.pages, args.dpi, planner)
+            print(f"{'planned ' + mode:<14} {planner.dpi(595, 842):>6.0f} {ms:>8.1f} "
+                  f"{megapixels:>8.2f} {megabytes:>8.2f} {fixed_ms / ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: CPU throughput of WorkerPool at 1..N worker processes
+
+Renders a synthetic multi-page PDF once, then runs the pages through a
+WorkerPool with each worker count and reports pages per second and the
+speedup over a single worker. Each pool is started (model loaded, workers
+forked and warmed up) before timing starts.
+
+By default the pool wraps a StubBackend with simulated latency, which shows
+the pool's own overhead (forking, shipping pages to workers, collecting
+results) without the model. With --model the real DeepSeekOCRInference runs
+on CPU; its model is loaded once and shared by every pool.
+
+Usage:
+    python benchmarks/bench_worker_pool.py [--pages 32] [--workers 1 2 4 8] [--latency-ms 100]
+    python benchmarks/bench_worker_pool.py --model --pages 16 --workers 1 4 --threads-per-worker 8
+"""
+
+import argparse
+import os
+import time
+
+import fitz  # PyMuPDF
+
+from deepseek_visor_agent.backends import StubBackend
+from deepseek_visor_agent.utils.pdf_processor import pixmap_to_image
+from deepseek_visor_agent.worker_pool import WorkerPool
+
+
+def make_pages(num_pages: int, dpi: int):
+    """Render a synthetic invoice-like PDF to PIL images"""
+    doc = fitz.open()
+    for i in range(num_pages):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text(fitz.Point(50, 60), f"INVOICE INV-{i:04d}", fontsize=18)
+        for line in range(20):
+            page.insert_text(
+                fitz.Point(50, 100 + line * 18),
+                f"Item {line}: Widget x{line + 1} ${(line + 1) * 9.99:.2f}",
+                fontsize=10,
+            )
+
+    zoom = dpi / 72.0
+    matrix = fitz.Matrix(zoom, zoom)
+    return [pixmap_to_image(page.get_pixmap(matrix=matrix, alpha=False)) for page in doc]
+
+
+def make_engine(args):
+    """The backend shared by every pool"""
+    if args.model:
+        from deepseek_visor_agent.infer import DeepSeekOCRInference
+
+        return DeepSeekOCRInference(device="cpu")
+    return StubBackend(latency_ms=args.latency_ms)
+
+
+def run(engine, pages, workers: int, args) -> float:
+    """Pages per second through a warm pool of workers processes"""
+    with WorkerPool(engine, workers=workers, threads_per_worker=args.threads_per_worker) as pool:
+        pool.warmup()
+        start = time.perf_counter()
+        results = pool.infer_batch(pages, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+
+    assert len(results) == len(pages)
+    return len(pages) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--pages", type=int, default=32)
+    parser.add_argument("--dpi", type=int, default=144)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, max(1, (os.cpu_count() or 1) // 4)}))
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="Cores per worker (default: the available cores divided evenly)")
+    parser.add_argument("--batch-size", type=int, default=1, help="infer_batch() size within a worker")
+    parser.add_argument("--latency-ms", type=float, default=100.0,
+                        help="Simulated per-page latency of the stub backend")
+    parser.add_argument("--model", action="store_true", help="Run the real DeepSeek-OCR model on CPU")
+    args = parser.parse_args()
+
+    pages = make_pages(args.pages, args.dpi)
+    engine = make_engine(args)
+
+    print(f"{'workers':>7} {'pages/s':>9} {'speedup':>8}")
+    baseline = None
+    for workers in args.workers:
+        throughput = run(engine, pages, workers, args)
+        baseline = baseline or throughput
+        print(f"{workers:>7} {throughput:>9.2f} {throughput / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
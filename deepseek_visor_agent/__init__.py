@@ -12,7 +12,47 @@ __version__ = "0.1.0"
 __author__ = "Jack Chen"
 __license__ = "Apache-2.0"
 
-from .tool import VisionDocumentTool
-from .device_manager import DeviceManager
+from typing import TYPE_CHECKING
 
-__all__ = ["VisionDocumentTool", "DeviceManager"]
+# Public names and the submodules defining them. They are imported on first
+# access, so `import deepseek_visor_agent.parsers` (or the PDF utilities) does
+# not pay for the tool, the scheduler or the inference stack.
+_EXPORTS = {
+    "VisionDocumentTool": ".tool",
+    "DeviceManager": ".device_manager",
+    "ModePlanner": ".mode_planner",
+    "RenderPlanner": ".render_planner",
+    "PageFilter": ".page_filter",
+    "ModelRegistry": ".registry",
+    "WorkerPool": ".worker_pool",
+    "InferenceBackend": ".backends",
+    "StubBackend": ".backends",
+}
+
+if TYPE_CHECKING:
+    from .tool import VisionDocumentTool
+    from .device_manager import DeviceManager
+    from .mode_planner import ModePlanner
+    from .render_planner import RenderPlanner
+    from .page_filter import PageFilter
+    from .registry import ModelRegistry
+    from .worker_pool import WorkerPool
+    from .backends import InferenceBackend, StubBackend
+
+__all__ = ["VisionDocumentTool", "DeviceManager", "ModePlanner", "RenderPlanner", "PageFilter",
+           "ModelRegistry", "WorkerPool", "InferenceBackend", "StubBackend"]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from importlib import import_module
+
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,427 @@
+"""
+Inference Backends - Interface between the document pipeline and a model
+
+Everything in VisionDocumentTool (PDF rendering, classification, parsing,
+result merging, async scheduling) talks to an InferenceBackend. The default
+backend is DeepSeekOCRInference; StubBackend is a fast, deterministic
+CPU-only stand-in that returns synthetic markdown with configurable latency,
+so the rest of the pipeline can be tested, benchmarked and load-tested
+without downloading or running the model.
+"""
+
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .mode_planner import MODE_ORDER, ModePlanner
+from .scheduler import InferenceScheduler
+from .utils.cache import hash_image
+
+logger = logging.getLogger(__name__)
+
+# Default prompt: OCR the whole page to markdown with layout grounding
+DEFAULT_PROMPT = "<image>\n<|grounding|>Convert the document to markdown."
+
+# Size of the synthetic warm-up page (A4 at 144 DPI, so gundam mode crops it)
+_WARMUP_PAGE_SIZE = (1191, 1684)
+
+
+def warmup_page() -> "Image.Image":
+    """Synthetic A4 page with a few bars of "text", used to warm up inference"""
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGB", _WARMUP_PAGE_SIZE, "white")
+    draw = ImageDraw.Draw(image)
+    for y in range(150, 1500, 60):
+        draw.rectangle([100, y, 1091, y + 12], fill=(40, 40, 40))
+    return image
+
+
+class InferenceBackend(ABC):
+    """
+    Abstract base class for inference backends.
+
+    Subclasses implement infer() and set self.config with at least "device"
+    and "inference_mode". infer_batch(), ainfer() and the async scheduler are
+    provided on top of infer() and can be overridden.
+
+    With a mode_planner set, each image runs in the mode the planner picks for
+    it, never above config["inference_mode"] (see _plan_mode()).
+    """
+
+    def __init__(self, max_batch_size: int = 8):
+        """
+        Args:
+            max_batch_size: Maximum number of concurrent ainfer() requests
+                coalesced into one batch
+        """
+        self.config: Dict[str, Any] = {}
+        self.max_batch_size = max_batch_size
+
+        # Serializes model loading and model calls across threads
+        self._lock = threading.RLock()
+
+        # Created on first ainfer() call
+        self._scheduler: Optional[InferenceScheduler] = None
+
+        # Chooses the inference mode per image when set ("adaptive" mode)
+        self.mode_planner: Optional[ModePlanner] = None
+
+    @abstractmethod
+    def infer(
+        self,
+        image_path: Union[str, Path, "Image.Image"],
+        prompt: str = DEFAULT_PROMPT,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Run OCR inference on one image.
+
+        Returns:
+            dict: {"markdown": str, "raw_output": str, "metadata": dict}, where
+                metadata includes "inference_mode", "device" and "inference_time_ms"
+        """
+        pass
+
+    def infer_batch(
+        self,
+        images: Sequence[Union[str, Path, "Image.Image"]],
+        prompt: str = DEFAULT_PROMPT,
+        batch_size: int = 4,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """
+        Run OCR inference on several images, returning results in input order.
+
+        The default implementation calls infer() once per image.
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+        return [self.infer(image, prompt, **kwargs) for image in images]
+
+    def batch_fits(self, images: Sequence[Union[str, Path, "Image.Image"]]) -> bool:
+        """
+        Whether one batched call over images is predicted to fit in memory.
+
+        The scheduler asks this before growing a batch. The default has no
+        memory model and admits everything.
+        """
+        return True
+
+    def _plan_mode(self, image: Union[str, Path, "Image.Image"]) -> str:
+        """Inference mode for one image: planned if adaptive, else the configured mode"""
+        mode = self.config.get("inference_mode", "tiny")
+        if self.mode_planner is None:
+            return mode
+        return self.mode_planner.plan(image, max_mode=mode)
+
+    def _group_by_mode(self, modes: Sequence[str]) -> List[Tuple[str, List[int]]]:
+        """Indices of images sharing each mode, in order of first appearance"""
+        groups: Dict[str, List[int]] = {}
+        for i, mode in enumerate(modes):
+            groups.setdefault(mode, []).append(i)
+        return list(groups.items())
+
+    def warmup(self, modes: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Load the model and run one dummy page per inference mode.
+
+        The first call in each mode pays for one-time work (weight loading,
+        kernel selection and compilation, allocator growth). Calling warmup()
+        before serving moves that cost out of the first real requests. A mode
+        that fails to warm up is reported, not raised; a failed load raises.
+
+        Args:
+            modes: Modes to warm up (default: warmup_modes())
+
+        Returns:
+            dict: {
+                "load_time_ms": int,
+                "modes": {mode: {"warmup_time_ms": int} or {"error": str}},
+                "total_time_ms": int
+            }
+        """
+        start_time = time.perf_counter()
+        self._load()
+        load_time_ms = int((time.perf_counter() - start_time) * 1000)
+        logger.info(f"Model loaded in {load_time_ms}ms")
+
+        image = warmup_page()
+        report: Dict[str, Dict[str, Any]] = {}
+        for mode in modes or self.warmup_modes():
+            mode_start = time.perf_counter()
+            try:
+                self._warmup_mode(image, mode)
+            except Exception as e:
+                logger.warning(f"Warm-up in {mode} mode failed: {e}")
+                report[mode] = {"error": str(e)}
+                continue
+            report[mode] = {"warmup_time_ms": int((time.perf_counter() - mode_start) * 1000)}
+            logger.info(f"Warmed up {mode} mode in {report[mode]['warmup_time_ms']}ms")
+
+        return {
+            "load_time_ms": load_time_ms,
+            "modes": report,
+            "total_time_ms": int((time.perf_counter() - start_time) * 1000),
+        }
+
+    def warmup_modes(self) -> List[str]:
+        """Modes this backend can run: the configured mode, or every mode up to it if adaptive"""
+        mode = self.config.get("inference_mode", "tiny")
+        if self.mode_planner is None or mode not in MODE_ORDER:
+            return [mode]
+        return MODE_ORDER[:MODE_ORDER.index(mode) + 1]
+
+    def _load(self):
+        """Load weights and other one-time state; backends loading lazily override this"""
+        pass
+
+    def _warmup_mode(self, image: "Image.Image", mode: str):
+        """Run one uncached inference in the given mode (default: infer() in the configured mode)"""
+        self.infer(image)
+
+    def start_scheduler(
+        self,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: float = 0,
+        max_queue_size: int = 0
+    ) -> InferenceScheduler:
+        """
+        (Re)start the inference worker used by ainfer() with explicit batching settings.
+
+        Args:
+            max_batch_size: Maximum requests per batch (default: backend's max_batch_size)
+            max_wait_ms: Time to hold a partial batch open for more requests
+            max_queue_size: Maximum waiting requests before QueueFullError (0 = unbounded)
+
+        Returns:
+            The new InferenceScheduler
+        """
+        scheduler = InferenceScheduler(
+            self,
+            max_batch_size=max_batch_size or self.max_batch_size,
+            max_wait_ms=max_wait_ms,
+            max_queue_size=max_queue_size
+        )
+        with self._lock:
+            previous, self._scheduler = self._scheduler, scheduler
+        if previous is not None:
+            previous.close()
+        return scheduler
+
+    def _get_scheduler(self) -> InferenceScheduler:
+        """Inference worker shared by all ainfer() callers of this backend"""
+        with self._lock:
+            if self._scheduler is None:
+                self._scheduler = InferenceScheduler(self, max_batch_size=self.max_batch_size)
+            return self._scheduler
+
+    async def ainfer(
+        self,
+        image_path: Union[str, Path, "Image.Image"],
+        prompt: str = DEFAULT_PROMPT,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Asynchronous infer() that does not block the event loop.
+
+        Requests are handed to a dedicated inference worker thread. Requests that
+        arrive while the worker is busy are coalesced into one infer_batch() call,
+        so many coroutines can await OCR concurrently against a single model copy.
+
+        Args:
+            image_path: Path to the image file, or a PIL Image object
+            prompt: Prompt template for the model
+            **kwargs: Additional arguments passed to the model
+
+        Returns:
+            dict: Same structure as infer()
+        """
+        return await self._get_scheduler().ainfer(image_path, prompt, **kwargs)
+
+    def close(self):
+        """Stop the async inference worker, if one was started"""
+        with self._lock:
+            scheduler, self._scheduler = self._scheduler, None
+        if scheduler is not None:
+            scheduler.close()
+
+
+class StubBackend(InferenceBackend):
+    """
+    Deterministic CPU backend that returns synthetic markdown.
+
+    The same image always produces the same markdown. Latency is simulated
+    with sleep: batch_overhead_ms once per batched call plus latency_ms per image,
+    which lets benchmarks model the benefit of batching. latency_ms can be given
+    per inference mode to model the cost of adaptive mode selection.
+
+    Example:
+        >>> tool = VisionDocumentTool(backend=StubBackend(latency_ms=50))
+        >>> tool.run("contract.pdf")
+    """
+
+    def __init__(
+        self,
+        markdown: Optional[Union[str, Callable[[Any], str]]] = None,
+        latency_ms: Union[float, Dict[str, float]] = 0.0,
+        batch_overhead_ms: float = 0.0,
+        inference_mode: str = "tiny",
+        max_batch_size: int = 8
+    ):
+        """
+        Initialize the stub backend.
+
+        Args:
+            markdown: Canned markdown returned for every image, or a callable
+                mapping the image argument to markdown. None generates a
+                synthetic invoice derived from the image content.
+            latency_ms: Simulated inference time per image, or a dict of it per
+                inference mode (modes missing from the dict cost nothing)
+            batch_overhead_ms: Simulated fixed cost per infer()/infer_batch() call
+            inference_mode: Mode reported in metadata, or "adaptive" to plan the
+                mode of each image with a ModePlanner
+            max_batch_size: Maximum number of concurrent ainfer() requests per batch
+        """
+        super().__init__(max_batch_size=max_batch_size)
+        if inference_mode == "adaptive":
+            self.mode_planner = ModePlanner()
+            inference_mode = MODE_ORDER[-1]
+        self.config = {
+            "device": "cpu",
+            "inference_mode": inference_mode,
+            "use_flash_attn": False,
+            "max_memory_gb": 0,
+        }
+        self.markdown = markdown
+        self.latency_ms = latency_ms
+        self.batch_overhead_ms = batch_overhead_ms
+        self.calls = 0
+        self.images_processed = 0
+
+    def _render_markdown(self, image: Union[str, Path, "Image.Image"]) -> str:
+        """Markdown for one image: canned, callable or synthetic"""
+        if callable(self.markdown):
+            return self.markdown(image)
+        if self.markdown is not None:
+            return self.markdown
+
+        digest = hash_image(image)
+        seed = int(digest[:8], 16)
+        return (
+            f"# Invoice INV-{digest[:6].upper()}\n\n"
+            f"Vendor: Stub Supplies {seed % 97}\n"
+            f"Date: 2024-{seed % 12 + 1:02d}-{seed % 28 + 1:02d}\n\n"
+            f"| Item | Qty | Price |\n|---|---|---|\n"
+            f"| Widget | {seed % 9 + 1} | ${seed % 500 + 10}.00 |\n\n"
+            f"Total: ${seed % 5000 + 100}.{seed % 100:02d}\n"
+        )
+
+    def _latency_for(self, mode: str) -> float:
+        """Simulated per-image inference time in one mode"""
+        if isinstance(self.latency_ms, dict):
+            return self.latency_ms.get(mode, 0.0)
+        return self.latency_ms
+
+    def _run(self, images: List[Union[str, Path, "Image.Image"]], mode: str) -> List[Dict[str, Any]]:
+        """Produce results for one call in one mode, sleeping for the simulated latency"""
+        start_time = time.time()
+
+        outputs = [self._render_markdown(image) for image in images]
+        elapsed_ms = (time.time() - start_time) * 1000
+        target_ms = self.batch_overhead_ms + self._latency_for(mode) * len(images)
+        if target_ms > elapsed_ms:
+            time.sleep((target_ms - elapsed_ms) / 1000)
+
+        with self._lock:
+            self.calls += 1
+            self.images_processed += len(images)
+
+        inference_time = int((time.time() - start_time) * 1000)
+        return [
+            {
+                "markdown": output,
+                "raw_output": output,
+                "metadata": {
+                    "model": "stub",
+                    "inference_mode": mode,
+                    "device": self.config["device"],
+                    "inference_time_ms": inference_time // len(images),
+                    "batch_size": len(images),
+                },
+            }
+            for output in outputs
+        ]
+
+    def _warmup_mode(self, image: "Image.Image", mode: str):
+        """Simulate one call in the given mode"""
+        self._run([image], mode)
+
+    def infer(
+        self,
+        image_path: Union[str, Path, "Image.Image"],
+        prompt: str = DEFAULT_PROMPT,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Return synthetic markdown for one image"""
+        return self._run([image_path], self._plan_mode(image_path))[0]
+
+    def infer_batch(
+        self,
+        images: Sequence[Union[str, Path, "Image.Image"]],
+        prompt: str = DEFAULT_PROMPT,
+        batch_size: int = 4,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """
+        Return synthetic markdown for each image, batch_size images per simulated
+        call. Images planned for different modes never share a call.
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+
+        images = list(images)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(images)
+        for mode, indices in self._group_by_mode([self._plan_mode(image) for image in images]):
+            for start in range(0, len(indices), batch_size):
+                chunk = indices[start:start + batch_size]
+                for i, result in zip(chunk, self._run([images[i] for i in chunk], mode)):
+                    results[i] = result
+        return results
+
+
+def create_backend(
+    backend: Union[str, InferenceBackend, None],
+    inference_mode: str = "auto",
+    device: str = "auto",
+    **kwargs
+) -> InferenceBackend:
+    """
+    Resolve a backend argument to an InferenceBackend instance.
+
+    Args:
+        backend: "deepseek" (default) | "stub" | an InferenceBackend instance
+        inference_mode: Inference mode for the DeepSeek backend
+        device: Device for the DeepSeek backend
+        **kwargs: Extra arguments for the DeepSeek backend (e.g. cache);
+            ignored by other backends
+
+    Returns:
+        InferenceBackend
+    """
+    if isinstance(backend, InferenceBackend):
+        return backend
+
+    if backend in (None, "deepseek"):
+        from .infer import DeepSeekOCRInference
+        return DeepSeekOCRInference(inference_mode, device, **kwargs)
+
+    if backend == "stub":
+        return StubBackend(
+            inference_mode=inference_mode if inference_mode != "auto" else "tiny"
+        )
+
+    raise ValueError(f"Unknown backend '{backend}'. Use 'deepseek', 'stub' or an InferenceBackend")
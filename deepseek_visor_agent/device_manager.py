@@ -7,13 +7,26 @@ the appropriate inference mode (Tiny/Small/Base/Large/Gundam) for DeepSeek-OCR.
 IMPORTANT: DeepSeek-OCR is a SINGLE model with multiple inference modes,
 not multiple model variants. The modes control resolution and cropping strategies.
 
+MemoryBudget measures the peak memory each inference actually needed, per
+mode and image size, so callers can check whether more work fits before
+starting it instead of finding out through an OOM.
+
+torch and psutil are imported on first use, so importing this module (and
+the package) stays cheap for code that never runs inference.
+
 Based on: https://huggingface.co/deepseek-ai/DeepSeek-OCR
 """
 
-import torch
-import psutil
 import logging
-from typing import Dict, Any
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
 logger = logging.getLogger(__name__)
 
@@ -58,9 +71,163 @@ INFERENCE_MODES = {
 }
 
 
+class MemoryBudget:
+    """
+    Peak memory bookkeeping for one device.
+
+    Each measured inference records its peak memory above what was in use
+    when it started: torch.cuda.max_memory_allocated() on CUDA, the process
+    RSS (peak RSS where the OS reports it) elsewhere. Peaks are kept per
+    image, as the largest seen for each (mode, size bucket), and predict
+    whether a batch fits the current headroom.
+
+    Example:
+        >>> budget = DeviceManager.memory_budget("cuda")
+        >>> with budget.measure("base", bucket=3, batch_size=2):
+        ...     run_inference()
+        >>> budget.fits("base", bucket=3, count=4)
+        True
+    """
+
+    def __init__(self, device: str, limit_gb: Optional[float] = None, margin: float = 0.2):
+        """
+        Initialize the budget.
+
+        Args:
+            device: "cuda" | "mps" | "cpu"
+            limit_gb: Memory the process may use in total; headroom never exceeds
+                what is left of it (None: only the device's free memory counts)
+            margin: Safety factor added to predicted peaks (0.2 = 20%)
+        """
+        self.device = device
+        self.limit_gb = limit_gb
+        self.margin = margin
+
+        self._peaks: Dict[Tuple[str, int], float] = {}
+        self._lock = threading.Lock()
+        self._baseline_rss = _process_rss()
+
+    def _use_cuda(self) -> bool:
+        if self.device != "cuda":
+            return False
+        import torch
+        return torch.cuda.is_available()
+
+    def _in_use(self) -> float:
+        """Bytes currently held by this process on the device"""
+        if self._use_cuda():
+            import torch
+            return float(torch.cuda.memory_allocated())
+        return _process_rss()
+
+    def headroom_bytes(self) -> float:
+        """Bytes a new inference can still allocate"""
+        if self._use_cuda():
+            import torch
+            free_bytes, _ = torch.cuda.mem_get_info()
+            # Blocks cached by PyTorch's allocator are reusable as well
+            headroom = free_bytes + torch.cuda.memory_reserved() - torch.cuda.memory_allocated()
+            used = torch.cuda.memory_allocated()
+        else:
+            import psutil
+            headroom = psutil.virtual_memory().available
+            used = _process_rss() - self._baseline_rss
+
+        if self.limit_gb:
+            headroom = min(headroom, self.limit_gb * 1e9 - used)
+        return float(max(0, headroom))
+
+    @contextmanager
+    def measure(self, mode: str, bucket: int, batch_size: int = 1) -> Iterator[None]:
+        """
+        Record the peak memory of the enclosed inference.
+
+        Args:
+            mode: Inference mode of the call
+            bucket: Size bucket of the largest image in the call
+            batch_size: Images in the call; the peak is recorded per image
+        """
+        use_cuda = self._use_cuda()
+        start = self._in_use()
+        if use_cuda:
+            import torch
+            torch.cuda.reset_peak_memory_stats()
+        peak_rss = _peak_rss()
+
+        yield
+
+        if use_cuda:
+            peak = torch.cuda.max_memory_allocated()
+        else:
+            # Peak RSS only tells us something if this call raised it
+            new_peak_rss = _peak_rss()
+            peak = new_peak_rss if new_peak_rss and new_peak_rss > (peak_rss or 0) else self._in_use()
+
+        self.record(mode, bucket, max(0.0, peak - start), batch_size)
+
+    def record(self, mode: str, bucket: int, peak_bytes: float, batch_size: int = 1):
+        """Record one call's peak memory above its starting point"""
+        per_image = peak_bytes / max(batch_size, 1)
+        with self._lock:
+            if per_image > self._peaks.get((mode, bucket), 0.0):
+                self._peaks[(mode, bucket)] = per_image
+        logger.debug(f"Peak memory {mode}/{bucket}: {per_image / 1e6:.0f}MB per image")
+
+    def predict(self, mode: str, bucket: int, count: int = 1) -> Optional[float]:
+        """
+        Predicted peak bytes for count images of a mode and size bucket.
+
+        Unmeasured buckets borrow the nearest larger measured bucket of the
+        same mode. Returns None if nothing comparable was measured yet.
+        """
+        with self._lock:
+            candidates = [(b, peak) for (m, b), peak in self._peaks.items() if m == mode and b >= bucket]
+        if not candidates:
+            return None
+        _, per_image = min(candidates)
+        return per_image * count * (1 + self.margin)
+
+    def fits(self, mode: str, bucket: int, count: int = 1) -> bool:
+        """Whether count images are predicted to fit the current headroom (unknown fits)"""
+        predicted = self.predict(mode, bucket, count)
+        return predicted is None or predicted <= self.headroom_bytes()
+
+    def max_batch_size(self, mode: str, bucket: int, limit: int) -> int:
+        """Largest batch of at most limit images predicted to fit (at least 1)"""
+        predicted = self.predict(mode, bucket)
+        if not predicted:
+            return limit
+        return max(1, min(limit, int(self.headroom_bytes() // predicted)))
+
+    def stats(self) -> Dict[str, Any]:
+        """Measured per-image peaks in MB and the current headroom in GB"""
+        with self._lock:
+            peaks = {f"{mode}/{bucket}": round(peak / 1e6, 1) for (mode, bucket), peak in self._peaks.items()}
+        return {"peak_mb_per_image": peaks, "headroom_gb": round(self.headroom_bytes() / 1e9, 2)}
+
+
+def _process_rss() -> float:
+    """Current RSS of this process in bytes"""
+    import psutil
+    return float(psutil.Process().memory_info().rss)
+
+
+def _peak_rss() -> Optional[float]:
+    """Lifetime peak RSS of this process in bytes, where the OS reports it"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return float(peak if sys.platform == "darwin" else peak * 1024)
+
+
 class DeviceManager:
     """Automatic device detection and optimal inference mode selection"""
 
+    # One MemoryBudget per device, shared by every engine in the process
+    _budgets: Dict[str, MemoryBudget] = {}
+    _budgets_lock = threading.Lock()
+
     @staticmethod
     def detect_optimal_config() -> Dict[str, Any]:
         """
@@ -80,6 +247,9 @@ class DeviceManager:
             "max_memory_gb": 0
         }
 
+        import psutil
+        import torch
+
         # 1. Check for CUDA
         if torch.cuda.is_available():
             config["device"] = "cuda"
@@ -158,9 +328,54 @@ class DeviceManager:
 
         return INFERENCE_MODES[mode]
 
+    @staticmethod
+    def available_memory_gb(device: str) -> float:
+        """
+        Memory currently usable for inference on a device, in GB.
+
+        On CUDA this is the free device memory plus what this process already
+        holds in PyTorch's caching allocator (the loaded model included), so it
+        compares directly with the modes' "min_vram_gb". On MPS and CPU it is
+        the available system memory.
+
+        Args:
+            device: "cuda" | "mps" | "cpu"
+
+        Returns:
+            float: Memory in GB
+        """
+        if device == "cuda":
+            import torch
+            if torch.cuda.is_available():
+                free_bytes, _ = torch.cuda.mem_get_info()
+                return (free_bytes + torch.cuda.memory_reserved()) / 1e9
+
+        import psutil
+        return psutil.virtual_memory().available / 1e9
+
+    @staticmethod
+    def memory_budget(device: str, limit_gb: Optional[float] = None) -> MemoryBudget:
+        """
+        Shared MemoryBudget for a device, created on first use.
+
+        Args:
+            device: "cuda" | "mps" | "cpu"
+            limit_gb: Total memory limit for the budget, applied when it is created
+                (e.g. the detected config's "max_memory_gb")
+
+        Returns:
+            MemoryBudget
+        """
+        with DeviceManager._budgets_lock:
+            if device not in DeviceManager._budgets:
+                DeviceManager._budgets[device] = MemoryBudget(device, limit_gb=limit_gb)
+            return DeviceManager._budgets[device]
+
     @staticmethod
     def get_device_info() -> str:
         """Get human-readable device information"""
+        import torch
+
         if torch.cuda.is_available():
             gpu_name = torch.cuda.get_device_name(0)
             gpu_memory = torch.cuda.get_device_properties(0).total_memory / 1e9
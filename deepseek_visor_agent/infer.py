@@ -7,36 +7,127 @@ This class loads the model once and adjusts inference parameters based on the se
 Based on: https://huggingface.co/deepseek-ai/DeepSeek-OCR
 """
 
-from typing import Dict, Union, Any
+from typing import Dict, Union, Any, Iterator, List, Optional, Sequence
+from contextlib import contextmanager
 from pathlib import Path
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+import threading
 import time
 import logging
-import torch
+import weakref
 
 from .device_manager import DeviceManager, INFERENCE_MODES
-from .utils.error_handler import auto_fallback_decorator, ModelLoadError
+from .mode_planner import ModePlanner
+from .registry import ModelKey, ModelRegistry
+from .utils.error_handler import FallbackController, ModelLoadError, is_oom_error, size_bucket
+from .utils.cache import OCRCache, hash_image
+from .utils.snapshot import load_snapshot, save_snapshot, snapshot_path
+from .backends import DEFAULT_PROMPT, InferenceBackend
 
 logger = logging.getLogger(__name__)
 
 # Fixed model ID - DeepSeek-OCR has only one model
 MODEL_ID = "deepseek-ai/DeepSeek-OCR"
 
+# image_file prefix for images served from memory instead of the filesystem
+MEMORY_IMAGE_PREFIX = "memory://"
 
-class DeepSeekOCRInference:
+
+class _MemoryImageLoader:
+    """
+    Serve in-memory PIL images to DeepSeek-OCR's remote-code image loader.
+
+    model.infer() only accepts an image path, which it stringifies and passes to
+    the module-level load_image() of the model's remote code. Wrapping that
+    function lets "memory://<n>" keys resolve to registered PIL images, so pages
+    rendered in memory reach the model's preprocessing without any PNG encoding
+    or temporary files. Other paths are delegated to the original loader.
+    """
+
+    def __init__(self):
+        self._images: Dict[str, Any] = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def install(self, model) -> bool:
+        """Patch the model's remote-code loader; returns False if it cannot be patched"""
+        module = sys.modules.get(type(model).__module__)
+        if module is None or not callable(getattr(module, "load_image", None)):
+            return False
+
+        with self._lock:
+            if not getattr(module.load_image, "_serves_memory_images", False):
+                original = module.load_image
+
+                def load_image(image_path):
+                    if isinstance(image_path, str) and image_path.startswith(MEMORY_IMAGE_PREFIX):
+                        return self._images[image_path]
+                    return original(image_path)
+
+                load_image._serves_memory_images = True
+                module.load_image = load_image
+                logger.debug(f"Installed in-memory image loader for {module.__name__}")
+
+        return True
+
+    @contextmanager
+    def register(self, image) -> Iterator[str]:
+        """Register an image for the duration of one inference and yield its key"""
+        key = f"{MEMORY_IMAGE_PREFIX}{next(self._counter)}"
+        self._images[key] = image
+        try:
+            yield key
+        finally:
+            self._images.pop(key, None)
+
+
+_memory_images = _MemoryImageLoader()
+
+
+class DeepSeekOCRInference(InferenceBackend):
     """DeepSeek-OCR inference engine with automatic device and mode management"""
 
-    def __init__(self, inference_mode: str = "auto", device: str = "auto"):
+    def __init__(
+        self,
+        inference_mode: str = "auto",
+        device: str = "auto",
+        cache: Optional[OCRCache] = None,
+        max_batch_size: int = 8,
+        snapshot_dir: Optional[Union[str, Path]] = None,
+        registry: Optional[ModelRegistry] = None
+    ):
         """
         Initialize the inference engine.
 
         Args:
-            inference_mode: "auto" | "tiny" | "small" | "base" | "large" | "gundam"
+            inference_mode: "auto" | "adaptive" | "tiny" | "small" | "base" | "large" | "gundam"
+                - adaptive: choose the mode per image with a ModePlanner, up to the
+                  auto-detected mode and within the device's available memory
             device: "auto" | "cuda" | "mps" | "cpu"
+            cache: Optional OCRCache consulted before running the model
+            max_batch_size: Maximum number of concurrent ainfer() requests
+                coalesced into one batch
+            snapshot_dir: Directory for a device-ready weight snapshot (see
+                utils.snapshot). The first load writes it; later loads (and other
+                worker processes) memory-map it instead of re-reading and re-casting
+                the checkpoint. None always loads the checkpoint.
+            registry: ModelRegistry sharing loaded models between engines
+                (default: the process-wide ModelRegistry.default())
         """
+        super().__init__(max_batch_size=max_batch_size)
         self.config = DeviceManager.detect_optimal_config()
 
         # Override auto-detected settings if specified
-        if inference_mode != "auto":
+        if inference_mode == "adaptive":
+            # The detected mode stays the upper bound; pages are planned below it
+            self.mode_planner = ModePlanner(
+                memory_budget_gb=lambda: DeviceManager.available_memory_gb(self.config["device"])
+            )
+        elif inference_mode != "auto":
             if inference_mode in INFERENCE_MODES:
                 self.config["inference_mode"] = inference_mode
             else:
@@ -50,8 +141,26 @@ class DeepSeekOCRInference:
 
         logger.info(f"Initializing with config: {self.config}")
 
+        # Peak memory per (mode, image size), shared by all engines on the device
+        self.memory_budget = DeviceManager.memory_budget(
+            self.config["device"], limit_gb=self.config.get("max_memory_gb") or None
+        )
+
+        # Remembers OOMs per (mode, image size) and steps back up when memory frees up
+        self.fallback = FallbackController(
+            memory_gb=lambda: DeviceManager.available_memory_gb(self.config["device"])
+        )
+
         self.model = None
         self.tokenizer = None
+        self.cache = cache
+        self.snapshot_dir = snapshot_dir
+        self.registry = registry or ModelRegistry.default()
+        self._handle_finalizer: Optional[weakref.finalize] = None
+        # Held around model calls; replaced by the registry's lock for the
+        # model, which every engine sharing it holds as well
+        self._model_lock = threading.Lock()
+        self._output_dir = None
 
         # Lazy loading - model will be loaded on first inference call
         self._initialized = False
@@ -59,8 +168,14 @@ class DeepSeekOCRInference:
     def _load_model(self):
         """Load the DeepSeek-OCR model (single model for all modes)"""
         try:
+            import torch
             from transformers import AutoModel  # Use AutoModel not AutoModelForCausalLM
 
+            if self.snapshot_dir is not None:
+                model = self._load_from_snapshot()
+                if model is not None:
+                    return model
+
             logger.info(f"Loading DeepSeek-OCR model from {MODEL_ID}")
             logger.info("First-time download may take several minutes (~14GB)")
 
@@ -76,21 +191,88 @@ class DeepSeekOCRInference:
             model = AutoModel.from_pretrained(MODEL_ID, **load_kwargs)
 
             # Move to device and set dtype
+            dtype = getattr(torch, self._weight_dtype())
             if self.config["device"] == "cuda":
-                model = model.cuda().to(torch.bfloat16)
+                model = model.cuda().to(dtype)
             elif self.config["device"] == "mps":
-                model = model.to("mps").to(torch.float32)  # MPS doesn't support bfloat16
+                model = model.to("mps").to(dtype)
             else:
-                model = model.to(torch.float32)
+                model = model.to(dtype)
 
             model = model.eval()
             logger.info("Model loaded successfully")
 
+            if self.snapshot_dir is not None:
+                self._save_to_snapshot(model)
+
             return model
 
         except Exception as e:
             raise ModelLoadError(f"Failed to load model from {MODEL_ID}: {e}")
 
+    def _weight_dtype(self) -> str:
+        """Name of the torch dtype the weights use on the configured device"""
+        # MPS doesn't support bfloat16
+        return "bfloat16" if self.config["device"] == "cuda" else "float32"
+
+    def _snapshot_file(self) -> Path:
+        """Snapshot file for the configured device and dtype"""
+        return snapshot_path(
+            self.snapshot_dir, MODEL_ID, self.config["device"], self._weight_dtype()
+        )
+
+    def _snapshot_metadata(self) -> Dict[str, str]:
+        """Metadata a snapshot must carry to be used for this engine"""
+        return {
+            "model_id": MODEL_ID,
+            "device": self.config["device"],
+            "dtype": self._weight_dtype(),
+        }
+
+    def _load_from_snapshot(self):
+        """
+        Build the model on the meta device and attach the snapshot's weights.
+
+        Returns None (after logging why) if there is no usable snapshot, so the
+        caller falls back to a regular load, which rewrites the snapshot.
+        """
+        path = self._snapshot_file()
+        if not path.exists():
+            logger.info(f"No weight snapshot at {path} yet; it is written after this load")
+            return None
+
+        try:
+            import torch
+            from transformers import AutoConfig, AutoModel
+
+            start_time = time.time()
+            model_kwargs = {"trust_remote_code": True}
+            if self.config["use_flash_attn"]:
+                model_kwargs["attn_implementation"] = "flash_attention_2"
+
+            # Only the architecture is built here; no weight memory is allocated
+            config = AutoConfig.from_pretrained(MODEL_ID, trust_remote_code=True)
+            with torch.device("meta"):
+                model = AutoModel.from_config(config, **model_kwargs)
+
+            load_snapshot(model, path, self.config["device"], metadata=self._snapshot_metadata())
+            logger.info(f"Model loaded from snapshot in {int((time.time() - start_time) * 1000)}ms")
+            return model.eval()
+
+        except Exception as e:
+            logger.warning(f"Not using weight snapshot {path}: {e}")
+            return None
+
+    def _save_to_snapshot(self, model):
+        """Write the loaded, device-ready weights for the next start; failures only warn"""
+        path = self._snapshot_file()
+        try:
+            start_time = time.time()
+            save_snapshot(model, path, metadata=self._snapshot_metadata())
+            logger.info(f"Weight snapshot written in {int((time.time() - start_time) * 1000)}ms")
+        except Exception as e:
+            logger.warning(f"Could not write weight snapshot {path}: {e}")
+
     def _load_tokenizer(self):
         """Load the tokenizer"""
         try:
@@ -102,28 +284,206 @@ class DeepSeekOCRInference:
         except Exception as e:
             raise ModelLoadError(f"Failed to load tokenizer from {MODEL_ID}: {e}")
 
+    def _model_key(self) -> ModelKey:
+        """Registry key of the model this engine needs"""
+        return ModelKey(
+            model_id=MODEL_ID,
+            device=self.config["device"],
+            dtype=self._weight_dtype(),
+            attn_implementation="flash_attention_2" if self.config["use_flash_attn"] else "default",
+        )
+
     def _ensure_initialized(self):
-        """Ensure model and tokenizer are loaded"""
-        if not self._initialized:
-            self.model = self._load_model()
-            self.tokenizer = self._load_tokenizer()
-            self._initialized = True
-
-    def _get_mode_params(self) -> Dict[str, Any]:
-        """Get inference parameters for current mode"""
-        mode = self.config["inference_mode"]
-        return DeviceManager.get_mode_params(mode)
-
-    @auto_fallback_decorator
+        """Ensure model and tokenizer are loaded, sharing them through the registry"""
+        with self._lock:
+            if not self._initialized:
+                handle = self.registry.acquire(
+                    self._model_key(), lambda: (self._load_model(), self._load_tokenizer())
+                )
+                self.model, self.tokenizer = handle.model, handle.tokenizer
+                self._model_lock = handle.lock
+                # Give the reference back if the engine is dropped without unload()
+                self._handle_finalizer = weakref.finalize(self, handle.release)
+                self._initialized = True
+
+    def unload(self):
+        """
+        Release this engine's reference to the shared model.
+
+        The model is unloaded once no other engine uses it (see ModelRegistry);
+        the next inference loads or shares it again.
+        """
+        with self._lock:
+            if self._handle_finalizer is not None:
+                self._handle_finalizer()
+            self._handle_finalizer = None
+            self.model = self.tokenizer = None
+            self._initialized = False
+
+    def _load(self):
+        """Load model and tokenizer now instead of on the first inference"""
+        self._ensure_initialized()
+
+    def _warmup_mode(self, image: "Image.Image", mode: str):
+        """
+        Run the dummy page in one mode, bypassing the cache and the fallback.
+
+        An OOM is still recorded with the FallbackController, so real pages of
+        that size start in a mode that fits.
+        """
+        bucket = size_bucket(image)
+        try:
+            self._infer_single(image, DEFAULT_PROMPT, None, mode, bucket)
+        except Exception as e:
+            if is_oom_error(e):
+                self.fallback.record_oom(mode, bucket)
+            raise
+
+    def _get_output_dir(self) -> str:
+        """Scratch directory passed to model.infer(), created once per engine"""
+        if self._output_dir is None:
+            self._output_dir = tempfile.mkdtemp(prefix="deepseek_visor_")
+            weakref.finalize(self, shutil.rmtree, self._output_dir, ignore_errors=True)
+        return self._output_dir
+
+    @contextmanager
+    def _image_source(self, image: Union[str, Path, "Image.Image"]) -> Iterator[str]:
+        """
+        Resolve an image argument to the image_file string model.infer() expects.
+
+        PIL images are handed to the model's loader straight from memory when
+        its remote code exposes a patchable load_image(); otherwise they are
+        written to an uncompressed temporary file as a fallback.
+        """
+        from PIL import Image
+
+        if not isinstance(image, Image.Image):
+            # Convert Path to string for compatibility
+            yield str(image)
+            return
+
+        if _memory_images.install(self.model):
+            with _memory_images.register(image) as key:
+                yield key
+            return
+
+        with tempfile.NamedTemporaryFile(suffix=".bmp", delete=False) as tmp:
+            image.convert("RGB").save(tmp, "BMP")
+            temp_image_file = tmp.name
+        logger.debug(f"Saved PIL Image to temporary file: {temp_image_file}")
+
+        try:
+            yield temp_image_file
+        finally:
+            try:
+                os.unlink(temp_image_file)
+            except OSError as e:
+                logger.warning(f"Failed to delete temporary file {temp_image_file}: {e}")
+
+    def _get_mode_params(self, mode: Optional[str] = None) -> Dict[str, Any]:
+        """Get inference parameters for a mode (default: current mode)"""
+        return DeviceManager.get_mode_params(mode or self.config["inference_mode"])
+
+    def _run_model(
+        self,
+        image: Union[str, Path, "Image.Image"],
+        prompt: str,
+        mode_params: Dict[str, Any],
+        **kwargs
+    ) -> str:
+        """Run a single model.infer() call with mode-specific parameters"""
+        # Based on official API: model.infer(tokenizer, prompt, image_file, base_size, image_size, crop_mode, ...)
+        with self._image_source(image) as image_file:
+            return self.model.infer(
+                self.tokenizer,
+                prompt=prompt,
+                image_file=image_file,
+                base_size=mode_params["base_size"],
+                image_size=mode_params["image_size"],
+                crop_mode=mode_params["crop_mode"],
+                output_path=self._get_output_dir(),  # Scratch directory required by model.infer()
+                save_results=False,  # Don't save to disk by default
+                test_compress=False,  # Don't test compression
+                **kwargs
+            )
+
+    def _build_result(self, output: str, inference_time: int, mode: str) -> Dict[str, Any]:
+        """Wrap raw model output in the standard result structure"""
+        return {
+            "markdown": output,
+            "raw_output": output,
+            "metadata": {
+                "model": "DeepSeek-OCR",
+                "inference_mode": mode,
+                "device": self.config["device"],
+                "inference_time_ms": inference_time
+            }
+        }
+
+    def _hash_for_cache(self, image: Union[str, Path, "Image.Image"]) -> Optional[str]:
+        """Content hash of an image, or None when caching is disabled"""
+        if self.cache is None:
+            return None
+        return hash_image(image)
+
+    def _cache_key(self, image_hash: str, prompt: str, kwargs: Dict[str, Any], mode: str) -> str:
+        """Cache key for an image under an inference mode"""
+        return OCRCache.make_key(image_hash, prompt, self._get_mode_params(mode), MODEL_ID, kwargs)
+
+    def _cache_get(
+        self,
+        image_hash: Optional[str],
+        prompt: str,
+        kwargs: Dict[str, Any],
+        mode: str
+    ) -> Optional[Dict[str, Any]]:
+        """Return a cached result for the mode, marked as a cache hit"""
+        if image_hash is None:
+            return None
+
+        start_time = time.time()
+        result = self.cache.get(self._cache_key(image_hash, prompt, kwargs, mode))
+        if result is None:
+            return None
+
+        result["metadata"]["cache_hit"] = True
+        result["metadata"]["inference_time_ms"] = int((time.time() - start_time) * 1000)
+        logger.info("Returning cached OCR result")
+        return result
+
+    def _cache_put(
+        self,
+        image_hash: Optional[str],
+        prompt: str,
+        kwargs: Dict[str, Any],
+        result: Dict[str, Any]
+    ):
+        """Store a fresh result under the mode it was produced with"""
+        if image_hash is not None:
+            mode = result["metadata"]["inference_mode"]
+            self.cache.put(self._cache_key(image_hash, prompt, kwargs, mode), result)
+
+    def _log_mode(self, mode: str, mode_params: Dict[str, Any]):
+        """Log the mode parameters about to be used"""
+        logger.info(
+            f"Running inference in {mode} mode "
+            f"(base_size={mode_params['base_size']}, "
+            f"image_size={mode_params['image_size']}, "
+            f"crop_mode={mode_params['crop_mode']})"
+        )
+
     def infer(
         self,
         image_path: Union[str, Path, "Image.Image"],
-        prompt: str = "<image>\n<|grounding|>Convert the document to markdown.",
+        prompt: str = DEFAULT_PROMPT,
         **kwargs
     ) -> Dict[str, Any]:
         """
         Run OCR inference on an image.
 
+        The image starts in the highest mode predicted to fit it (see
+        FallbackController) and falls back to lower modes if it runs out of memory.
+
         Args:
             image_path: Path to the image file, or a PIL Image object
             prompt: Prompt template for the model
@@ -141,76 +501,158 @@ class DeepSeekOCRInference:
                 }
             }
         """
-        from PIL import Image
+        bucket = size_bucket(image_path)
+        mode = self.fallback.select_mode(self._plan_mode(image_path), bucket)
+        image_hash = self._hash_for_cache(image_path)
+        cached = self._cache_get(image_hash, prompt, kwargs, mode)
+        if cached is not None:
+            return cached
+
+        return self.fallback.run(
+            mode,
+            bucket,
+            lambda mode: self._infer_single(image_path, prompt, image_hash, mode, bucket, **kwargs)
+        )
 
-        self._ensure_initialized()
+    def _infer_single(
+        self,
+        image_path: Union[str, Path, "Image.Image"],
+        prompt: str,
+        image_hash: Optional[str],
+        mode: str,
+        bucket: int,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Run infer() for one image in one mode"""
+        with self._lock:
+            self._ensure_initialized()
 
-        start_time = time.time()
+            start_time = time.time()
 
-        # Get inference parameters for current mode
-        mode_params = self._get_mode_params()
+            # Get inference parameters for the image's mode
+            mode_params = self._get_mode_params(mode)
+            self._log_mode(mode, mode_params)
 
-        # Run inference with mode-specific parameters
-        # Based on official API: model.infer(tokenizer, prompt, image_file, base_size, image_size, crop_mode, ...)
-        logger.info(
-            f"Running inference in {self.config['inference_mode']} mode "
-            f"(base_size={mode_params['base_size']}, "
-            f"image_size={mode_params['image_size']}, "
-            f"crop_mode={mode_params['crop_mode']})"
-        )
+            # Other engines sharing the model must not run it, or reset the
+            # device's peak memory stats, while this image is measured
+            with self._model_lock, self.memory_budget.measure(mode, bucket):
+                output = self._run_model(image_path, prompt, mode_params, **kwargs)
 
-        # Handle PIL Image objects by saving to temporary file
-        # DeepSeek-OCR model.infer() only accepts file paths
-        import tempfile
-        temp_image_file = None
-
-        if isinstance(image_path, Image.Image):
-            # Save PIL Image to temporary file
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-                image_path.save(tmp.name, 'PNG')
-                temp_image_file = tmp.name
-                image_path_str = temp_image_file
-                logger.debug(f"Saved PIL Image to temporary file: {temp_image_file}")
-        else:
-            # Convert Path to string for compatibility
-            image_path_str = str(image_path)
+        inference_time = int((time.time() - start_time) * 1000)
 
-        try:
-            # Create a temporary output directory if needed
-            with tempfile.TemporaryDirectory() as temp_dir:
-                output = self.model.infer(
-                    self.tokenizer,
-                    prompt=prompt,
-                    image_file=image_path_str,
-                    base_size=mode_params["base_size"],
-                    image_size=mode_params["image_size"],
-                    crop_mode=mode_params["crop_mode"],
-                    output_path=temp_dir,  # Temporary directory for any output files
-                    save_results=False,  # Don't save to disk by default
-                    test_compress=False,  # Don't test compression
+        logger.info(f"Inference completed in {inference_time}ms")
+
+        result = self._build_result(output, inference_time, mode)
+        self._cache_put(image_hash, prompt, kwargs, result)
+        return result
+
+    def infer_batch(
+        self,
+        images: Sequence[Union[str, Path, "Image.Image"]],
+        prompt: str = DEFAULT_PROMPT,
+        batch_size: int = 4,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """
+        Run OCR inference on several images, in batches of up to batch_size images.
+
+        All images in a batch start in one inference mode: the current mode, or
+        in adaptive mode the planned mode, lowered to what past OOMs predict will
+        fit; each mode's images are batched separately. Batches are shrunk below
+        batch_size when the measured peak memory of their mode and image size
+        (see MemoryBudget) predicts that a full batch would not fit.
+
+        The model decodes one image at a time, so batching does not raise
+        throughput: a batch only shares the engine lock and mode selection. An
+        image that runs out of memory is retried in a lower mode on its own;
+        the other images of its batch keep their mode.
+
+        Args:
+            images: Image paths and/or PIL Image objects
+            prompt: Prompt template for the model
+            batch_size: Maximum number of images per batched call
+            **kwargs: Additional arguments passed to model.infer()
+
+        Returns:
+            list: One result per image, in input order, each shaped like infer()'s
+                result (metadata["inference_mode"] is the mode the image finally ran
+                in); metadata["batch_size"] records the batch the image ran in.
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+
+        images = list(images)
+        buckets = [size_bucket(image) for image in images]
+        modes = [
+            self.fallback.select_mode(self._plan_mode(image), bucket)
+            for image, bucket in zip(images, buckets)
+        ]
+        image_hashes = [self._hash_for_cache(image) for image in images]
+        results: List[Optional[Dict[str, Any]]] = [
+            self._cache_get(image_hash, prompt, kwargs, mode)
+            for image_hash, mode in zip(image_hashes, modes)
+        ]
+
+        # Only images without a cached result go to the model, one mode at a time
+        pending = [i for i, result in enumerate(results) if result is None]
+        for mode, group in self._group_by_mode([modes[i] for i in pending]):
+            group = [pending[j] for j in group]
+            chunk_size = self.memory_budget.max_batch_size(
+                mode, max(buckets[i] for i in group), batch_size
+            )
+            for start in range(0, len(group), chunk_size):
+                indices = group[start:start + chunk_size]
+                chunk_results = self._infer_chunk(
+                    [images[i] for i in indices],
+                    prompt,
+                    [image_hashes[i] for i in indices],
+                    [buckets[i] for i in indices],
+                    mode,
                     **kwargs
                 )
-        finally:
-            # Clean up temporary image file if created
-            if temp_image_file:
-                import os
-                try:
-                    os.unlink(temp_image_file)
-                    logger.debug(f"Cleaned up temporary file: {temp_image_file}")
-                except Exception as e:
-                    logger.warning(f"Failed to delete temporary file {temp_image_file}: {e}")
+                for i, result in zip(indices, chunk_results):
+                    results[i] = result
 
-        inference_time = int((time.time() - start_time) * 1000)
+        return results
 
-        logger.info(f"Inference completed in {inference_time}ms")
+    def batch_fits(self, images: Sequence[Union[str, Path, "Image.Image"]]) -> bool:
+        """
+        Whether images are predicted to fit in memory as one batch.
 
-        return {
-            "markdown": output,
-            "raw_output": output,
-            "metadata": {
-                "model": "DeepSeek-OCR",
-                "inference_mode": self.config["inference_mode"],
-                "device": self.config["device"],
-                "inference_time_ms": inference_time
-            }
-        }
+        Uses the measured peak of the configured mode (the upper bound in
+        adaptive mode) at the largest image's size. Unmeasured sizes fit.
+        """
+        bucket = max((size_bucket(image) for image in images), default=0)
+        return self.memory_budget.fits(self.config["inference_mode"], bucket, len(images))
+
+    def _infer_chunk(
+        self,
+        images: List[Union[str, Path, "Image.Image"]],
+        prompt: str,
+        image_hashes: List[Optional[str]],
+        buckets: List[int],
+        mode: str,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """
+        Run one chunk of infer_batch() starting in one mode.
+
+        The DeepSeek-OCR remote code only exposes a single-image model.infer(),
+        so the images are decoded one after another under a single hold of the
+        engine lock. Each image has its own fallback scope: one that runs out
+        of memory is retried in a lower mode on its own, and the images decoded
+        before it are kept (and cached) as they are.
+        """
+        results = []
+        with self._lock:
+            for image, image_hash, bucket in zip(images, image_hashes, buckets):
+                results.append(self.fallback.run(
+                    mode,
+                    bucket,
+                    lambda mode: self._infer_single(image, prompt, image_hash, mode, bucket, **kwargs)
+                ))
+
+        logger.info(f"Batch of {len(images)} completed")
+        for result in results:
+            result["metadata"]["batch_size"] = len(images)
+        return results
@@ -0,0 +1,191 @@
+"""
+Mode Planner - Choose an inference mode per page
+
+DeviceManager picks one inference mode for the hardware at startup. Pages
+differ far more than that: a phone photo of a receipt has a few hundred
+pixels of sparse text, while a dense A3 scan needs cropping to stay legible.
+ModePlanner looks at each image before inference and picks the cheapest mode
+that still resolves its text:
+
+- pixel dimensions: a mode never needs to be larger than the image itself
+- text density: the share of dark ink on a small downscaled copy, so sparse
+  pages (large type, few lines) can be downscaled harder and dense pages
+  keep full resolution, with cropping (gundam) beyond 1280px
+- memory: modes whose memory requirement exceeds the current budget are
+  never chosen
+
+The planner only lowers the mode: the engine's configured mode is the upper
+bound, and the engine's OOM fallback can still lower the planned mode.
+"""
+
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from PIL import Image, ImageStat
+
+from .device_manager import INFERENCE_MODES
+
+logger = logging.getLogger(__name__)
+
+# Modes from cheapest to most expensive
+MODE_ORDER = ["tiny", "small", "base", "large", "gundam"]
+
+# Longest side of the downscaled copy used to estimate ink
+_INK_SAMPLE_SIZE = 128
+
+# Below this ink ratio a page is sparse, at or above it dense
+_SPARSE_INK = 0.02
+_DENSE_INK = 0.10
+
+# Share of the image's long side a mode must resolve, by text density
+_SPARSE_SCALE = 0.5
+_NORMAL_SCALE = 0.75
+_DENSE_SCALE = 1.0
+
+
+def downsample_gray(image: Image.Image, sample_size: int) -> Image.Image:
+    """
+    Grayscale copy of an image box-reduced to about sample_size pixels on its
+    long side. Reducing before the color conversion keeps this cheap for
+    full-resolution page renders.
+    """
+    if image.mode not in ("L", "RGB"):
+        image = image.convert("RGB")
+
+    factor = max(1, max(image.size) // sample_size)
+    small = image.reduce(factor) if factor > 1 else image
+    return small if small.mode == "L" else small.convert("L")
+
+
+def ink_ratio(image: Image.Image, sample_size: int = _INK_SAMPLE_SIZE) -> float:
+    """
+    Estimate the share of an image covered by ink (dark pixels).
+
+    The image is box-downscaled to about sample_size pixels on its long side
+    and the mean darkness of the result is returned, so thin strokes still
+    count in proportion to their area.
+
+    Args:
+        image: PIL image in any mode
+        sample_size: Long side of the downscaled copy
+
+    Returns:
+        float: 0.0 for a white page, 1.0 for a black one
+    """
+    return 1.0 - ImageStat.Stat(downsample_gray(image, sample_size)).mean[0] / 255.0
+
+
+class ModePlanner:
+    """
+    Pick an inference mode for each image from its size, ink density and the
+    memory budget.
+
+    Example:
+        >>> planner = ModePlanner()
+        >>> planner.plan(Image.open("receipt.jpg"))
+        'tiny'
+        >>> planner.plan(Image.open("dense_a3_scan.png"))
+        'gundam'
+        >>> planner.stats()
+        {'tiny': 1, 'small': 0, 'base': 0, 'large': 0, 'gundam': 1}
+    """
+
+    def __init__(
+        self,
+        max_mode: str = "gundam",
+        memory_budget_gb: Union[float, Callable[[], float], None] = None,
+        sparse_ink: float = _SPARSE_INK,
+        dense_ink: float = _DENSE_INK
+    ):
+        """
+        Initialize the planner.
+
+        Args:
+            max_mode: Most expensive mode the planner may choose
+            memory_budget_gb: Memory available for inference, in GB, or a callable
+                returning it at planning time; modes with a higher "min_vram_gb"
+                are skipped. None disables the check.
+            sparse_ink: Ink ratio below which a page counts as sparse
+            dense_ink: Ink ratio from which a page counts as dense
+        """
+        if max_mode not in MODE_ORDER:
+            raise ValueError(f"Unknown inference mode '{max_mode}'. Use one of {MODE_ORDER}")
+
+        self.max_mode = max_mode
+        self.memory_budget_gb = memory_budget_gb
+        self.sparse_ink = sparse_ink
+        self.dense_ink = dense_ink
+
+        self._counts = {mode: 0 for mode in MODE_ORDER}
+        self._lock = threading.Lock()
+
+    def plan(
+        self,
+        image: Union[str, Path, Image.Image],
+        max_mode: Optional[str] = None
+    ) -> str:
+        """
+        Choose the inference mode for one image.
+
+        Args:
+            image: PIL image or path to an image file
+            max_mode: Additional upper bound for this call, e.g. the engine's
+                configured mode
+
+        Returns:
+            str: "tiny" | "small" | "base" | "large" | "gundam"
+        """
+        if isinstance(image, Image.Image):
+            mode = self._plan_image(image)
+        else:
+            with Image.open(image) as opened:
+                size = opened.size
+                # JPEG decodes at reduced scale: only a thumbnail is needed for ink
+                opened.draft("L", (_INK_SAMPLE_SIZE, _INK_SAMPLE_SIZE))
+                mode = self._plan_image(opened, size=size)
+
+        mode = self._cap(mode, max_mode)
+        with self._lock:
+            self._counts[mode] += 1
+
+        logger.debug(f"Planned {mode} mode")
+        return mode
+
+    def stats(self) -> Dict[str, int]:
+        """Number of images planned for each mode so far"""
+        with self._lock:
+            return dict(self._counts)
+
+    def _plan_image(self, image: Image.Image, size: Optional[Tuple[int, int]] = None) -> str:
+        """Cheapest mode resolving the image's text, before any caps"""
+        long_side = max(size or image.size)
+        ink = ink_ratio(image)
+
+        if ink < self.sparse_ink:
+            needed = long_side * _SPARSE_SCALE
+        elif ink < self.dense_ink:
+            needed = long_side * _NORMAL_SCALE
+        else:
+            needed = long_side * _DENSE_SCALE
+
+        for mode in MODE_ORDER[:-1]:
+            if INFERENCE_MODES[mode]["image_size"] >= needed:
+                return mode
+
+        # More pixels than the largest single view: only dense text needs crops
+        return "gundam" if ink >= self.dense_ink else "large"
+
+    def _cap(self, mode: str, max_mode: Optional[str]) -> str:
+        """Lower mode to the planner's, the caller's and the memory limits"""
+        limit = MODE_ORDER.index(self.max_mode)
+        if max_mode in MODE_ORDER:
+            limit = min(limit, MODE_ORDER.index(max_mode))
+
+        budget = self.memory_budget_gb() if callable(self.memory_budget_gb) else self.memory_budget_gb
+        if budget is not None:
+            while limit > 0 and INFERENCE_MODES[MODE_ORDER[limit]]["min_vram_gb"] > budget:
+                limit -= 1
+
+        return MODE_ORDER[min(MODE_ORDER.index(mode), limit)]
@@ -0,0 +1,254 @@
+"""
+Page Filter - Skip blank and near-duplicate pages before inference
+
+Scanned documents often contain blank separator sheets and repeated cover
+pages, each of which would cost a full model call. PageFilter inspects a
+downsampled copy of every page (a few milliseconds) and reports pages that
+do not need inference:
+
+- blank: almost no pixels noticeably darker than the page background, and
+  none of them forming a mark the size of a character, so grey or noisy
+  scanner paper and specks of dust still count as blank
+- duplicate: the page's perceptual hash (difference hash) is within a few
+  bits of an earlier page of the same document, and the two downsampled
+  copies match pixel for pixel within a small tolerance
+
+The hash alone cannot be trusted for text: pages sharing a layout but not
+their words hash alike, and at thumbnail scale a changed digit in an
+invoice number is a handful of pixels. The pixel check is what keeps such
+pages, so only true repeats (the same page rendered or scanned again
+without moving) are skipped.
+
+One PageFilter is meant for one document; duplicates are only detected
+among the pages it has already seen.
+"""
+
+import logging
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image, ImageChops
+
+from .mode_planner import downsample_gray
+
+logger = logging.getLogger(__name__)
+
+# Long side of the downsampled copy checked for ink and compared for duplicates
+_SAMPLE_SIZE = 512
+
+# Pixels this much darker than the background count as ink
+_INK_CONTRAST = 48
+
+# Pages with at least this share of ink pixels are never blank (a single
+# short line of text is about 3x this); pages below it are checked for marks
+_BLANK_COVERAGE = 1e-4
+
+# Ink pixels connected into a mark this large are content. The downsampled
+# copy is about 50-70 DPI whatever the render DPI, so this is a physical size:
+# one digit of 8pt text is 4-8 pixels, a period or a speck of dust 1-2
+_MIN_MARK_PIXELS = 3
+
+# Side of the difference hash grid (HASH_SIZE**2 bits)
+HASH_SIZE = 16
+
+# Pages whose hashes differ in at most this many bits are duplicate candidates
+_MAX_HASH_DISTANCE = 10
+
+# Candidates are duplicates if no downsampled pixel differs by more than this
+# (one changed digit of 8pt text at 144 DPI differs by 100+)
+_MAX_PIXEL_DIFFERENCE = 48
+
+
+def ink_coverage(image: Image.Image, sample_size: int = _SAMPLE_SIZE) -> float:
+    """
+    Share of a page covered by ink, relative to the page's own background.
+
+    The background is the median gray level of a downsampled copy; pixels
+    at least _INK_CONTRAST levels darker count as ink.
+
+    Args:
+        image: PIL image in any mode
+        sample_size: Long side of the downsampled copy
+
+    Returns:
+        float: 0.0 for an empty page
+    """
+    return _coverage(downsample_gray(image, sample_size).histogram())
+
+
+def _coverage(histogram: List[int]) -> float:
+    """Share of ink pixels in a grayscale histogram"""
+    ink_level = _ink_level(histogram)
+    return sum(histogram[:ink_level]) / sum(histogram)
+
+
+def _ink_level(histogram: List[int]) -> int:
+    """Gray levels below this are ink: _INK_CONTRAST under the median (background) level"""
+    total = sum(histogram)
+
+    seen = 0
+    background = 255
+    for level in range(255, -1, -1):
+        seen += histogram[level]
+        if seen * 2 >= total:
+            background = level
+            break
+
+    return max(0, background - _INK_CONTRAST)
+
+
+def _has_mark(small: Image.Image, ink_level: int, min_pixels: int) -> bool:
+    """
+    Whether the ink of a downsampled page forms a mark of at least min_pixels
+    8-connected pixels.
+
+    Only called for pages with almost no ink, so the flood fill visits a
+    handful of pixels.
+    """
+    mask = small.point([255 if level < ink_level else 0 for level in range(256)]).tobytes()
+    width = small.width
+
+    ink = set()
+    index = mask.find(255)
+    while index != -1:
+        ink.add(index)
+        index = mask.find(255, index + 1)
+
+    while ink:
+        stack = [ink.pop()]
+        size = 0
+        while stack:
+            index = stack.pop()
+            size += 1
+            if size >= min_pixels:
+                return True
+            col = index % width
+            for row_offset in (-width, 0, width):
+                for col_offset in (-1, 0, 1):
+                    neighbour = index + row_offset + col_offset
+                    if 0 <= col + col_offset < width and neighbour in ink:
+                        ink.remove(neighbour)
+                        stack.append(neighbour)
+    return False
+
+
+def dhash(image: Image.Image, hash_size: int = HASH_SIZE) -> int:
+    """
+    Difference hash of an image: one bit per horizontally adjacent pixel pair
+    of a (hash_size + 1) x hash_size grayscale thumbnail.
+
+    Args:
+        image: PIL image in any mode
+        hash_size: Side of the hash grid
+
+    Returns:
+        int: hash_size**2-bit hash; compare two with hash_distance()
+    """
+    thumbnail = downsample_gray(image, hash_size * 8).resize((hash_size + 1, hash_size), Image.BOX)
+    pixels = thumbnail.tobytes()
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hash_distance(first: int, second: int) -> int:
+    """Number of differing bits between two hashes"""
+    return bin(first ^ second).count("1")
+
+
+class PageFilter:
+    """
+    Decide per page whether inference can be skipped.
+
+    Example:
+        >>> page_filter = PageFilter()
+        >>> for page_num, image in iter_pdf_pages("scan.pdf"):
+        ...     skipped = page_filter.check(page_num, image)
+        ...     if skipped is None:
+        ...         result = engine.infer(image)
+    """
+
+    def __init__(
+        self,
+        skip_blank: bool = True,
+        skip_duplicates: bool = True,
+        blank_coverage: float = _BLANK_COVERAGE,
+        min_mark_pixels: int = _MIN_MARK_PIXELS,
+        max_hash_distance: int = _MAX_HASH_DISTANCE,
+        max_pixel_difference: int = _MAX_PIXEL_DIFFERENCE
+    ):
+        """
+        Initialize the filter for one document.
+
+        Args:
+            skip_blank: Report blank pages: less ink than blank_coverage, with
+                no mark of min_mark_pixels
+            skip_duplicates: Report pages matching an earlier page
+            blank_coverage: Ink share at or above which a page is never blank
+            min_mark_pixels: Connected ink pixels in the downsampled copy that
+                make a page with little ink not blank
+            max_hash_distance: Maximum differing hash bits for a duplicate candidate
+            max_pixel_difference: Maximum gray level difference of any downsampled
+                pixel between a page and its duplicate
+        """
+        self.skip_blank = skip_blank
+        self.skip_duplicates = skip_duplicates
+        self.blank_coverage = blank_coverage
+        self.min_mark_pixels = min_mark_pixels
+        self.max_hash_distance = max_hash_distance
+        self.max_pixel_difference = max_pixel_difference
+
+        # (page_num, hash, size, compressed downsampled copy) of pages that were not skipped
+        self._pages: List[Tuple[int, int, Tuple[int, int], bytes]] = []
+
+    def check(self, page_num: int, image: Image.Image) -> Optional[Dict[str, Any]]:
+        """
+        Check one page, in document order.
+
+        Args:
+            page_num: Page number, reported for later duplicates of this page
+            image: Rendered page
+
+        Returns:
+            None if the page needs inference, otherwise {"skipped": "blank"} or
+            {"skipped": "duplicate", "duplicate_of": <earlier page_num>}
+        """
+        small = downsample_gray(image, _SAMPLE_SIZE)
+
+        if self.skip_blank and self._is_blank(small):
+            logger.debug(f"Page {page_num} is blank")
+            return {"skipped": "blank"}
+
+        if not self.skip_duplicates:
+            return None
+
+        page_hash = dhash(small)
+        for earlier_page, earlier_hash, size, pixels in self._pages:
+            if (
+                size == small.size
+                and hash_distance(page_hash, earlier_hash) <= self.max_hash_distance
+                and self._matches(small, pixels)
+            ):
+                logger.debug(f"Page {page_num} duplicates page {earlier_page}")
+                return {"skipped": "duplicate", "duplicate_of": earlier_page}
+
+        # Text pages compress well; only hash candidates are ever decompressed
+        self._pages.append((page_num, page_hash, small.size, zlib.compress(small.tobytes(), 1)))
+        return None
+
+    def _is_blank(self, small: Image.Image) -> bool:
+        """Whether a downsampled page has too little ink, and no mark, to need inference"""
+        histogram = small.histogram()
+        if _coverage(histogram) >= self.blank_coverage:
+            return False
+        return not _has_mark(small, _ink_level(histogram), self.min_mark_pixels)
+
+    def _matches(self, small: Image.Image, pixels: bytes) -> bool:
+        """Whether a downsampled page matches a stored one within max_pixel_difference"""
+        earlier = Image.frombytes("L", small.size, zlib.decompress(pixels))
+        _, largest = ImageChops.difference(small, earlier).getextrema()
+        return largest <= self.max_pixel_difference
@@ -3,12 +3,24 @@ Base Parser - Abstract class for document parsers
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Optional, Tuple
 
 
 class BaseParser(ABC):
     """Abstract base class for document field parsers"""
 
+    # How each field is combined across the pages of a document:
+    #   "first": keep the first non-empty value (header fields)
+    #   "last":  keep the last non-empty value
+    #   "best":  keep the value with the best (lowest) rank from extract_ranked(),
+    #            the later page winning among equal ranks (totals)
+    #   "union": collect the distinct items of list fields from every page
+    # Fields not listed are merged with "first".
+    FIELD_MERGE: Dict[str, str] = {}
+
+    # Fields that must be filled for a document to count as fully extracted
+    REQUIRED_FIELDS: Tuple[str, ...] = ()
+
     @abstractmethod
     def parse(self, markdown: str) -> Dict[str, Any]:
         """
@@ -22,6 +34,59 @@ class BaseParser(ABC):
         """
         pass
 
+    def extract(self, markdown: str, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Extract only the named fields from markdown.
+
+        Subclasses override this to skip the work for fields that are not
+        requested; the default parses everything and filters.
+
+        Args:
+            markdown: OCR output in markdown format
+            fields: Field names to extract, None for all fields
+
+        Returns:
+            dict: The requested fields
+        """
+        extracted = self.parse(markdown)
+        if fields is None:
+            return extracted
+        return {name: extracted[name] for name in fields}
+
+    def extract_ranked(
+        self,
+        markdown: str,
+        fields: Optional[Iterable[str]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """
+        Extract the named fields along with how reliable each match is.
+
+        Used to merge "best" fields across pages. The default ranks every
+        field 0; parsers that try patterns in order of priority override it.
+
+        Args:
+            markdown: OCR output in markdown format
+            fields: Field names to extract, None for all fields
+
+        Returns:
+            tuple: (fields, ranks), ranks mapping each field to the priority of
+                the pattern it matched (lower is more reliable)
+        """
+        extracted = self.extract(markdown, fields)
+        return extracted, {name: 0 for name in extracted}
+
+    def score_fields(self, fields: Dict[str, Any]) -> float:
+        """
+        Share of REQUIRED_FIELDS that are filled in fields.
+
+        Returns:
+            float: Score between 0 and 1 (1.0 if the parser has no required fields)
+        """
+        if not self.REQUIRED_FIELDS:
+            return 1.0
+        filled = sum(1 for name in self.REQUIRED_FIELDS if fields.get(name))
+        return filled / len(self.REQUIRED_FIELDS)
+
     @abstractmethod
     def get_fields_schema(self) -> Dict[str, Any]:
         """
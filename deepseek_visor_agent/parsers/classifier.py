@@ -1,64 +1,191 @@
 """
 Document Classifier - Identify document type from markdown content
+
+Every document type is scored from a fixed table of features (keywords and
+regex patterns), each counting once if it occurs anywhere in the text. The
+table is built once at import. Because a feature can only add to a score,
+the classifier stops scanning as soon as the remaining, unchecked features
+can no longer change the outcome, and long documents can be decided from
+their first few KB when one type clearly leads.
 """
 
 import re
-from typing import Literal
+from typing import Dict, List, Literal, Set, Tuple, Union
 
 DocumentType = Literal["invoice", "contract", "resume", "general"]
 
+# Scored types, in tie-break order (earlier wins a tie)
+_TYPES: Tuple[DocumentType, ...] = ("invoice", "contract", "resume")
+
+# Minimum winning score; below it the document is "general"
+_MIN_SCORE = 3
+
+# Long documents are first scored on this many leading characters...
+_PREFIX_CHARS = 32 * 1024
+
+# ...and that decision is kept if the leader is ahead by at least this much
+_DECISIVE_MARGIN = 6
+
+
+def _keywords(document_type: DocumentType, keywords: List[str]) -> List[Tuple[DocumentType, int, str]]:
+    """Feature entries for keywords worth 2 points each"""
+    return [(document_type, 2, kw) for kw in keywords]
+
+
+# (document type, weight, keyword or compiled pattern), matched against lowercased text
+_FEATURES: List[Tuple[DocumentType, int, Union[str, "re.Pattern"]]] = [
+    # Invoice indicators
+    *_keywords("invoice", ["invoice", "receipt", "total", "amount due", "payment", "bill",
+                           "subtotal", "tax", "vendor"]),
+    # Currency symbols (strong invoice indicator)
+    ("invoice", 3, re.compile(r'\$\s*\d+|\d+\.\d{2}|€\s*\d+|£\s*\d+')),
+    # Invoice number pattern
+    ("invoice", 3, re.compile(r'invoice\s*(?:number|#|no\.?)[:\s]*[\w-]+')),
+
+    # Contract indicators
+    *_keywords("contract", ["agreement", "contract", "party", "parties", "whereas",
+                            "terms and conditions", "effective date", "governing law",
+                            "jurisdiction", "hereby", "hereinafter"]),
+    # Strong contract patterns
+    ("contract", 4, re.compile(r'(?:this|the)\s+agreement|between.+and|party\s+[ab]')),
+
+    # Resume/CV indicators
+    *_keywords("resume", ["experience", "education", "skills", "resume", "cv", "curriculum vitae",
+                          "employment history", "qualifications", "objective", "references"]),
+    # Date ranges (common in resumes)
+    ("resume", 2, re.compile(r'\d{4}\s*-\s*(?:\d{4}|present)')),
+]
+
+
+def _occurs(feature: Union[str, "re.Pattern"], text: str) -> bool:
+    """Whether a keyword or pattern occurs anywhere in text"""
+    if isinstance(feature, str):
+        return feature in text
+    return feature.search(text) is not None
+
+
+def _scores(found: Set[int]) -> Dict[DocumentType, int]:
+    """Score of each type from the indices of features known to occur"""
+    scores = {document_type: 0 for document_type in _TYPES}
+    for i in found:
+        document_type, weight, _ = _FEATURES[i]
+        scores[document_type] += weight
+    return scores
+
+
+def _leader(scores: Dict[DocumentType, int]) -> DocumentType:
+    """Highest-scoring type, ties going to the earlier type"""
+    return max(_TYPES, key=lambda document_type: scores[document_type])
 
-def classify_document(markdown: str) -> DocumentType:
+
+def _decide(found: Set[int], unknown: Set[int]) -> Union[DocumentType, None]:
+    """
+    The final classification if the unchecked features can no longer change
+    it, otherwise None.
+    """
+    lower = _scores(found)
+    upper = dict(lower)
+    for i in unknown:
+        document_type, weight, _ = _FEATURES[i]
+        upper[document_type] += weight
+
+    if max(upper.values()) < _MIN_SCORE:
+        return "general"
+
+    leader = _leader(lower)
+    if lower[leader] < _MIN_SCORE:
+        return None
+
+    for rank, document_type in enumerate(_TYPES):
+        if document_type == leader:
+            continue
+        # A type listed before the leader takes over on a tie
+        takes_over = lower[leader] if rank < _TYPES.index(leader) else lower[leader] + 1
+        if upper[document_type] >= takes_over:
+            return None
+
+    return leader
+
+
+def classify_document(markdown: str, prefix_chars: int = _PREFIX_CHARS) -> DocumentType:
     """
     Classify document type based on content analysis.
 
     Args:
         markdown: OCR output in markdown format
+        prefix_chars: For longer documents, first classify this many leading
+            characters and keep the result if one type leads by a clear margin
+            (0 always considers the whole text)
 
     Returns:
         str: Document type ("invoice" | "contract" | "resume" | "general")
     """
     text_lower = markdown.lower()
 
-    # Invoice indicators
-    invoice_keywords = ["invoice", "receipt", "total", "amount due", "payment", "bill", "subtotal", "tax", "vendor"]
-    invoice_score = sum(2 if kw in text_lower else 0 for kw in invoice_keywords)
-
-    # Check for currency symbols (strong invoice indicator)
-    if re.search(r'\$\s*\d+|\d+\.\d{2}|€\s*\d+|£\s*\d+', markdown):
-        invoice_score += 3
-
-    # Check for invoice number pattern
-    if re.search(r'invoice\s*(?:number|#|no\.?)[:\s]*[\w-]+', text_lower):
-        invoice_score += 3
-
-    # Contract indicators
-    contract_keywords = ["agreement", "contract", "party", "parties", "whereas", "terms and conditions",
-                         "effective date", "governing law", "jurisdiction", "hereby", "hereinafter"]
-    contract_score = sum(2 if kw in text_lower else 0 for kw in contract_keywords)
-
-    # Strong contract patterns
-    if re.search(r'(?:this|the)\s+agreement|between.+and|party\s+[ab]', text_lower):
-        contract_score += 4
+    found: Set[int] = set()
+    unknown = set(range(len(_FEATURES)))
+
+    if prefix_chars and len(text_lower) > prefix_chars:
+        # Features seen in the prefix occur in the whole text too
+        prefix = text_lower[:prefix_chars]
+        found = {i for i in unknown if _occurs(_FEATURES[i][2], prefix)}
+        unknown -= found
+
+        scores = _scores(found)
+        ranked = sorted(scores.values(), reverse=True)
+        if ranked[0] >= _MIN_SCORE and ranked[0] - ranked[1] >= _DECISIVE_MARGIN:
+            return _leader(scores)
+
+    # Check features of the type with the most points still in play until the
+    # outcome is settled
+    while True:
+        decision = _decide(found, unknown)
+        if decision is not None:
+            return decision
+
+        upper = _scores(found | unknown)
+        lower = _scores(found)
+        contender = max(
+            _TYPES,
+            key=lambda document_type: (upper[document_type] - lower[document_type] > 0,
+                                       upper[document_type])
+        )
+        i = next(i for i in sorted(unknown) if _FEATURES[i][0] == contender)
+        unknown.discard(i)
+        if _occurs(_FEATURES[i][2], text_lower):
+            found.add(i)
+
+
+class IncrementalClassifier:
+    """
+    Classify a multi-page document one page at a time.
+
+    Features only record whether they occur somewhere, so the features found
+    on each page can be merged: after adding every page, document_type is the
+    classification of the whole document. Each page is only checked for
+    features not already found on an earlier page.
+
+    Example:
+        >>> classifier = IncrementalClassifier()
+        >>> for page in pages:
+        ...     classifier.add(page)
+        >>> classifier.document_type
+        'contract'
+    """
 
-    # Resume/CV indicators
-    resume_keywords = ["experience", "education", "skills", "resume", "cv", "curriculum vitae",
-                       "employment history", "qualifications", "objective", "references"]
-    resume_score = sum(2 if kw in text_lower else 0 for kw in resume_keywords)
-
-    # Check for date ranges (common in resumes)
-    if re.search(r'\d{4}\s*-\s*(?:\d{4}|present)', text_lower):
-        resume_score += 2
-
-    # Determine document type based on scores
-    scores = {
-        "invoice": invoice_score,
-        "contract": contract_score,
-        "resume": resume_score
-    }
-
-    max_score = max(scores.values())
-    if max_score >= 3:  # Minimum confidence threshold
-        return max(scores, key=scores.get)
-
-    return "general"
+    def __init__(self):
+        self._found: Set[int] = set()
+
+    def add(self, markdown: str):
+        """Record the features occurring in one more page"""
+        text_lower = markdown.lower()
+        for i, (_, _, feature) in enumerate(_FEATURES):
+            if i not in self._found and _occurs(feature, text_lower):
+                self._found.add(i)
+
+    @property
+    def document_type(self) -> DocumentType:
+        """Classification of all pages added so far"""
+        scores = _scores(self._found)
+        leader = _leader(scores)
+        return leader if scores[leader] >= _MIN_SCORE else "general"
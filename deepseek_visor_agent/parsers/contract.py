@@ -3,13 +3,27 @@ Contract Parser - Extract structured data from contract documents
 """
 
 import re
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, List, Optional
 from .base import BaseParser
 
 
 class ContractParser(BaseParser):
     """Parser for extracting contract fields from markdown"""
 
+    # Parties can be introduced on several pages; everything else is stated once up front
+    FIELD_MERGE = {
+        "parties": "union",
+        "effective_date": "first",
+        "contract_type": "first",
+        "term_duration": "first",
+        "governing_law": "first",
+    }
+    REQUIRED_FIELDS = ("parties", "effective_date", "governing_law")
+
+    def __init__(self):
+        """Initialize parser"""
+        self._last_fields = {}
+
     def parse(self, markdown: str) -> Dict[str, Any]:
         """
         Extract contract fields from markdown.
@@ -20,16 +34,27 @@ class ContractParser(BaseParser):
         Returns:
             dict: Extracted fields including parties, effective_date, terms, contract_type
         """
-        fields = {
-            "parties": self._extract_parties(markdown),
-            "effective_date": self._extract_effective_date(markdown),
-            "contract_type": self._extract_contract_type(markdown),
-            "term_duration": self._extract_term_duration(markdown),
-            "governing_law": self._extract_governing_law(markdown),
-        }
+        fields = self.extract(markdown)
 
+        # Store for confidence calculation
+        self._last_fields = fields
         return fields
 
+    def extract(self, markdown: str, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Extract only the named contract fields from markdown.
+
+        Args:
+            markdown: OCR output in markdown format
+            fields: Any of "parties", "effective_date", "contract_type",
+                "term_duration", "governing_law"; None for all
+
+        Returns:
+            dict: The requested fields
+        """
+        names = tuple(self.FIELD_MERGE) if fields is None else tuple(fields)
+        return {name: getattr(self, f"_extract_{name}")(markdown) for name in names}
+
     def _extract_parties(self, text: str) -> List[str]:
         """Extract contract parties"""
         parties = []
@@ -137,6 +162,18 @@ class ContractParser(BaseParser):
 
         return ""
 
+    def get_confidence(self) -> float:
+        """
+        Calculate confidence score based on extracted fields.
+
+        Returns:
+            float: Share of required fields (parties, effective date, governing law) found
+        """
+        if not self._last_fields:
+            return 0.0
+
+        return self.score_fields(self._last_fields)
+
     def get_fields_schema(self) -> Dict[str, Any]:
         """Get JSON schema for contract fields"""
         return {
@@ -0,0 +1,208 @@
+"""
+Incremental extraction - Classify and extract fields from a document page by page
+
+Each page is classified and parsed once, as it arrives, and the results are
+merged into document-level fields according to each parser's FIELD_MERGE
+rules. Fields that are settled (a "first" field that is already filled) are
+not extracted again from later pages, so the cost of each page only depends
+on that page. The page each field value came from is recorded.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from .base import BaseParser
+from .classifier import IncrementalClassifier
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalExtractor:
+    """
+    Merge one parser's fields across pages.
+
+    Example:
+        >>> extractor = IncrementalExtractor(InvoiceParser())
+        >>> for page_num, markdown in enumerate(pages):
+        ...     extractor.add(page_num, markdown)
+        >>> extractor.fields, extractor.field_pages
+        ({'total': '$199.00', ...}, {'total': [2], ...})
+    """
+
+    def __init__(self, parser: BaseParser):
+        """
+        Args:
+            parser: Parser whose fields are extracted and merged
+        """
+        self.parser = parser
+
+        # What the parser returns for a field when it finds nothing
+        self._empty = parser.extract("")
+        self.fields: Dict[str, Any] = {name: _copy(value) for name, value in self._empty.items()}
+        self.field_pages: Dict[str, List[int]] = {name: [] for name in self.fields}
+        # Rank of each "best" field's current value (see BaseParser.extract_ranked())
+        self._ranks: Dict[str, int] = {}
+
+    def _is_empty(self, name: str, value: Any) -> bool:
+        return not value or value == self._empty[name]
+
+    def _strategy(self, name: str) -> str:
+        return self.parser.FIELD_MERGE.get(name, "first")
+
+    def pending_fields(self) -> List[str]:
+        """Fields that a new page could still change"""
+        return [
+            name for name in self.fields
+            if self._strategy(name) != "first" or self._is_empty(name, self.fields[name])
+        ]
+
+    def add(self, page_num: int, markdown: str) -> Dict[str, Any]:
+        """
+        Extract the pending fields from one page and merge them.
+
+        Args:
+            page_num: Page number recorded as the source of merged values
+            markdown: The page's markdown
+
+        Returns:
+            dict: Fields extracted from this page (pending fields only)
+        """
+        pending = self.pending_fields()
+        if not pending:
+            return {}
+
+        page_fields, ranks = self.parser.extract_ranked(markdown, pending)
+
+        for name, value in page_fields.items():
+            if self._is_empty(name, value):
+                continue
+
+            strategy = self._strategy(name)
+            if strategy == "union":
+                new_items = [item for item in value if item not in self.fields[name]]
+                if new_items:
+                    self.fields[name] = self.fields[name] + new_items
+                    self.field_pages[name].append(page_num)
+            elif strategy == "best":
+                # A later page wins only with an equally or more reliable match
+                if name not in self._ranks or ranks[name] <= self._ranks[name]:
+                    self.fields[name] = value
+                    self.field_pages[name] = [page_num]
+                    self._ranks[name] = ranks[name]
+            elif strategy == "last" or self._is_empty(name, self.fields[name]):
+                self.fields[name] = value
+                self.field_pages[name] = [page_num]
+
+        return page_fields
+
+    @property
+    def confidence(self) -> float:
+        """Parser's score for the merged fields"""
+        return self.parser.score_fields(self.fields)
+
+    @property
+    def is_complete(self) -> bool:
+        """Whether every required field of the parser is filled"""
+        required = self.parser.REQUIRED_FIELDS
+        return bool(required) and all(
+            not self._is_empty(name, self.fields.get(name)) for name in required
+        )
+
+
+class DocumentAnalysis:
+    """
+    Running classification and merged fields for a multi-page document.
+
+    With document_type="auto", every page updates an IncrementalClassifier.
+    Fields are merged with the parser of the current document type; if the
+    type changes after more pages arrive, the pages seen so far are replayed
+    into the new type's extractor.
+    """
+
+    def __init__(
+        self,
+        parsers: Dict[str, BaseParser],
+        document_type: str = "auto",
+        extract_fields: bool = True
+    ):
+        """
+        Args:
+            parsers: Parser for each document type that has fields
+            document_type: Fixed document type, or "auto" to classify the pages
+            extract_fields: Whether to extract fields at all
+        """
+        self.parsers = parsers
+        self.extract_fields = extract_fields
+        self._fixed_type = None if document_type == "auto" else document_type
+        self._classifier = IncrementalClassifier() if self._fixed_type is None else None
+
+        self._pages: List[Tuple[int, str]] = []
+        self._extractor: Optional[IncrementalExtractor] = None
+        self._extractor_type: Optional[str] = None
+
+    @property
+    def document_type(self) -> str:
+        """Document type given the pages added so far"""
+        if self._fixed_type is not None:
+            return self._fixed_type
+        return self._classifier.document_type
+
+    def add(self, page_num: int, markdown: str):
+        """Classify and extract fields from one more page"""
+        self._pages.append((page_num, markdown))
+        if self._classifier is not None:
+            self._classifier.add(markdown)
+
+        if not self.extract_fields:
+            return
+
+        document_type = self.document_type
+        if document_type != self._extractor_type:
+            self._switch_extractor(document_type)
+        elif self._extractor is not None:
+            self._extractor.add(page_num, markdown)
+
+    def _switch_extractor(self, document_type: str):
+        """Start extracting for a new document type from the first page"""
+        if self._extractor_type is not None:
+            logger.info(f"Document type changed from {self._extractor_type} to {document_type}")
+
+        self._extractor_type = document_type
+        parser = self.parsers.get(document_type)
+        self._extractor = IncrementalExtractor(parser) if parser is not None else None
+
+        if self._extractor is not None:
+            for page_num, markdown in self._pages:
+                self._extractor.add(page_num, markdown)
+
+    @property
+    def fields(self) -> Dict[str, Any]:
+        """Merged fields (empty if the type has no parser or extraction is off)"""
+        return dict(self._extractor.fields) if self._extractor is not None else {}
+
+    @property
+    def field_pages(self) -> Dict[str, List[int]]:
+        """Pages each merged field value came from"""
+        if self._extractor is None:
+            return {}
+        return {name: list(pages) for name, pages in self._extractor.field_pages.items()}
+
+    @property
+    def confidence(self) -> float:
+        """Confidence of the merged fields (1.0 without a parser, as for single pages)"""
+        return self._extractor.confidence if self._extractor is not None else 1.0
+
+    @property
+    def has_required_fields(self) -> bool:
+        """Whether the current document type's parser defines required fields"""
+        return self._extractor is not None and bool(self._extractor.parser.REQUIRED_FIELDS)
+
+    @property
+    def is_complete(self) -> bool:
+        """Whether the current document type's required fields are all filled"""
+        return self._extractor is not None and self._extractor.is_complete
+
+
+def _copy(value: Any) -> Any:
+    """Fresh copy of an empty field value, so list fields are not shared"""
+    return list(value) if isinstance(value, list) else value
@@ -3,13 +3,101 @@ Invoice Parser - Extract structured data from invoice documents
 """
 
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
 from .base import BaseParser
 
 
+# Patterns are compiled once at import and run against lowercased text, so they
+# are case-sensitive: that lets the regex engine jump straight to each pattern's
+# leading literal instead of trying every position. Each pattern is paired with
+# keywords of which at least one must occur in the text for it to be tried.
+_Patterns = Sequence[Tuple["re.Pattern", Tuple[str, ...]]]
+
+# Total amount, in order of priority - Grand Total first to avoid matching Subtotal
+_TOTAL_PATTERNS: _Patterns = [
+    (re.compile(r"grand\s+total[:\s]+\$?\s*([\d,]+\.?\d*)"), ("grand",)),  # Grand Total: $199.00 (highest priority)
+    (re.compile(r"amount\s+due[:\s]+\$?\s*([\d,]+\.?\d*)"), ("amount",)),  # Amount Due: $199.00
+    (re.compile(r"total(?<!subtotal)[:\s]+\$?\s*([\d,]+\.?\d*)"), ("total",)),  # Total: $199.00 (but not Subtotal)
+    (re.compile(r"grand\s+total[:\s]+([€£¥])\s*([\d,]+\.?\d*)"), ("grand",)),  # Grand Total: €199.00
+    (re.compile(r"amount\s+due[:\s]+([€£¥])\s*([\d,]+\.?\d*)"), ("amount",)),  # Amount Due: €199.00
+    (re.compile(r"total(?<!subtotal)[:\s]+([€£¥])\s*([\d,]+\.?\d*)"), ("total",)),  # Total: €199.00 (but not Subtotal)
+    (re.compile(r"\$\s*([\d,]+\.\d{2})\s*(?:\n|$)", re.MULTILINE), ("$",)),  # $199.00 at end of line
+    (re.compile(r"(?:usd|eur|gbp)\s*\$?\s*([\d,]+\.?\d*)"), ("usd", "eur", "gbp")),  # USD 199.00
+]
+
+# Invoice date, in order of priority. An optional "Invoice " before "Date" does
+# not change the captured date, so it is left out of the patterns.
+_DATE_PATTERNS: _Patterns = [
+    (re.compile(r"date[:\s]+(\d{4}-\d{2}-\d{2})"), ("date",)),  # Date: 2024-01-15
+    (re.compile(r"date[:\s]+(\d{1,2}/\d{1,2}/\d{4})"), ("date",)),  # Date: 01/15/2024
+    (re.compile(r"date[:\s]+(\d{1,2}-\d{1,2}-\d{4})"), ("date",)),  # Date: 01-15-2024
+    (re.compile(r"date[:\s]+(\d{1,2}\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{4})"), ("date",)),  # Date: 15 Jan 2024
+    (re.compile(r"(\d{4}-\d{2}-\d{2})"), ("-",)),  # Standalone: 2024-01-15
+    (re.compile(r"(\d{1,2}/\d{1,2}/\d{4})"), ("/",)),  # Standalone: 01/15/2024
+]
+
+# Vendor name, explicit labels only
+_VENDOR_PATTERNS: _Patterns = [
+    (re.compile(r"(?:vendor|from|company|business)[:\s]+([^\n]+)"), ("vendor", "from", "company", "business")),
+    (re.compile(r"(?:bill\s+from|billed\s+by)[:\s]+([^\n]+)"), ("bill",)),
+]
+
+# Common legal suffixes stripped from vendor names (Inc., LLC, Ltd., Corporation - NOT "Corp" alone)
+_VENDOR_SUFFIX = re.compile(r"\s*(?:Inc\.?|LLC|Ltd\.?|Corporation|Corp\.)$", re.IGNORECASE)
+
+# Vendor fallback: lines that look like dates or amounts are not vendor names
+_DATE_LIKE = re.compile(r"\d{1,2}[/-]\d{1,2}[/-]\d{2,4}")
+_AMOUNT_LIKE = re.compile(r"\$\s*[\d,]+")
+_FALLBACK_SKIP_KEYWORDS = ['invoice', 'receipt', 'date', 'total', 'number', '#', 'qty', 'quantity', 'price', 'amount', 'random', 'text']
+_INVOICE_CONTEXT_KEYWORDS = ['invoice', 'receipt', 'bill', 'payment']
+
+
+def _lowercase(text: str) -> str:
+    """
+    Lowercase text without changing its length, so match offsets in the result
+    are valid offsets into the original text
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    # A few characters (e.g. "İ") expand when lowercased; keep those as they are
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+def _search_first(patterns: _Patterns, lowered: str) -> Optional["re.Match"]:
+    """
+    Find the first match of the highest-priority pattern that matches anywhere.
+
+    Patterns whose keywords are all absent are skipped without a regex scan.
+    """
+    return _search_ranked(patterns, lowered)[0]
+
+
+def _search_ranked(patterns: _Patterns, lowered: str) -> Tuple[Optional["re.Match"], int]:
+    """Like _search_first(), also returning the matching pattern's index (len(patterns) if none)"""
+    for rank, (pattern, keywords) in enumerate(patterns):
+        if not any(keyword in lowered for keyword in keywords):
+            continue
+        match = pattern.search(lowered)
+        if match:
+            return match, rank
+    return None, len(patterns)
+
+
+def _group(text: str, match: "re.Match", group: int) -> str:
+    """Matched group taken from the original (not lowercased) text"""
+    return text[match.start(group):match.end(group)]
+
+
 class InvoiceParser(BaseParser):
     """Parser for extracting invoice fields from markdown"""
 
+    # Header fields come from the first page they appear on. The total comes from
+    # the page with the highest-priority label (a "Grand Total" beats a bare
+    # "$x.xx"), the last such page on a tie, as when parsing all pages at once.
+    FIELD_MERGE = {"total": "best", "date": "first", "vendor": "first", "items": "union"}
+    REQUIRED_FIELDS = ("total", "date", "vendor")
+
     def __init__(self):
         """Initialize parser"""
         self._last_fields = {}
@@ -24,97 +112,107 @@ class InvoiceParser(BaseParser):
         Returns:
             dict: Extracted fields including total, date, vendor, items
         """
-        fields = {
-            "total": self._extract_total(markdown),
-            "date": self._extract_date(markdown),
-            "vendor": self._extract_vendor(markdown),
-            "items": self._extract_items(markdown)
-        }
+        fields = self.extract(markdown)
 
         # Store for confidence calculation
         self._last_fields = fields
         return fields
 
-    def _extract_total(self, text: str) -> str:
+    def extract(self, markdown: str, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Extract only the named invoice fields from markdown.
+
+        Args:
+            markdown: OCR output in markdown format
+            fields: Any of "total", "date", "vendor", "items"; None for all
+
+        Returns:
+            dict: The requested fields
+        """
+        return self.extract_ranked(markdown, fields)[0]
+
+    def extract_ranked(
+        self,
+        markdown: str,
+        fields: Optional[Iterable[str]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """
+        Extract the named invoice fields and their ranks (see BaseParser).
+
+        The total is ranked by the priority of the _TOTAL_PATTERNS entry it
+        matched; other fields rank 0.
+        """
+        names = ("total", "date", "vendor", "items") if fields is None else tuple(fields)
+
+        # Lowercase once for all field extractors
+        lowered = _lowercase(markdown)
+
+        extracted = {}
+        ranks = {}
+        for name in names:
+            ranks[name] = 0
+            if name == "items":
+                extracted[name] = self._extract_items(markdown)
+            elif name == "total":
+                extracted[name], ranks[name] = self._match_total(lowered)
+            else:
+                extracted[name] = getattr(self, f"_extract_{name}")(markdown, lowered)
+        return extracted, ranks
+
+    def _extract_total(self, text: str, lowered: Optional[str] = None) -> str:
         """Extract total amount from text"""
-        # Patterns in order of priority - Grand Total first to avoid matching Subtotal
-        patterns = [
-            r"(?:Grand\s+Total)[:\s]+\$?\s*([\d,]+\.?\d*)",  # Grand Total: $199.00 (highest priority)
-            r"(?:Amount\s+Due)[:\s]+\$?\s*([\d,]+\.?\d*)",  # Amount Due: $199.00
-            r"(?<!Sub)(?:Total)[:\s]+\$?\s*([\d,]+\.?\d*)",  # Total: $199.00 (but not Subtotal)
-            r"(?:Grand\s+Total)[:\s]+([€£¥])\s*([\d,]+\.?\d*)",  # Grand Total: €199.00
-            r"(?:Amount\s+Due)[:\s]+([€£¥])\s*([\d,]+\.?\d*)",  # Amount Due: €199.00
-            r"(?<!Sub)(?:Total)[:\s]+([€£¥])\s*([\d,]+\.?\d*)",  # Total: €199.00 (but not Subtotal)
-            r"\$\s*([\d,]+\.\d{2})\s*(?:\n|$)",  # $199.00 at end of line
-            r"(?:USD|EUR|GBP)\s*\$?\s*([\d,]+\.?\d*)",  # USD 199.00
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                amount = match.group(1) if len(match.groups()) == 1 else match.group(2)
-                # Remove commas from amount
-                amount = amount.replace(',', '')
-                return f"${amount}"
+        return self._match_total(lowered or _lowercase(text))[0]
 
-        return ""
+    def _match_total(self, lowered: str) -> Tuple[str, int]:
+        """Total amount from lowercased text, and the rank of the pattern that found it"""
+        match, rank = _search_ranked(_TOTAL_PATTERNS, lowered)
+        if match:
+            # Currency symbol patterns capture the symbol first and the amount second
+            amount = match.group(match.re.groups)
+            # Remove commas from amount
+            amount = amount.replace(',', '')
+            return f"${amount}", rank
 
-    def _extract_date(self, text: str) -> str:
+        return "", rank
+
+    def _extract_date(self, text: str, lowered: Optional[str] = None) -> str:
         """Extract date from text"""
-        # Patterns in order of priority
-        patterns = [
-            r"(?:Invoice\s+)?Date[:\s]+(\d{4}-\d{2}-\d{2})",  # Date: 2024-01-15
-            r"(?:Invoice\s+)?Date[:\s]+(\d{1,2}/\d{1,2}/\d{4})",  # Date: 01/15/2024
-            r"(?:Invoice\s+)?Date[:\s]+(\d{1,2}-\d{1,2}-\d{4})",  # Date: 01-15-2024
-            r"(?:Invoice\s+)?Date[:\s]+(\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+\d{4})",  # Date: 15 Jan 2024
-            r"(\d{4}-\d{2}-\d{2})",  # Standalone: 2024-01-15
-            r"(\d{1,2}/\d{1,2}/\d{4})",  # Standalone: 01/15/2024
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1)
+        match = _search_first(_DATE_PATTERNS, lowered or _lowercase(text))
+        if match:
+            return _group(text, match, 1)
 
         return ""
 
-    def _extract_vendor(self, text: str) -> str:
+    def _extract_vendor(self, text: str, lowered: Optional[str] = None) -> str:
         """Extract vendor name from text"""
+        lowered = lowered or _lowercase(text)
+
         # Try explicit patterns first
-        vendor_patterns = [
-            r"(?:Vendor|From|Company|Business)[:\s]+([^\n]+)",
-            r"(?:Bill\s+From|Billed\s+By)[:\s]+([^\n]+)",
-        ]
-
-        for pattern in vendor_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                vendor = match.group(1).strip()
-                # Clean up common suffixes (Inc., LLC, Ltd., Corporation - NOT "Corp" alone)
-                vendor = re.sub(r'\s*(?:Inc\.?|LLC|Ltd\.?|Corporation|Corp\.)$', '', vendor, flags=re.IGNORECASE)
-                return vendor.strip()
+        match = _search_first(_VENDOR_PATTERNS, lowered)
+        if match:
+            vendor = _group(text, match, 1).strip()
+            # Clean up common suffixes
+            vendor = _VENDOR_SUFFIX.sub('', vendor)
+            return vendor.strip()
 
         # Fallback: Find first meaningful line (not invoice/date/total)
-        # Only use this if we're confident it's an invoice context
-        lines = text.split('\n')
-        skip_keywords = ['invoice', 'receipt', 'date', 'total', 'number', '#', 'qty', 'quantity', 'price', 'amount', 'random', 'text']
-
-        # Only use fallback if there are invoice-like keywords in the text
-        has_invoice_context = any(kw in text.lower() for kw in ['invoice', 'receipt', 'bill', 'payment'])
+        # Only use this if there are invoice-like keywords in the text
+        has_invoice_context = any(kw in lowered for kw in _INVOICE_CONTEXT_KEYWORDS)
         if not has_invoice_context:
             return ""
 
-        for line in lines[:10]:  # Check first 10 lines
+        # Check first 10 lines, without splitting the rest of the document
+        for line in text.split('\n', 10)[:10]:
             line = line.strip()
             # Skip empty lines, headers, and lines with keywords
             if not line or len(line) < 3:
                 continue
-            if any(kw in line.lower() for kw in skip_keywords):
+            if any(kw in line.lower() for kw in _FALLBACK_SKIP_KEYWORDS):
                 continue
             # Skip lines that look like dates or amounts
-            if re.search(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', line):
+            if _DATE_LIKE.search(line):
                 continue
-            if re.search(r'\$\s*[\d,]+', line):
+            if _AMOUNT_LIKE.search(line):
                 continue
 
             # This looks like a vendor name
@@ -132,19 +230,12 @@ class InvoiceParser(BaseParser):
         Calculate confidence score based on extracted fields.
 
         Returns:
-            float: Confidence score between 0 and 1
+            float: Share of required fields (total, date, vendor) found
         """
         if not hasattr(self, '_last_fields') or not self._last_fields:
             return 0.0
 
-        # Count non-empty required fields
-        required_fields = ["total", "date", "vendor"]
-        filled_fields = sum(1 for field in required_fields if self._last_fields.get(field))
-
-        # Calculate confidence: 0.33 per required field
-        confidence = filled_fields / len(required_fields)
-
-        return confidence
+        return self.score_fields(self._last_fields)
 
     def get_fields_schema(self) -> Dict[str, Any]:
         """Get JSON schema for invoice fields"""
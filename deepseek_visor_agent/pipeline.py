@@ -0,0 +1,234 @@
+"""
+Page Pipeline - Overlap rendering, inference and parsing of document pages
+
+Each stage runs on its own thread and hands pages to the next through a
+bounded queue:
+
+    render thread --> inference thread --> parse thread --> caller
+
+While page N is on the model, page N+1 is being rasterized and page N-1
+parsed. Queue bounds keep only a few rendered bitmaps alive at a time, so
+memory stays independent of the page count. Pages come out in input order.
+
+Each result's metadata gets a "stage_timings_ms" dict with the time the
+page spent in each stage. Closing the iterator stops the stages and joins
+their threads; a stage busy with a page (e.g. inside the model) finishes
+that page first.
+
+An optional prefilter runs on the render thread and can answer a page
+without inference (e.g. blank or duplicate pages); such pages pass through
+the inference stage untouched.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# End-of-stream marker passed between stages
+_DONE = object()
+
+# How often blocked stages re-check whether the pipeline was stopped
+_POLL_INTERVAL = 0.05
+
+
+class PagePipeline:
+    """
+    Three-stage threaded pipeline over an iterator of (page_num, image) pairs.
+
+    Example:
+        >>> pipeline = PagePipeline(
+        ...     iter_pdf_pages("contract.pdf"),
+        ...     infer_batch=lambda images: engine.infer_batch(images, batch_size=len(images)),
+        ...     parse=lambda page_num, result: {"page": page_num, **result},
+        ... )
+        >>> for page in pipeline:
+        ...     print(page["page"], page["metadata"]["stage_timings_ms"])
+    """
+
+    def __init__(
+        self,
+        pages: Iterator[Tuple[int, Any]],
+        infer_batch: Callable[[List[Any]], List[Dict[str, Any]]],
+        parse: Callable[[int, Dict[str, Any]], Dict[str, Any]],
+        batch_size: int = 1,
+        queue_size: int = 2,
+        prefilter: Optional[Callable[[int, Any], Optional[Dict[str, Any]]]] = None
+    ):
+        """
+        Initialize the pipeline. Threads start on first iteration.
+
+        Args:
+            pages: Iterator of (page_num, image) pairs; consumed on the render thread
+                and closed there when the pipeline finishes or stops
+            infer_batch: Runs inference on a list of images, returning one result
+                dict (with a "metadata" dict) per image in order
+            parse: Turns (page_num, inference result) into the page result; called
+                in page order on the parse thread
+            batch_size: Pages handed to infer_batch per call
+            queue_size: Capacity of each queue between stages, in batches for the
+                render queue and in pages for the others
+            prefilter: Called with (page_num, image) on the render thread, in page
+                order; returning a result dict uses it instead of inference
+                (timed as the "prefilter" stage), None sends the page to infer_batch
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+        if queue_size < 1:
+            raise ValueError(f"queue_size must be >= 1, got {queue_size}")
+
+        self.pages = pages
+        self.infer_batch = infer_batch
+        self.parse = parse
+        self.batch_size = batch_size
+        self.prefilter = prefilter
+
+        self._rendered: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._inferred: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size * batch_size)
+        self._parsed: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size * batch_size)
+
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._threads: List[threading.Thread] = []
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Start the stage threads and yield parsed pages in order"""
+        if self._threads:
+            raise RuntimeError("PagePipeline can only be iterated once")
+
+        for name, target in (
+            ("render", self._render_stage),
+            ("inference", self._inference_stage),
+            ("parse", self._parse_stage),
+        ):
+            thread = threading.Thread(
+                target=self._guard, args=(target,), name=f"deepseek-visor-{name}", daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+
+        try:
+            while True:
+                item = self._get(self._parsed)
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            # Consumer finished, failed or gave up: release the stage threads and
+            # wait for them, so no stage is still running a page once we return
+            self._stop.set()
+            for thread in self._threads:
+                thread.join()
+
+        if self._error is not None:
+            raise self._error
+
+    def _guard(self, stage: Callable[[], None]):
+        """Run one stage; the first failure stops the whole pipeline"""
+        try:
+            stage()
+        except BaseException as e:
+            if self._error is None:
+                self._error = e
+            self._stop.set()
+
+    def _put(self, q: "queue.Queue[Any]", item: Any) -> bool:
+        """Block until item is queued, or return False if the pipeline stopped"""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: "queue.Queue[Any]") -> Any:
+        """Block for the next item; _DONE once the pipeline stopped"""
+        while True:
+            # Once stopped, do not start on queued work
+            if self._stop.is_set():
+                if self._error is not None:
+                    raise self._error
+                return _DONE
+            try:
+                return q.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+    def _render_stage(self):
+        """Pull pages from the source iterator in batches of batch_size"""
+        try:
+            while True:
+                batch = []
+                for _ in range(self.batch_size):
+                    start_time = time.perf_counter()
+                    page = next(self.pages, None)
+                    if page is None:
+                        break
+                    page_num, image = page
+                    timings = {"render": round((time.perf_counter() - start_time) * 1000, 2)}
+
+                    result = None
+                    if self.prefilter is not None:
+                        start_time = time.perf_counter()
+                        result = self.prefilter(page_num, image)
+                        timings["prefilter"] = round((time.perf_counter() - start_time) * 1000, 2)
+                    batch.append((page_num, image, timings, result))
+
+                if batch and not self._put(self._rendered, batch):
+                    return
+                if len(batch) < self.batch_size:
+                    self._put(self._rendered, _DONE)
+                    return
+        finally:
+            close = getattr(self.pages, "close", None)
+            if close is not None:
+                close()
+
+    def _inference_stage(self):
+        """Run each rendered batch through the model, except prefiltered pages"""
+        while True:
+            batch = self._get(self._rendered)
+            if batch is _DONE:
+                self._put(self._inferred, _DONE)
+                return
+
+            pending = [image for _, image, _, result in batch if result is None]
+            inferred = iter(())
+            inference_ms = 0.0
+            if pending:
+                start_time = time.perf_counter()
+                inferred = iter(self.infer_batch(pending))
+                inference_ms = (time.perf_counter() - start_time) * 1000 / len(pending)
+                logger.debug(f"Inferred pages {[p for p, _, _, r in batch if r is None]}")
+
+            for page_num, _, timings, result in batch:
+                if result is None:
+                    result = next(inferred)
+                    timings["inference"] = round(inference_ms, 2)
+                else:
+                    timings["inference"] = 0.0
+                if not self._put(self._inferred, (page_num, result, timings)):
+                    return
+            # Release the bitmaps before waiting for the next batch
+            del batch
+
+    def _parse_stage(self):
+        """Classify and parse each inferred page in order"""
+        while True:
+            item = self._get(self._inferred)
+            if item is _DONE:
+                self._put(self._parsed, _DONE)
+                return
+
+            page_num, result, timings = item
+            start_time = time.perf_counter()
+            page = self.parse(page_num, result)
+            timings["parse"] = round((time.perf_counter() - start_time) * 1000, 2)
+            page["metadata"]["stage_timings_ms"] = timings
+
+            if not self._put(self._parsed, page):
+                return
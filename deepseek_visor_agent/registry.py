@@ -0,0 +1,222 @@
+"""
+Model Registry - Share loaded models between inference engines
+
+Every DeepSeekOCRInference used to load its own copy of the model, so an
+application creating several VisionDocumentTools (one per agent, say) held
+several copies of the same ~14GB of weights. The registry loads each model
+once per process and hands out reference-counted handles to it:
+
+- models are keyed by (model id, device, dtype, attention implementation);
+  engines asking for the same key share one model and tokenizer
+- a model is unloaded when its last handle is released, unless the registry
+  keeps idle models loaded (keep_idle=True) until unload() is called
+- stats() reports each loaded model's memory, users and load time
+- handle.lock serializes model calls across every engine sharing the model
+
+Example:
+    >>> registry = ModelRegistry.default()
+    >>> handle = registry.acquire(key, load=lambda: (load_model(), load_tokenizer()))
+    >>> with handle.lock:
+    ...     handle.model.infer(handle.tokenizer, ...)
+    >>> handle.release()
+"""
+
+import gc
+import logging
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ModelKey(NamedTuple):
+    """What makes two loaded models interchangeable"""
+    model_id: str
+    device: str
+    dtype: str
+    attn_implementation: str
+
+
+@dataclass
+class _Entry:
+    """One model slot in the registry"""
+    key: ModelKey
+    refs: int = 0
+    model: Any = None
+    tokenizer: Any = None
+    load_time_ms: int = 0
+    # Held while loading, so concurrent acquirers of one key wait for a single load
+    load_lock: threading.Lock = field(default_factory=threading.Lock)
+    # Held around model calls, so engines sharing the model never run it concurrently
+    infer_lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class ModelHandle:
+    """A counted reference to a shared model and tokenizer; release() it when done"""
+
+    def __init__(self, registry: "ModelRegistry", entry: _Entry):
+        self.key = entry.key
+        self.model = entry.model
+        self.tokenizer = entry.tokenizer
+        # Shared by every handle to this model; hold it while calling the model
+        self.lock = entry.infer_lock
+        self._registry = registry
+        self._released = False
+
+    def release(self):
+        """Give up this reference (idempotent)"""
+        if not self._released:
+            self._released = True
+            self.model = self.tokenizer = None
+            self._registry._release(self.key)
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded models with reference counting.
+
+    Most code uses the shared ModelRegistry.default(); separate registries
+    are only useful to isolate tests or deliberately keep separate copies.
+    """
+
+    _default: Optional["ModelRegistry"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, keep_idle: bool = False):
+        """
+        Initialize an empty registry.
+
+        Args:
+            keep_idle: Keep models loaded after their last handle is released,
+                until unload() is called (avoids reloading when engines come and go)
+        """
+        self.keep_idle = keep_idle
+        self._entries: Dict[ModelKey, _Entry] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> "ModelRegistry":
+        """The registry shared by every engine in this process"""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def acquire(self, key: ModelKey, load: Callable[[], Tuple[Any, Any]]) -> ModelHandle:
+        """
+        Get a handle to the model for key, loading it if needed.
+
+        Args:
+            key: ModelKey of the wanted model
+            load: Called without arguments to load (model, tokenizer) when the
+                registry has no model for key; exceptions propagate
+
+        Returns:
+            ModelHandle sharing the model with every other holder of key
+        """
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry(key))
+            entry.refs += 1
+
+        try:
+            with entry.load_lock:
+                if entry.model is None:
+                    start_time = time.time()
+                    entry.model, entry.tokenizer = load()
+                    entry.load_time_ms = int((time.time() - start_time) * 1000)
+                    logger.info(f"Loaded {key.model_id} on {key.device} in {entry.load_time_ms}ms")
+                else:
+                    logger.info(f"Sharing loaded {key.model_id} on {key.device} ({entry.refs} users)")
+        except BaseException:
+            self._release(key)
+            raise
+
+        return ModelHandle(self, entry)
+
+    def _release(self, key: ModelKey):
+        """Drop one reference; unload the model if it was the last and idle models are not kept"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.refs -= 1
+            if entry.refs > 0 or (self.keep_idle and entry.model is not None):
+                return
+            del self._entries[key]
+
+        self._free(entry)
+
+    def unload(self, key: Optional[ModelKey] = None) -> List[ModelKey]:
+        """
+        Unload idle models (those no handle refers to).
+
+        Args:
+            key: Only unload this model (None: every idle model)
+
+        Returns:
+            Keys of the models that were unloaded; models still in use are kept
+        """
+        with self._lock:
+            idle = [
+                entry for entry_key, entry in self._entries.items()
+                if entry.refs == 0 and (key is None or entry_key == key)
+            ]
+            for entry in idle:
+                del self._entries[entry.key]
+
+        for entry in idle:
+            self._free(entry)
+
+        if key is not None and not idle and key in self._entries:
+            logger.warning(f"Not unloading {key.model_id} on {key.device}: still in use")
+        return [entry.key for entry in idle]
+
+    def stats(self) -> Dict[str, Any]:
+        """Loaded models with their users, memory and load time"""
+        with self._lock:
+            entries = [entry for entry in self._entries.values() if entry.model is not None]
+
+        models = [
+            {
+                **entry.key._asdict(),
+                "refs": entry.refs,
+                "memory_gb": round(model_memory_bytes(entry.model) / 1e9, 3),
+                "load_time_ms": entry.load_time_ms,
+            }
+            for entry in entries
+        ]
+        return {
+            "models": models,
+            "total_memory_gb": round(sum(m["memory_gb"] for m in models), 3),
+        }
+
+    def _free(self, entry: _Entry):
+        """Drop the registry's references to a model and return its memory"""
+        with entry.load_lock:
+            entry.model = entry.tokenizer = None
+        gc.collect()
+
+        # Only CUDA caches freed blocks; torch is loaded if a model ever was
+        torch = sys.modules.get("torch")
+        if torch is not None and entry.key.device == "cuda" and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+        logger.info(f"Unloaded {entry.key.model_id} from {entry.key.device}")
+
+
+def model_memory_bytes(model: Any) -> int:
+    """Bytes held by a model's parameters and buffers, counting shared storage once"""
+    if not hasattr(model, "parameters"):
+        return 0
+
+    storages = {}
+    tensors = list(model.parameters())
+    if hasattr(model, "buffers"):
+        tensors += list(model.buffers())
+    for tensor in tensors:
+        storage = tensor.untyped_storage()
+        storages[storage.data_ptr()] = storage.nbytes()
+    return sum(storages.values())
@@ -0,0 +1,141 @@
+"""
+Render Planner - Rasterize PDF pages at the resolution inference consumes
+
+PDF pages used to be rendered at a fixed 144 DPI, after which the model
+resized them to its mode's input: one base_size x base_size view (512px in
+tiny mode), plus image_size tiles of the page in crop mode (gundam). An A4
+page at 144 DPI is 1191x1684 pixels, about 11x the pixels tiny mode keeps.
+
+RenderPlanner computes a zoom per page from its size in points, so that the
+rendered page is just large enough for the mode:
+
+- without cropping, the long side matches base_size
+- with cropping, the page also covers the tile grid DeepSeek-OCR would
+  choose for its aspect ratio (cols x rows tiles of image_size pixels)
+
+Rendering cost and memory then scale with the mode instead of the DPI,
+while the model sees the same input it would have derived from a larger
+render.
+"""
+
+import logging
+from typing import List, Tuple
+
+from .device_manager import INFERENCE_MODES
+
+logger = logging.getLogger(__name__)
+
+# Tile counts DeepSeek-OCR considers in crop mode (dynamic_preprocess defaults)
+MIN_CROPS = 2
+MAX_CROPS = 9
+
+
+def crop_grid(
+    width: float,
+    height: float,
+    min_crops: int = MIN_CROPS,
+    max_crops: int = MAX_CROPS
+) -> Tuple[int, int]:
+    """
+    Tile grid DeepSeek-OCR's crop mode uses for an image of this aspect ratio.
+
+    The grid whose cols/rows ratio is closest to the image's is chosen; on a
+    tie the one with fewer tiles wins (the model picks the larger grid only
+    for images with more pixels than the smaller grid holds).
+
+    Args:
+        width: Image or page width, in any unit
+        height: Image or page height, in the same unit
+        min_crops: Fewest tiles
+        max_crops: Most tiles
+
+    Returns:
+        (cols, rows)
+    """
+    aspect = width / height
+    # Fewest tiles first, so min() keeps the smaller of two equally close grids
+    grids: List[Tuple[int, int]] = sorted(
+        (
+            (cols, rows)
+            for cols in range(1, max_crops + 1)
+            for rows in range(1, max_crops + 1)
+            if min_crops <= cols * rows <= max_crops
+        ),
+        key=lambda grid: (grid[0] * grid[1], grid)
+    )
+    return min(grids, key=lambda grid: abs(aspect - grid[0] / grid[1]))
+
+
+def mode_input_size(width: float, height: float, mode: str) -> Tuple[int, int]:
+    """
+    Smallest pixel size at which a page of this aspect ratio carries all the
+    detail an inference mode uses.
+
+    Args:
+        width: Page width, in any unit
+        height: Page height, in the same unit
+        mode: "tiny" | "small" | "base" | "large" | "gundam"
+
+    Returns:
+        (width, height) in pixels, with the page's aspect ratio
+    """
+    scale = _mode_scale(width, height, mode)
+    return round(width * scale), round(height * scale)
+
+
+def _mode_scale(width: float, height: float, mode: str) -> float:
+    """Pixels per page unit a mode needs (see mode_input_size())"""
+    params = INFERENCE_MODES[mode]
+    scale = params["base_size"] / max(width, height)
+
+    if params["crop_mode"]:
+        cols, rows = crop_grid(width, height)
+        tile = params["image_size"]
+        scale = max(scale, cols * tile / width, rows * tile / height)
+
+    return scale
+
+
+class RenderPlanner:
+    """
+    Choose the render zoom of each PDF page for one inference mode.
+
+    Instances are passed to iter_pdf_pages(render_planner=...) and sent to
+    render worker processes, so they only hold plain settings.
+
+    Example:
+        >>> planner = RenderPlanner("tiny")
+        >>> planner.zoom(595, 842)          # A4 in points
+        0.608...
+        >>> planner.dpi(595, 842)
+        43.8...
+    """
+
+    def __init__(self, mode: str):
+        """
+        Initialize the planner.
+
+        Args:
+            mode: Inference mode the rendered pages are for; in adaptive mode,
+                the most expensive mode a page may be planned for
+        """
+        if mode not in INFERENCE_MODES:
+            raise ValueError(f"Unknown inference mode '{mode}'. Use one of {list(INFERENCE_MODES)}")
+        self.mode = mode
+
+    def zoom(self, width: float, height: float) -> float:
+        """
+        Zoom factor (pixels per point) for a page of width x height points.
+
+        Args:
+            width: Page width in points (1/72 inch)
+            height: Page height in points
+
+        Returns:
+            float: Scale for fitz.Matrix(zoom, zoom)
+        """
+        return _mode_scale(width, height, self.mode)
+
+    def dpi(self, width: float, height: float) -> float:
+        """Render resolution for a page of width x height points, in DPI"""
+        return self.zoom(width, height) * 72.0
@@ -0,0 +1,309 @@
+"""
+Inference Scheduler - Serve concurrent callers from one inference worker
+
+A single worker thread owns all calls into the inference engine. Requests from
+any number of threads or coroutines are queued, and whatever is waiting when
+the worker becomes free is coalesced into one infer_batch() call. Only one
+model copy is ever in use, no matter how many callers are waiting on it.
+
+Dynamic batching knobs:
+- max_batch_size: upper bound on requests per batch
+- max_wait_ms: how long the worker holds a partial batch open for more requests
+- max_queue_size: requests beyond this are rejected with QueueFullError
+
+If the engine has a batch_fits(images) method, a batch only grows while the
+engine predicts it still fits in memory; the request that would not fit
+waits for the next batch instead.
+
+If a coalesced batch fails, each of its requests is retried on its own, so
+one bad image only fails its own caller.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+
+from .utils.error_handler import QueueFullError
+
+logger = logging.getLogger(__name__)
+
+# Queue sentinel asking the worker thread to exit
+_SHUTDOWN = object()
+
+
+@dataclass
+class _Request:
+    """One queued inference request"""
+    image: Union[str, Path, "Image.Image"]
+    prompt: str
+    kwargs: Dict[str, Any]
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def group(self) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+        """Requests can share a batch only if prompt and model arguments match"""
+        return self.prompt, tuple(sorted((k, repr(v)) for k, v in self.kwargs.items()))
+
+
+class InferenceScheduler:
+    """
+    Queue in front of an inference engine, drained by one worker thread.
+
+    Example:
+        >>> scheduler = InferenceScheduler(engine, max_batch_size=8)
+        >>> result = await scheduler.ainfer(image)
+    """
+
+    def __init__(
+        self,
+        engine,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 0,
+        max_queue_size: int = 0
+    ):
+        """
+        Initialize the scheduler and start its worker thread.
+
+        Args:
+            engine: Object with an infer_batch(images, prompt, batch_size, **kwargs) method
+            max_batch_size: Maximum number of queued requests coalesced into one batch
+            max_wait_ms: Time to keep a partial batch open for late arrivals
+                (0 runs whatever is queued immediately)
+            max_queue_size: Maximum number of waiting requests; submit() raises
+                QueueFullError beyond it (0 for unbounded)
+        """
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be >= 1, got {max_batch_size}")
+
+        self.engine = engine
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_queue_size = max_queue_size
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "rejected": 0,
+            "completed": 0,
+            "failed": 0,
+            "batches": 0,
+            "deferred_for_memory": 0,
+            "queue_wait_ms_total": 0.0,
+            "inference_ms_total": 0.0,
+        }
+        # Requests taken off the queue that did not fit the current batch's group
+        self._deferred: Deque[_Request] = deque()
+        # Makes checking _closed and queueing one step, so nothing is queued after _SHUTDOWN
+        self._submit_lock = threading.Lock()
+        self._closed = False
+
+        self._worker = threading.Thread(
+            target=self._run, name="deepseek-visor-inference", daemon=True
+        )
+        self._worker.start()
+
+    def submit(
+        self,
+        image: Union[str, Path, "Image.Image"],
+        prompt: str,
+        **kwargs
+    ) -> Future:
+        """
+        Queue an inference request.
+
+        Returns:
+            concurrent.futures.Future resolving to the engine's result dict
+        """
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("InferenceScheduler is closed")
+
+            if self.max_queue_size and self.pending() >= self.max_queue_size:
+                with self._stats_lock:
+                    self._stats["rejected"] += 1
+                raise QueueFullError(
+                    f"Inference queue is full ({self.max_queue_size} requests waiting)"
+                )
+
+            request = _Request(image, prompt, kwargs)
+            with self._stats_lock:
+                self._stats["submitted"] += 1
+            self._queue.put(request)
+        return request.future
+
+    def pending(self) -> int:
+        """Number of requests waiting for the worker"""
+        return self._queue.qsize() + len(self._deferred)
+
+    def stats(self) -> Dict[str, Any]:
+        """Throughput and latency counters since the scheduler started"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        served = stats["completed"] + stats["failed"]
+        stats["pending"] = self.pending()
+        stats["avg_batch_size"] = served / stats["batches"] if stats["batches"] else 0.0
+        stats["avg_queue_wait_ms"] = stats.pop("queue_wait_ms_total") / served if served else 0.0
+        stats["avg_inference_ms"] = (
+            stats.pop("inference_ms_total") / stats["batches"] if stats["batches"] else 0.0
+        )
+        return stats
+
+    async def ainfer(
+        self,
+        image: Union[str, Path, "Image.Image"],
+        prompt: str,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Queue an inference request and await its result without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(image, prompt, **kwargs))
+
+    def close(self, timeout: Optional[float] = None):
+        """Stop accepting requests and let the worker finish what is already queued"""
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_SHUTDOWN)
+        self._worker.join(timeout)
+
+    def _next_batch(self) -> Optional[List[_Request]]:
+        """Block for the next request, then coalesce compatible waiting requests"""
+        if self._deferred:
+            first = self._deferred.popleft()
+        else:
+            first = self._queue.get()
+            if first is _SHUTDOWN:
+                return None
+
+        batch = [first]
+
+        # Deferred requests were queued earlier, so they take precedence
+        for request in list(self._deferred):
+            if len(batch) >= self.max_batch_size:
+                break
+            if request.group == first.group:
+                if not self._fits(batch, request):
+                    return batch
+                self._deferred.remove(request)
+                batch.append(request)
+
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            try:
+                remaining = deadline - time.perf_counter()
+                if remaining > 0:
+                    request = self._queue.get(timeout=remaining)
+                else:
+                    request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is _SHUTDOWN:
+                # Re-queue so the worker exits once everything ahead of it is served
+                self._queue.put(_SHUTDOWN)
+                break
+            if request.group != first.group:
+                self._deferred.append(request)
+            elif self._fits(batch, request):
+                batch.append(request)
+            else:
+                # Full as far as memory goes: the request waits for the next batch
+                self._deferred.append(request)
+                break
+
+        return batch
+
+    def _fits(self, batch: List[_Request], request: _Request) -> bool:
+        """Whether the engine predicts batch plus request fits in memory"""
+        batch_fits = getattr(self.engine, "batch_fits", None)
+        if batch_fits is None or batch_fits([r.image for r in batch + [request]]):
+            return True
+
+        with self._stats_lock:
+            self._stats["deferred_for_memory"] += 1
+        logger.debug(f"Batch of {len(batch)} is full for memory, deferring request")
+        return False
+
+    def _run(self):
+        """Worker loop: run each coalesced batch through the engine"""
+        try:
+            while True:
+                batch = self._next_batch()
+                if batch is None:
+                    break
+
+                # Skip requests whose callers have already given up
+                batch = [r for r in batch if r.future.set_running_or_notify_cancel()]
+                if batch:
+                    self._run_batch(batch)
+        finally:
+            self._fail_leftovers()
+
+        logger.debug("Inference worker stopped")
+
+    def _run_batch(self, batch: List[_Request]):
+        """Run one batch and resolve its futures; a failed batch is retried request by request"""
+        logger.debug(f"Running coalesced batch of {len(batch)} request(s)")
+        started_at = time.perf_counter()
+        try:
+            results = self.engine.infer_batch(
+                [r.image for r in batch],
+                batch[0].prompt,
+                batch_size=len(batch),
+                **batch[0].kwargs
+            )
+            for request, result in zip(batch, results):
+                result["metadata"]["queue_wait_ms"] = int(
+                    (started_at - request.enqueued_at) * 1000
+                )
+                result["metadata"]["scheduler_batch_size"] = len(batch)
+        except Exception as e:
+            # Never let one bad batch kill the worker thread, or fail unrelated callers
+            if len(batch) > 1:
+                logger.warning(f"Batch of {len(batch)} failed ({e}); retrying requests one by one")
+                for request in batch:
+                    self._run_batch([request])
+                return
+            self._record(batch, started_at, failed=True)
+            batch[0].future.set_exception(e)
+            return
+
+        self._record(batch, started_at)
+        for request, result in zip(batch, results):
+            request.future.set_result(result)
+
+    def _fail_leftovers(self):
+        """Fail requests still waiting when the worker exits, so no caller waits forever"""
+        leftovers = list(self._deferred)
+        self._deferred.clear()
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not _SHUTDOWN:
+                leftovers.append(request)
+
+        for request in leftovers:
+            if request.future.set_running_or_notify_cancel():
+                request.future.set_exception(RuntimeError("InferenceScheduler is closed"))
+
+    def _record(self, batch: List[_Request], started_at: float, failed: bool = False):
+        """Update counters after a batch finishes"""
+        finished_at = time.perf_counter()
+        with self._stats_lock:
+            self._stats["batches"] += 1
+            self._stats["failed" if failed else "completed"] += len(batch)
+            self._stats["inference_ms_total"] += (finished_at - started_at) * 1000
+            self._stats["queue_wait_ms_total"] += sum(
+                (started_at - r.enqueued_at) * 1000 for r in batch
+            )
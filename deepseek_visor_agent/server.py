@@ -0,0 +1,252 @@
+"""
+REST API server - Serve one shared model to many HTTP clients
+
+All requests share a single DeepSeekOCRInference. Incoming pages are queued on
+the engine's InferenceScheduler, which forms dynamic micro-batches (bounded by
+max batch size and max wait time) and rejects requests with HTTP 503 when the
+queue is full instead of letting latency grow without bound.
+
+Endpoints:
+    POST /v1/ocr        Image upload -> markdown
+    POST /v1/documents  Image or PDF upload -> markdown + structured fields
+    GET  /v1/stats      Batching and latency statistics
+    GET  /health        Liveness check
+
+Requires the "api" extra:
+    pip install deepseek-visor-agent[api]
+
+Run:
+    python -m deepseek_visor_agent.server --host 0.0.0.0 --port 8000
+"""
+
+import argparse
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Deque, Dict, Optional
+
+try:
+    from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+except ImportError:
+    raise ImportError(
+        "The API server requires FastAPI. Install with: pip install deepseek-visor-agent[api]"
+    )
+
+from .backends import DEFAULT_PROMPT
+from .tool import DOCUMENT_TYPES, VisionDocumentTool
+from .utils.document_input import open_document
+from .utils.error_handler import ImageProcessingError, OCRError, QueueFullError
+from .utils.pdf_processor import OCR_POLICIES, PDFProcessingError
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """Rolling window of request latencies per endpoint"""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, latency_ms: float):
+        """Add one request's end-to-end latency"""
+        with self._lock:
+            self._samples.setdefault(endpoint, deque(maxlen=self.window)).append(latency_ms)
+            self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Request count and p50/p95/p99/max latency per endpoint over the window"""
+        with self._lock:
+            snapshot = {k: sorted(v) for k, v in self._samples.items()}
+            counts = dict(self._counts)
+
+        summary = {}
+        for endpoint, samples in snapshot.items():
+            summary[endpoint] = {
+                "requests": counts[endpoint],
+                "p50_ms": _percentile(samples, 0.50),
+                "p95_ms": _percentile(samples, 0.95),
+                "p99_ms": _percentile(samples, 0.99),
+                "max_ms": samples[-1],
+            }
+        return summary
+
+
+def _percentile(sorted_samples, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_samples) - 1, int(round(fraction * (len(sorted_samples) - 1))))
+    return round(sorted_samples[index], 2)
+
+
+def create_app(
+    tool: Optional[VisionDocumentTool] = None,
+    max_batch_size: int = 8,
+    max_wait_ms: float = 10,
+    max_queue_size: int = 64
+) -> FastAPI:
+    """
+    Build the FastAPI application around one shared VisionDocumentTool.
+
+    Args:
+        tool: Tool whose engine serves every request (default: VisionDocumentTool())
+        max_batch_size: Maximum pages per batched inference call
+        max_wait_ms: How long a partial batch waits for more requests
+        max_queue_size: Queued pages beyond which requests get HTTP 503
+
+    Returns:
+        FastAPI application
+    """
+    tool = tool or VisionDocumentTool()
+    scheduler = tool.engine.start_scheduler(
+        max_batch_size=max_batch_size,
+        max_wait_ms=max_wait_ms,
+        max_queue_size=max_queue_size
+    )
+    latencies = LatencyTracker()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        scheduler.close()
+
+    app = FastAPI(title="DeepSeek Visor Agent", lifespan=lifespan)
+    app.state.tool = tool
+    app.state.scheduler = scheduler
+    app.state.latencies = latencies
+
+    @app.get("/health")
+    async def health() -> Dict[str, Any]:
+        return {"status": "ok"}
+
+    @app.get("/v1/stats")
+    async def stats() -> Dict[str, Any]:
+        return {
+            "scheduler": scheduler.stats(),
+            "latency": latencies.summary(),
+        }
+
+    @app.post("/v1/ocr")
+    async def ocr(file: UploadFile = File(...), prompt: str = Form(DEFAULT_PROMPT)) -> Dict[str, Any]:
+        start_time = time.perf_counter()
+
+        data = await file.read()
+        # Same decoding as /v1/documents: palette, alpha, CMYK and 16-bit images become RGB
+        with _http_errors():
+            document = open_document(data)
+        if document.kind != "image":
+            raise HTTPException(
+                status_code=400, detail="/v1/ocr takes a single image; send PDFs to /v1/documents"
+            )
+
+        with _http_errors():
+            result = await scheduler.ainfer(document.data, prompt)
+
+        total_ms = (time.perf_counter() - start_time) * 1000
+        latencies.record("/v1/ocr", total_ms)
+
+        metadata = result["metadata"]
+        return {
+            "markdown": result["markdown"],
+            "metadata": metadata,
+            "latency_ms": {
+                "total": int(total_ms),
+                "queue_wait": metadata.get("queue_wait_ms", 0),
+                "inference": metadata["inference_time_ms"],
+            },
+        }
+
+    @app.post("/v1/documents")
+    async def documents(
+        file: UploadFile = File(...),
+        document_type: str = Form("auto"),
+        extract_fields: bool = Form(True),
+        ocr_policy: str = Form("always")
+    ) -> Dict[str, Any]:
+        start_time = time.perf_counter()
+        if document_type not in DOCUMENT_TYPES:
+            raise HTTPException(
+                status_code=400, detail=f"document_type must be one of {DOCUMENT_TYPES}"
+            )
+        if ocr_policy not in OCR_POLICIES:
+            raise HTTPException(
+                status_code=400, detail=f"ocr_policy must be one of {OCR_POLICIES}"
+            )
+
+        # Processed in memory: the format is sniffed from the upload's bytes
+        data = await file.read()
+        with _http_errors():
+            result = await tool.arun(
+                data,
+                document_type=document_type,
+                extract_fields=extract_fields,
+                ocr_policy=ocr_policy
+            )
+
+        total_ms = (time.perf_counter() - start_time) * 1000
+        latencies.record("/v1/documents", total_ms)
+
+        result["latency_ms"] = {"total": int(total_ms)}
+        return result
+
+    return app
+
+
+@contextmanager
+def _http_errors():
+    """Map inference errors to HTTP status codes"""
+    try:
+        yield
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except (PDFProcessingError, ImageProcessingError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OCRError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def main():
+    """Command-line entry point: run the server with uvicorn"""
+    parser = argparse.ArgumentParser(description="DeepSeek Visor Agent API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--inference-mode", default="auto")
+    parser.add_argument("--device", default="auto")
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=10)
+    parser.add_argument("--max-queue-size", type=int, default=64)
+    parser.add_argument("--snapshot-dir", default=None,
+                        help="Directory for a memory-mapped weight snapshot (faster restarts)")
+    parser.add_argument("--no-warmup", action="store_true",
+                        help="Load the model on the first request instead of at startup")
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise ImportError(
+            "The API server requires uvicorn. Install with: pip install deepseek-visor-agent[api]"
+        )
+
+    logging.basicConfig(level=logging.INFO)
+    tool = VisionDocumentTool(
+        inference_mode=args.inference_mode, device=args.device, snapshot_dir=args.snapshot_dir
+    )
+    if not args.no_warmup:
+        # Pay model loading and first-call compilation before accepting traffic
+        logger.info(f"Warm-up: {tool.wait_until_ready()}")
+
+    app = create_app(
+        tool,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        max_queue_size=args.max_queue_size
+    )
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
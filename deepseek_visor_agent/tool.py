@@ -6,18 +6,96 @@ Uses DeepSeek-OCR with automatic inference mode selection.
 Supports both images and PDF files.
 """
 
-from typing import Dict, Union, Any, Optional, List
+from typing import Dict, Union, Any, Optional, List, Iterator, Tuple, Callable, Deque
+from collections import deque
 from pathlib import Path
+import asyncio
 import logging
+import threading
+import time
 
-from .infer import DeepSeekOCRInference
+from PIL import Image
+
+from .backends import InferenceBackend, create_backend
+from .device_manager import INFERENCE_MODES
+from .page_filter import PageFilter
+from .pipeline import PagePipeline
+from .render_planner import RenderPlanner
 from .parsers.classifier import classify_document
+from .parsers.incremental import DocumentAnalysis
 from .parsers.invoice import InvoiceParser
 from .parsers.contract import ContractParser
-from .utils.pdf_processor import pdf_to_images, is_pdf_file, PDFProcessingError
+from .utils.cache import OCRCache
+from .utils.document_input import DocumentSource, open_document
+from .utils.pdf_processor import (
+    OCR_POLICIES, PageText, iter_pdf_pages, pdf_page_count, PDFProcessingError
+)
 
 logger = logging.getLogger(__name__)
 
+# Separator between pages in combined PDF markdown (same as DeepSeek-OCR official)
+PAGE_SEPARATOR = "\n\n<--- Page Split --->\n\n"
+
+# Render resolution when the inference mode does not determine one
+DEFAULT_PDF_DPI = 144
+
+# Supported values for run(stop_when=...)
+STOP_CONDITIONS = ("fields_complete",)
+
+# Supported values for run(document_type=...)
+DOCUMENT_TYPES = ("auto", "invoice", "contract", "resume", "general")
+
+
+class _PageCollector:
+    """
+    The processed pages of one PDF, in page order, for run() and arun().
+
+    Each page is merged into a DocumentAnalysis on the thread that collects
+    it, and add() decides whether the stop condition is met.
+    """
+
+    def __init__(
+        self,
+        analysis: DocumentAnalysis,
+        stop_when: Optional[str] = None,
+        min_confidence: float = 1.0
+    ):
+        self.analysis = analysis
+        self.stop_when = stop_when
+        self.min_confidence = min_confidence
+
+        self.markdowns: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+        self.blank_pages: List[int] = []
+        self.duplicate_pages: Dict[int, int] = {}
+        self.text_layer_pages: List[int] = []
+        self.stop_reason: Optional[str] = None
+
+    def add(self, page_num: int, markdown: str, metadata: Dict[str, Any]) -> bool:
+        """Collect the next page; returns True once no further page is needed"""
+        self.markdowns.append(markdown)
+        self.metadata.append(metadata)
+        if metadata.get("skipped") == "blank":
+            self.blank_pages.append(page_num)
+        elif metadata.get("skipped") == "duplicate":
+            self.duplicate_pages[page_num] = metadata["duplicate_of"]
+        elif metadata["source"] == "text_layer":
+            self.text_layer_pages.append(page_num)
+
+        self.analysis.add(page_num, markdown)
+        if (
+            self.stop_when == "fields_complete"
+            and self.analysis.has_required_fields
+            and self.analysis.confidence >= self.min_confidence
+        ):
+            self.stop_reason = "fields_complete"
+            logger.info(
+                f"Required {self.analysis.document_type} fields found after "
+                f"{len(self.markdowns)} page(s); stopping"
+            )
+            return True
+        return False
+
 
 class VisionDocumentTool:
     """
@@ -29,22 +107,45 @@ class VisionDocumentTool:
     def __init__(
         self,
         inference_mode: str = "auto",
-        device: str = "auto"
+        device: str = "auto",
+        cache: Optional[OCRCache] = None,
+        backend: Union[str, InferenceBackend] = "deepseek",
+        preload: bool = False,
+        snapshot_dir: Optional[Union[str, Path]] = None
     ):
         """
         Initialize the Vision Document Tool.
 
         Args:
-            inference_mode: "auto" | "tiny" | "small" | "base" | "large" | "gundam"
+            inference_mode: "auto" | "adaptive" | "tiny" | "small" | "base" | "large" | "gundam"
                 - auto: Automatically select based on available GPU memory
+                - adaptive: Choose a mode per page from its size and text density,
+                  up to the auto-selected mode (see ModePlanner)
                 - tiny: 512x512 resolution (CPU compatible)
                 - small: 640x640 resolution
                 - base: 1024x1024 resolution
                 - large: 1280x1280 resolution
                 - gundam: Dynamic resolution with cropping
             device: "auto" | "cuda" | "mps" | "cpu"
+            cache: Optional OCRCache; repeated pages are answered without inference
+                (used by the built-in "deepseek" backend)
+            backend: "deepseek" | "stub" | an InferenceBackend instance
+                - deepseek: DeepSeek-OCR model (default)
+                - stub: Deterministic synthetic markdown, no model required
+            preload: Load and warm up the model on a background thread right away
+                (see InferenceBackend.warmup()) instead of on the first request;
+                wait_until_ready() blocks until it is done
+            snapshot_dir: Directory for a device-ready, memory-mapped weight snapshot
+                that makes later starts load in seconds (used by the built-in
+                "deepseek" backend; see DeepSeekOCRInference)
         """
-        self.engine = DeepSeekOCRInference(inference_mode, device)
+        if cache is not None and backend not in (None, "deepseek"):
+            logger.warning("cache is only used by the built-in DeepSeek backend; ignoring it")
+        if snapshot_dir is not None and backend not in (None, "deepseek"):
+            logger.warning("snapshot_dir is only used by the built-in DeepSeek backend; ignoring it")
+        self.engine = create_backend(
+            backend, inference_mode, device, cache=cache, snapshot_dir=snapshot_dir
+        )
 
         # Initialize parsers
         self.parsers = {
@@ -52,82 +153,264 @@ class VisionDocumentTool:
             "contract": ContractParser(),
         }
 
+        # Background warm-up started by preload=True
+        self._warmup_thread: Optional[threading.Thread] = None
+        self._warmup_report: Optional[Dict[str, Any]] = None
+        self._warmup_error: Optional[BaseException] = None
+        if preload:
+            self._warmup_thread = threading.Thread(
+                target=self._warmup, name="deepseek-visor-warmup", daemon=True
+            )
+            self._warmup_thread.start()
+
         logger.info("VisionDocumentTool initialized")
 
+    def _warmup(self):
+        """Warm up the engine, keeping the report or the load error for wait_until_ready()"""
+        try:
+            self._warmup_report = self.engine.warmup()
+        except Exception as e:
+            logger.error(f"Preloading the model failed: {e}")
+            self._warmup_error = e
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Block until the preload started with preload=True has finished.
+
+        Without preload, warms up the engine in the calling thread instead
+        (once; later calls return the same report).
+
+        Args:
+            timeout: Maximum seconds to wait for the background preload
+
+        Returns:
+            dict: The engine's warm-up report (load and per-mode warm-up times)
+
+        Raises:
+            TimeoutError: If the preload is still running after timeout
+            ModelLoadError: If the model failed to load
+        """
+        if self._warmup_thread is not None:
+            self._warmup_thread.join(timeout)
+            if self._warmup_thread.is_alive():
+                raise TimeoutError(f"Model preload still running after {timeout}s")
+        elif self._warmup_report is None and self._warmup_error is None:
+            self._warmup()
+
+        if self._warmup_error is not None:
+            raise self._warmup_error
+        return self._warmup_report
+
     def run(
         self,
-        image_path: Union[str, Path],
+        image_path: DocumentSource,
         document_type: str = "auto",
         extract_fields: bool = True,
-        pdf_dpi: int = 144,
+        pdf_dpi: Union[int, str] = "auto",
         pdf_start_page: Optional[int] = None,
-        pdf_end_page: Optional[int] = None
+        pdf_end_page: Optional[int] = None,
+        pdf_batch_size: int = 1,
+        workers: int = 1,
+        stop_when: Optional[str] = None,
+        min_confidence: float = 1.0,
+        max_pages: Optional[int] = None,
+        skip_pages: bool = False,
+        ocr_policy: str = "always"
     ) -> Dict[str, Any]:
         """
         Main entry point for document processing.
 
-        Supports both image files (.jpg, .png, etc.) and PDF files.
-        For PDFs, each page is processed separately and results are combined.
+        Supports both image files (.jpg, .png, etc.) and PDF files, on disk or in
+        memory: bytes, memoryviews and binary file objects (e.g. an upload's
+        BytesIO) are recognized by their magic bytes and processed without
+        touching disk, and numpy arrays and PIL images are taken as page images.
+        For PDFs, each page is processed separately and results are combined:
+        the document type is classified from all pages, and fields are parsed
+        page by page and merged (header fields from the first page that has
+        them, the total from the page with the most specific label, list
+        fields such as parties from every page).
 
         Args:
-            image_path: Path to the document image or PDF file
+            image_path: Path to the document image or PDF file, the document's
+                bytes or a binary file object, or an image as a numpy array or PIL image
             document_type: "auto" | "invoice" | "contract" | "resume" | "general"
             extract_fields: Whether to extract structured fields
-            pdf_dpi: DPI for PDF rendering (default: 144, same as DeepSeek-OCR official)
+            pdf_dpi: DPI for PDF rendering, or "auto" (default) to render each page
+                just large enough for the engine's inference mode (see RenderPlanner;
+                144, same as DeepSeek-OCR official, for adaptive or unknown modes)
             pdf_start_page: First page to process for PDFs (0-indexed), None for first page
             pdf_end_page: Last page to process for PDFs (0-indexed), None for last page
+            pdf_batch_size: Number of PDF pages handed to the engine's infer_batch()
+                per call. DeepSeek-OCR decodes one page at a time, so this does not
+                raise its throughput; backends with a batched forward pass can use it
+            workers: Number of processes rasterizing PDF pages in parallel, ahead of
+                inference (1 renders each page in the calling thread)
+            stop_when: PDFs only. "fields_complete" stops rendering and inference
+                once the document type's required fields reach min_confidence
+                (e.g. invoice total/date/vendor); later pages are never processed,
+                so their content is not in the result. None processes every page.
+                Stopping depends on the extracted fields, so stop_when requires
+                extract_fields=True (ValueError otherwise)
+            min_confidence: Share of required fields that must be found to stop
+                with stop_when="fields_complete" (1.0 = all of them)
+            max_pages: PDFs only. Process at most this many pages of the range
+            skip_pages: PDFs only. Skip inference for blank pages and for pages that
+                duplicate an earlier page of the document (see PageFilter);
+                duplicates reuse the earlier page's markdown
+            ocr_policy: PDFs only. Where page text comes from:
+                - "always" (default): OCR every page
+                - "auto": read pages with a complete text layer (digital PDFs)
+                  from it without inference, OCR the rest
+                - "never": never run inference on PDF pages; pages without a
+                  complete text layer (e.g. scans) get whatever text layer they
+                  have, which for a scanned page is usually an empty page
+                A text layer counts as complete when its text covers more of the
+                page than its images do (see extract_text_layer()). Vector
+                drawings are not considered, so a page whose content is vector
+                graphics (charts, diagrams, outlined text) with a little text
+                also counts as complete and its graphics are not read.
 
         Returns:
             dict: {
                 "markdown": str,           # Markdown representation (multi-page PDFs joined with separators)
                 "fields": dict,             # Extracted structured fields (merged from all pages)
-                "confidence": float,        # Average confidence score
+                "field_pages": dict,        # PDFs only: pages each merged field came from
+                "confidence": float,        # Confidence score of the (merged) fields
                 "document_type": str,       # Detected or specified type
                 "metadata": dict,           # Inference metadata
                 "pages": int                # Number of pages processed (1 for images, N for PDFs)
             }
 
+            When stop_when or max_pages is set, metadata also has "pages_skipped"
+            (pages of the range that were never processed) and "stop_reason"
+            ("fields_complete", "max_pages" or None). With skip_pages, metadata has
+            "blank_pages" (page numbers) and "duplicate_pages" ({page: earlier page}).
+            With ocr_policy "auto" or "never", metadata has "text_layer_pages" (page
+            numbers read from the text layer instead of OCRed).
+
         Raises:
             PDFProcessingError: If PDF processing fails
             ImageProcessingError: If image processing fails
         """
-        image_path = Path(image_path)
-        logger.info(f"Processing document: {image_path}")
+        document = open_document(image_path)
+        logger.info(f"Processing document: {document.name}")
 
-        # Check if input is a PDF file
-        if is_pdf_file(image_path):
+        if document.kind == "pdf":
             return self._process_pdf(
-                image_path,
+                document.data,
                 document_type=document_type,
                 extract_fields=extract_fields,
                 dpi=pdf_dpi,
                 start_page=pdf_start_page,
-                end_page=pdf_end_page
+                end_page=pdf_end_page,
+                batch_size=pdf_batch_size,
+                workers=workers,
+                stop_when=stop_when,
+                min_confidence=min_confidence,
+                max_pages=max_pages,
+                skip_pages=skip_pages,
+                ocr_policy=ocr_policy
             )
         else:
             return self._process_image(
-                image_path,
+                document.data,
                 document_type=document_type,
                 extract_fields=extract_fields
             )
 
-    def _process_image(
+    def run_stream(
         self,
-        image_path: Path,
+        image_path: DocumentSource,
         document_type: str = "auto",
-        extract_fields: bool = True
-    ) -> Dict[str, Any]:
-        """Process a single image file"""
-        # 1. Run OCR inference
-        result = self.engine.infer(image_path)
-        markdown = result["markdown"]
+        extract_fields: bool = True,
+        pdf_dpi: Union[int, str] = "auto",
+        pdf_start_page: Optional[int] = None,
+        pdf_end_page: Optional[int] = None,
+        pdf_batch_size: int = 1,
+        workers: int = 1,
+        skip_pages: bool = False,
+        ocr_policy: str = "always"
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Process a document page by page, yielding each page's result as soon as it is ready.
+
+        PDF pages are rendered, inferred and parsed in an overlapping pipeline with
+        bounded queues between the stages, so memory use does not grow with the page
+        count and the first result is available after a single render and inference.
+        Image files yield exactly one result.
 
-        # 2. Classify document type if needed
+        Args:
+            image_path: Path to the document image or PDF file, or a document in
+                memory (see run())
+            document_type: "auto" | "invoice" | "contract" | "resume" | "general"
+                (for PDFs, "auto" reports the type given all pages up to each page)
+            extract_fields: Whether to extract structured fields from each page
+            pdf_dpi: DPI for PDF rendering, or "auto" (default) to render each page
+                just large enough for the engine's inference mode (see RenderPlanner;
+                144, same as DeepSeek-OCR official, for adaptive or unknown modes)
+            pdf_start_page: First page to process for PDFs (0-indexed), None for first page
+            pdf_end_page: Last page to process for PDFs (0-indexed), None for last page
+            pdf_batch_size: Number of PDF pages handed to the engine's infer_batch()
+                per call, as for run() (pages are yielded once their batch completes)
+            workers: Number of processes rasterizing PDF pages in parallel, ahead of
+                inference (1 renders each page in the calling thread)
+            skip_pages: Skip inference for blank and duplicate PDF pages; their
+                metadata has "skipped" ("blank" | "duplicate") and, for duplicates,
+                "duplicate_of"
+            ocr_policy: "auto" | "always" | "never", as for run(); each page's
+                metadata has "source" ("ocr" | "text_layer" | "skipped")
+
+        Yields:
+            dict: {
+                "page": int,                # 0-indexed page number (0 for images)
+                "markdown": str,            # Markdown representation of this page
+                "fields": dict,             # Structured fields extracted from this page
+                "confidence": float,        # Confidence score for this page's fields
+                "document_type": str,       # Detected or specified type
+                "metadata": dict            # Inference metadata for this page
+            }
+
+        Raises:
+            PDFProcessingError: If PDF processing fails
+            ImageProcessingError: If image processing fails
+        """
+        document = open_document(image_path)
+        logger.info(f"Streaming document: {document.name}")
+
+        if document.kind == "pdf":
+            yield from self._stream_pdf(
+                document.data,
+                document_type=document_type,
+                extract_fields=extract_fields,
+                dpi=pdf_dpi,
+                start_page=pdf_start_page,
+                end_page=pdf_end_page,
+                batch_size=pdf_batch_size,
+                workers=workers,
+                skip_pages=skip_pages,
+                ocr_policy=ocr_policy
+            )
+        else:
+            result = self._process_image(
+                document.data,
+                document_type=document_type,
+                extract_fields=extract_fields
+            )
+            result["page"] = 0
+            del result["pages"]
+            yield result
+
+    def _analyze(
+        self,
+        markdown: str,
+        document_type: str = "auto",
+        extract_fields: bool = True
+    ) -> Tuple[str, Dict[str, Any], float]:
+        """Classify markdown and extract fields, returning (document_type, fields, confidence)"""
         if document_type == "auto":
             document_type = classify_document(markdown)
             logger.info(f"Detected document type: {document_type}")
 
-        # 3. Extract structured fields
         fields = {}
         confidence = 1.0
 
@@ -137,6 +420,40 @@ class VisionDocumentTool:
             confidence = parser.get_confidence()
             logger.info(f"Extracted {len(fields)} fields")
 
+        return document_type, fields, confidence
+
+    def _render_settings(self, dpi: Union[int, str]) -> Tuple[int, Optional[RenderPlanner]]:
+        """
+        Resolve a pdf_dpi argument to iter_pdf_pages()'s (dpi, render_planner)
+
+        "auto" plans the resolution of each page for the engine's inference
+        mode. Adaptive engines keep the fixed default: their ModePlanner
+        chooses modes from pixel sizes that assume pages rendered at it.
+        """
+        if dpi != "auto":
+            return dpi, None
+
+        mode = self.engine.config.get("inference_mode")
+        if self.engine.mode_planner is not None or mode not in INFERENCE_MODES:
+            return DEFAULT_PDF_DPI, None
+        return DEFAULT_PDF_DPI, RenderPlanner(mode)
+
+    def _process_image(
+        self,
+        image: Union[str, Image.Image],
+        document_type: str = "auto",
+        extract_fields: bool = True
+    ) -> Dict[str, Any]:
+        """Process a single image (file path or PIL image)"""
+        # 1. Run OCR inference
+        result = self.engine.infer(image)
+        markdown = result["markdown"]
+
+        # 2. Classify document type and extract structured fields
+        document_type, fields, confidence = self._analyze(
+            markdown, document_type, extract_fields
+        )
+
         return {
             "markdown": markdown,
             "fields": fields,
@@ -146,82 +463,456 @@ class VisionDocumentTool:
             "pages": 1
         }
 
-    def _process_pdf(
+    def _stream_pdf(
         self,
-        pdf_path: Path,
+        pdf_path: Union[str, bytes],
         document_type: str = "auto",
         extract_fields: bool = True,
-        dpi: int = 144,
+        dpi: Union[int, str] = "auto",
         start_page: Optional[int] = None,
-        end_page: Optional[int] = None
-    ) -> Dict[str, Any]:
+        end_page: Optional[int] = None,
+        batch_size: int = 1,
+        workers: int = 1,
+        read_ahead: int = 2,
+        skip_pages: bool = False,
+        ocr_policy: str = "always"
+    ) -> Iterator[Dict[str, Any]]:
         """
-        Process a PDF file by converting pages to images and processing each
+        Render, infer and parse PDF pages in batches of batch_size pages
+
+        The three stages run concurrently in a PagePipeline, so each page's
+        metadata includes "stage_timings_ms". Each page reports the document
+        type given all pages so far. Merged fields are collected by the
+        consumer (see _PageCollector), on its own thread as pages are yielded,
+        so they only ever hold pages the consumer has seen.
+
+        With skip_pages, a PageFilter checks each page on the render thread and
+        blank or duplicate pages bypass inference. Pages that iter_pdf_pages()
+        returns as text layers (see ocr_policy) bypass it the same way.
 
         Based on DeepSeek-OCR official PDF processing:
         https://github.com/deepseek-ai/DeepSeek-OCR/blob/master/DeepSeek-OCR-vllm/run_dpsk_ocr_pdf.py
         """
-        logger.info(f"Processing PDF: {pdf_path} (DPI: {dpi})")
+        logger.info(f"Processing PDF (DPI: {dpi})")
+
+        dpi, render_planner = self._render_settings(dpi)
+        pages = iter_pdf_pages(
+            pdf_path,
+            dpi=dpi,
+            start_page=start_page,
+            end_page=end_page,
+            workers=workers,
+            ocr_policy=ocr_policy,
+            render_planner=render_planner
+        )
+
+        # Per-page document types; only touched on the parse thread
+        running = DocumentAnalysis(self.parsers, document_type, extract_fields=False)
+
+        page_markdowns: Dict[int, str] = {}
+
+        def parse(page_num: int, result: Dict[str, Any]) -> Dict[str, Any]:
+            # Pages are parsed in order, so a duplicate's original is already known
+            self._resolve_page(page_num, result, page_markdowns if skip_pages else None)
+
+            # Classify incrementally: each page updates the document-level type
+            running.add(page_num, result["markdown"])
+            page_type, fields, confidence = self._analyze(
+                result["markdown"], running.document_type, extract_fields
+            )
+            return {
+                "page": page_num,
+                "markdown": result["markdown"],
+                "fields": fields,
+                "confidence": confidence,
+                "document_type": page_type,
+                "metadata": result["metadata"]
+            }
 
-        # Convert PDF to images
+        # Rendering, inference and parsing of consecutive pages overlap
+        yield from PagePipeline(
+            pages,
+            infer_batch=lambda images: self.engine.infer_batch(images, batch_size=batch_size),
+            parse=parse,
+            batch_size=batch_size,
+            queue_size=read_ahead,
+            prefilter=self._page_prefilter(skip_pages, ocr_policy)
+        )
+
+    def _page_prefilter(
+        self,
+        skip_pages: bool,
+        ocr_policy: str
+    ) -> Optional[Callable[[int, Any], Optional[Dict[str, Any]]]]:
+        """
+        Function answering pages that need no inference, or None if none can be skipped
+
+        Called with (page_num, page) in page order. Pages read from the text
+        layer are answered from it; with skip_pages, a PageFilter answers
+        blank and duplicate pages with empty results marked "skipped".
+        """
+        if not skip_pages and ocr_policy == "always":
+            return None
+
+        page_filter = PageFilter() if skip_pages else None
+
+        def prefilter(page_num: int, page) -> Optional[Dict[str, Any]]:
+            if isinstance(page, PageText):
+                return {
+                    "markdown": page.markdown,
+                    "raw_output": page.markdown,
+                    "metadata": {
+                        "source": "text_layer",
+                        "device": self.engine.config["device"],
+                        "inference_time_ms": 0,
+                        "text_coverage": page.text_coverage,
+                        "image_coverage": page.image_coverage,
+                    },
+                }
+            if page_filter is None:
+                return None
+            skipped = page_filter.check(page_num, page)
+            if skipped is None:
+                return None
+            skipped.update(source="skipped", device=self.engine.config["device"], inference_time_ms=0)
+            return {"markdown": "", "raw_output": "", "metadata": skipped}
+
+        return prefilter
+
+    @staticmethod
+    def _resolve_page(
+        page_num: int,
+        result: Dict[str, Any],
+        page_markdowns: Optional[Dict[int, str]]
+    ):
+        """
+        Finish a page's result in page order: mark its source and give a
+        duplicate page the markdown of the page it repeats
+
+        Args:
+            page_num: The page's number
+            result: Inference or prefilter result, updated in place
+            page_markdowns: Markdown of the inferred pages so far, by page number
+                (None when duplicates are not skipped)
+        """
+        result["metadata"].setdefault("source", "ocr")
+        if page_markdowns is None:
+            return
+        duplicate_of = result["metadata"].get("duplicate_of")
+        if duplicate_of is not None:
+            result["markdown"] = result["raw_output"] = page_markdowns[duplicate_of]
+        elif "skipped" not in result["metadata"]:
+            page_markdowns[page_num] = result["markdown"]
+
+    def _process_pdf(
+        self,
+        pdf_path: Union[str, bytes],
+        document_type: str = "auto",
+        extract_fields: bool = True,
+        dpi: Union[int, str] = "auto",
+        start_page: Optional[int] = None,
+        end_page: Optional[int] = None,
+        batch_size: int = 1,
+        workers: int = 1,
+        stop_when: Optional[str] = None,
+        min_confidence: float = 1.0,
+        max_pages: Optional[int] = None,
+        skip_pages: bool = False,
+        ocr_policy: str = "always"
+    ) -> Dict[str, Any]:
+        """
+        Process a PDF file page by page and combine the results
+
+        Pages are streamed through _stream_pdf(), so only the few page bitmaps
+        queued between pipeline stages are held in memory at a time. Each page
+        is classified and parsed once as it arrives and merged into the
+        document's fields (see DocumentAnalysis).
+
+        With stop_when or max_pages, pages are processed in order and the
+        pipeline is stopped (rendering and inference included) as soon as the
+        condition is met; read-ahead is kept to one batch to limit wasted work.
+        """
+        end_page, pages_in_range = self._page_budget(
+            pdf_path, start_page, end_page, stop_when, max_pages, ocr_policy, extract_fields
+        )
+        early_stop = pages_in_range is not None
+
+        collector = _PageCollector(
+            DocumentAnalysis(self.parsers, document_type, extract_fields),
+            stop_when,
+            min_confidence
+        )
+        start_time = time.perf_counter()
+
+        stream = self._stream_pdf(
+            pdf_path,
+            document_type=document_type,
+            extract_fields=False,
+            dpi=dpi,
+            start_page=start_page,
+            end_page=end_page,
+            batch_size=batch_size,
+            workers=workers,
+            read_ahead=1 if early_stop else 2,
+            skip_pages=skip_pages,
+            ocr_policy=ocr_policy
+        )
         try:
-            images = pdf_to_images(
-                pdf_path,
-                dpi=dpi,
-                start_page=start_page,
-                end_page=end_page
-            )
+            for page in stream:
+                if collector.add(page["page"], page["markdown"], page["metadata"]):
+                    break
         except PDFProcessingError as e:
             logger.error(f"PDF processing failed: {e}")
             raise
+        finally:
+            # Stops rendering and inference of pages that are no longer needed
+            stream.close()
 
-        logger.info(f"Processing {len(images)} pages from PDF")
-
-        # Process each page
-        page_results = []
-        for page_num, image in enumerate(images):
-            logger.debug(f"Processing page {page_num + 1}/{len(images)}")
+        return self._finish_pdf(collector, start_time, skip_pages, ocr_policy, pages_in_range)
 
-            # Run OCR on this page's image
-            result = self.engine.infer(image)
-            page_results.append(result)
+    def _page_budget(
+        self,
+        pdf_path: Union[str, bytes],
+        start_page: Optional[int],
+        end_page: Optional[int],
+        stop_when: Optional[str],
+        max_pages: Optional[int],
+        ocr_policy: str,
+        extract_fields: bool
+    ) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Validate the early-stop arguments of run()/arun() and apply max_pages
 
-        # Combine results from all pages
-        # Join markdown with page separators (same as DeepSeek-OCR official)
-        page_separator = "\n\n<--- Page Split --->\n\n"
-        combined_markdown = page_separator.join([r["markdown"] for r in page_results])
+        Returns:
+            (end_page, pages_in_range): the last page to render, and the number of
+            pages in the requested range when stop_when or max_pages is set (else None)
+        """
+        if stop_when is not None and stop_when not in STOP_CONDITIONS:
+            raise ValueError(f"stop_when must be one of {STOP_CONDITIONS} or None, got {stop_when!r}")
+        if stop_when is not None and not extract_fields:
+            raise ValueError("stop_when needs extracted fields; it cannot be used with extract_fields=False")
+        if max_pages is not None and max_pages < 1:
+            raise ValueError(f"max_pages must be >= 1, got {max_pages}")
+        if ocr_policy not in OCR_POLICIES:
+            raise ValueError(f"ocr_policy must be one of {OCR_POLICIES}, got {ocr_policy!r}")
+
+        if stop_when is None and max_pages is None:
+            return end_page, None
+
+        first = start_page if start_page is not None else 0
+        last = end_page if end_page is not None else pdf_page_count(pdf_path) - 1
+        pages_in_range = last - first + 1
+        if max_pages is not None and pages_in_range > max_pages:
+            # Never render pages beyond the budget
+            end_page = first + max_pages - 1
+        return end_page, pages_in_range
+
+    def _finish_pdf(
+        self,
+        collector: "_PageCollector",
+        start_time: float,
+        skip_pages: bool,
+        ocr_policy: str,
+        pages_in_range: Optional[int]
+    ) -> Dict[str, Any]:
+        """Combine the collected pages and add the run's skip and stop metadata"""
+        result = self._combine_pages(collector.markdowns, collector.metadata, collector.analysis)
+        result["metadata"]["wall_time_ms"] = int((time.perf_counter() - start_time) * 1000)
+
+        if skip_pages:
+            result["metadata"]["blank_pages"] = collector.blank_pages
+            result["metadata"]["duplicate_pages"] = collector.duplicate_pages
+            logger.info(
+                f"Skipped {len(collector.blank_pages)} blank and "
+                f"{len(collector.duplicate_pages)} duplicate pages"
+            )
 
-        # Classify document type from first page (or combined text)
-        if document_type == "auto":
-            document_type = classify_document(page_results[0]["markdown"])
-            logger.info(f"Detected document type: {document_type}")
+        if ocr_policy != "always":
+            result["metadata"]["text_layer_pages"] = collector.text_layer_pages
+            logger.info(
+                f"Read {len(collector.text_layer_pages)} of {len(collector.markdowns)} pages "
+                f"from the text layer"
+            )
 
-        # Extract fields from combined markdown
-        fields = {}
-        confidence = 1.0
+        if pages_in_range is not None:
+            pages_skipped = pages_in_range - len(collector.markdowns)
+            stop_reason = collector.stop_reason
+            if stop_reason is None and pages_skipped > 0:
+                stop_reason = "max_pages"
+            result["metadata"]["pages_skipped"] = pages_skipped
+            result["metadata"]["stop_reason"] = stop_reason
 
-        if extract_fields and document_type in self.parsers:
-            parser = self.parsers[document_type]
-            # For multi-page PDFs, parse the combined markdown
-            fields = parser.parse(combined_markdown)
-            confidence = parser.get_confidence()
-            logger.info(f"Extracted {len(fields)} fields from {len(images)} pages")
+        return result
 
-        # Combine metadata (use average inference time, first page's device info)
-        combined_metadata = page_results[0]["metadata"].copy()
-        avg_inference_time = sum(r["metadata"]["inference_time_ms"] for r in page_results) / len(page_results)
-        combined_metadata["inference_time_ms"] = int(avg_inference_time)
-        combined_metadata["total_inference_time_ms"] = sum(r["metadata"]["inference_time_ms"] for r in page_results)
+    def _combine_pages(
+        self,
+        page_markdowns: List[str],
+        page_metadata: List[Dict[str, Any]],
+        analysis: DocumentAnalysis
+    ) -> Dict[str, Any]:
+        """Merge per-page OCR output and incrementally merged fields into a single document result"""
+        # Join markdown with page separators (same as DeepSeek-OCR official)
+        combined_markdown = PAGE_SEPARATOR.join(page_markdowns)
+
+        document_type = analysis.document_type
+        logger.info(f"Detected document type: {document_type}")
+        if analysis.fields:
+            logger.info(f"Extracted {len(analysis.fields)} fields from {len(page_markdowns)} pages")
+
+        # Combine metadata (use average inference time, first inferred page's device info)
+        combined_metadata = next(
+            (m for m in page_metadata if m.get("source", "ocr") == "ocr" and "skipped" not in m),
+            page_metadata[0]
+        ).copy()
+        total_inference_time = sum(m["inference_time_ms"] for m in page_metadata)
+        combined_metadata["inference_time_ms"] = int(total_inference_time / len(page_metadata))
+        combined_metadata["total_inference_time_ms"] = total_inference_time
+
+        # Per-stage totals; stages overlap, so they can add up to more than the wall time
+        stage_totals: Dict[str, float] = {}
+        for metadata in page_metadata:
+            for stage, ms in metadata.get("stage_timings_ms", {}).items():
+                stage_totals[stage] = stage_totals.get(stage, 0.0) + ms
+        if stage_totals:
+            combined_metadata["stage_timings_ms"] = {
+                stage: round(ms, 2) for stage, ms in stage_totals.items()
+            }
 
         return {
             "markdown": combined_markdown,
-            "fields": fields,
-            "confidence": confidence,
+            "fields": analysis.fields,
+            "field_pages": analysis.field_pages,
+            "confidence": analysis.confidence,
             "document_type": document_type,
             "metadata": combined_metadata,
-            "pages": len(images)
+            "pages": len(page_markdowns)
         }
 
-    def __call__(self, image_path: Union[str, Path], **kwargs) -> Dict[str, Any]:
+    async def arun(
+        self,
+        image_path: DocumentSource,
+        document_type: str = "auto",
+        extract_fields: bool = True,
+        pdf_dpi: Union[int, str] = "auto",
+        pdf_start_page: Optional[int] = None,
+        pdf_end_page: Optional[int] = None,
+        workers: int = 1,
+        stop_when: Optional[str] = None,
+        min_confidence: float = 1.0,
+        max_pages: Optional[int] = None,
+        skip_pages: bool = False,
+        ocr_policy: str = "always"
+    ) -> Dict[str, Any]:
+        """
+        Asynchronous version of run() for asyncio-based agents.
+
+        Rendering runs in the default executor and inference on the engine's
+        dedicated worker, so the event loop is never blocked. Concurrent arun()
+        calls share one model; their pages are coalesced into batches.
+
+        Args:
+            Same as run(), except pdf_batch_size: the engine's scheduler forms
+            batches from the pages of every concurrent call instead. Up to twice
+            the engine's max_batch_size pages of a PDF are in flight at a time
+            (2 with stop_when or max_pages, to limit wasted work).
+
+        Returns:
+            dict: Same structure as run()
+        """
+        loop = asyncio.get_running_loop()
+        # Decoding in-memory images is CPU work: keep it off the event loop
+        document = await loop.run_in_executor(None, open_document, image_path)
+        logger.info(f"Processing document asynchronously: {document.name}")
+
+        if document.kind != "pdf":
+            result = await self.engine.ainfer(document.data)
+            document_type, fields, confidence = self._analyze(
+                result["markdown"], document_type, extract_fields
+            )
+            return {
+                "markdown": result["markdown"],
+                "fields": fields,
+                "confidence": confidence,
+                "document_type": document_type,
+                "metadata": result["metadata"],
+                "pages": 1
+            }
+
+        # May count the PDF's pages: file I/O, so off the event loop too
+        end_page, pages_in_range = await loop.run_in_executor(
+            None,
+            self._page_budget,
+            document.data, pdf_start_page, pdf_end_page, stop_when, max_pages, ocr_policy,
+            extract_fields
+        )
+        read_ahead = 2 if pages_in_range is not None else self.engine.max_batch_size * 2
+
+        dpi, render_planner = self._render_settings(pdf_dpi)
+        pages = iter_pdf_pages(
+            pdf_path=document.data,
+            dpi=dpi,
+            render_planner=render_planner,
+            start_page=pdf_start_page,
+            end_page=end_page,
+            workers=workers,
+            ocr_policy=ocr_policy
+        )
+        prefilter = self._page_prefilter(skip_pages, ocr_policy)
+
+        def next_page() -> Optional[Tuple[int, Any, Optional[Dict[str, Any]]]]:
+            # Rendering and prefiltering, in page order on one executor thread at a time
+            page = next(pages, None)
+            if page is None:
+                return None
+            page_num, image = page
+            return page_num, image, prefilter(page_num, image) if prefilter else None
+
+        collector = _PageCollector(
+            DocumentAnalysis(self.parsers, document_type, extract_fields),
+            stop_when,
+            min_confidence
+        )
+        page_markdowns: Dict[int, str] = {}
+        in_flight: Deque[Tuple[int, "asyncio.Future[Dict[str, Any]]"]] = deque()
+        exhausted = False
+        start_time = time.perf_counter()
+
+        try:
+            while True:
+                # Keep read_ahead pages rendering or on the model
+                while not exhausted and len(in_flight) < read_ahead:
+                    page = await loop.run_in_executor(None, next_page)
+                    if page is None:
+                        exhausted = True
+                        break
+                    page_num, image, result = page
+                    if result is None:
+                        future = asyncio.ensure_future(self.engine.ainfer(image))
+                    else:
+                        future = loop.create_future()
+                        future.set_result(result)
+                    in_flight.append((page_num, future))
+
+                if not in_flight:
+                    break
+
+                # Collect pages in order, so the stop decision sees them in order
+                page_num, future = in_flight.popleft()
+                result = await future
+                self._resolve_page(page_num, result, page_markdowns if skip_pages else None)
+                if collector.add(page_num, result["markdown"], result["metadata"]):
+                    break
+        finally:
+            for _, future in in_flight:
+                future.cancel()
+            try:
+                pages.close()
+            except ValueError:
+                # Still rendering in the executor after cancellation; left to GC
+                pass
+
+        return self._finish_pdf(collector, start_time, skip_pages, ocr_policy, pages_in_range)
+
+    def __call__(self, image_path: DocumentSource, **kwargs) -> Dict[str, Any]:
         """Allow tool to be called directly"""
         return self.run(image_path, **kwargs)
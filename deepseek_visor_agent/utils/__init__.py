@@ -5,12 +5,22 @@ from .error_handler import (
     OOMError,
     ModelLoadError,
     ImageProcessingError,
+    QueueFullError,
+    FallbackController,
     auto_fallback_decorator
 )
 
+from .cache import OCRCache, hash_image
+
+from .document_input import open_document, sniff_format
+
 from .pdf_processor import (
     PDFProcessingError,
+    PageText,
+    extract_text_layer,
+    iter_pdf_pages,
     pdf_to_images,
+    pdf_page_count,
     is_pdf_file
 )
 
@@ -19,8 +29,18 @@ __all__ = [
     "OOMError",
     "ModelLoadError",
     "ImageProcessingError",
+    "QueueFullError",
+    "FallbackController",
     "auto_fallback_decorator",
+    "OCRCache",
+    "hash_image",
+    "open_document",
+    "sniff_format",
     "PDFProcessingError",
+    "PageText",
+    "extract_text_layer",
+    "iter_pdf_pages",
     "pdf_to_images",
+    "pdf_page_count",
     "is_pdf_file"
 ]
@@ -0,0 +1,220 @@
+"""
+Content-addressed cache for OCR results
+
+Results are keyed on a hash of the image content plus everything that changes
+the model output: prompt, inference mode parameters (base_size, image_size,
+crop_mode), model ID and extra model.infer() arguments. The same page
+submitted twice - from a retry, a re-classification or an agent loop - is
+answered from the cache instead of re-running inference.
+
+Two tiers:
+- In-memory LRU bounded by the total size of the stored results in bytes
+- Optional SQLite file on disk that survives process restarts
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Read files in 1MB chunks when hashing image files
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def hash_image(image: Union[str, Path, "Image.Image"]) -> str:
+    """
+    Compute a content hash for an image file or PIL image.
+
+    PIL images are hashed over their mode, size and raw pixels, so identical
+    renders of the same page hash equally. Files are hashed over their bytes.
+
+    Args:
+        image: Path to an image file, or a PIL Image object
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+
+    if isinstance(image, (str, Path)):
+        with open(image, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    digest.update(f"{image.mode}:{image.size[0]}x{image.size[1]}:".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+class OCRCache:
+    """
+    Two-tier (memory LRU + optional SQLite) cache of OCR results.
+
+    Example:
+        >>> cache = OCRCache(max_memory_bytes=64 * 1024 * 1024, disk_path="~/.cache/visor.db")
+        >>> tool = VisionDocumentTool(cache=cache)
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        disk_path: Optional[Union[str, Path]] = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_memory_bytes: Upper bound on the size of results held in memory.
+                Least recently used entries are evicted beyond it. 0 disables the
+                memory tier.
+            disk_path: Path to a SQLite database file for the persistent tier,
+                None for memory only
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if disk_path is not None:
+            disk_path = Path(disk_path).expanduser()
+            disk_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(disk_path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_results (key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+            )
+            self._db.commit()
+            logger.info(f"OCR cache disk tier at {disk_path}")
+
+    @staticmethod
+    def make_key(
+        image_hash: str,
+        prompt: str,
+        mode_params: Dict[str, Any],
+        model_id: str,
+        extra: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Build the cache key for one inference.
+
+        Args:
+            image_hash: Content hash from hash_image()
+            prompt: Prompt passed to the model
+            mode_params: Inference mode parameters (base_size, image_size, crop_mode)
+            model_id: Model identifier
+            extra: Additional model.infer() arguments that affect the output
+
+        Returns:
+            str: Hex SHA-256 digest identifying the inference
+        """
+        material = json.dumps(
+            {
+                "image": image_hash,
+                "prompt": prompt,
+                "base_size": mode_params["base_size"],
+                "image_size": mode_params["image_size"],
+                "crop_mode": mode_params["crop_mode"],
+                "model": model_id,
+                "extra": extra or {},
+            },
+            sort_keys=True,
+            default=repr,
+        )
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a result, checking memory first and then disk.
+
+        Returns:
+            A fresh copy of the cached result, or None on a miss
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(value)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value FROM ocr_results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value = bytes(row[0])
+                    self._remember(key, value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return json.loads(value)
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """Store a result in memory and, if configured, on disk"""
+        value = json.dumps(result).encode()
+
+        with self._lock:
+            self._remember(key, value)
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO ocr_results (key, value) VALUES (?, ?)", (key, value)
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, value: bytes):
+        """Insert into the memory tier and evict down to max_memory_bytes (lock held)"""
+        if len(value) > self.max_memory_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+
+        self._entries[key] = value
+        self._memory_bytes += len(value)
+
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def clear(self):
+        """Remove all entries from both tiers"""
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM ocr_results")
+                self._db.commit()
+
+    def close(self):
+        """Close the disk tier"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and memory tier usage"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._entries),
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "disk_enabled": self._db is not None,
+            }
@@ -0,0 +1,146 @@
+"""
+Document inputs - Accept documents from memory as well as from disk
+
+VisionDocumentTool.run() used to require a file path, so services receiving
+uploads had to write each document to disk first. open_document() accepts:
+
+- paths (str or Path): PDFs are recognized by extension, as before
+- bytes, bytearray, memoryview and binary file-like objects (e.g. BytesIO
+  or an upload's file): the format is sniffed from the magic bytes, PDFs are
+  opened from memory with fitz.open(stream=...) and images decoded with PIL
+- numpy arrays (H x W gray, H x W x 3 RGB, H x W x 4 RGBA) and PIL images
+
+Nothing read from memory is ever written to disk: PDF pages are rendered
+from the in-memory document and images reach the model as PIL images.
+"""
+
+import io
+import logging
+from pathlib import Path
+from typing import Any, BinaryIO, NamedTuple, Optional, Union
+
+from PIL import Image
+
+from .error_handler import ImageProcessingError
+from .pdf_processor import is_pdf_file
+
+logger = logging.getLogger(__name__)
+
+# Leading bytes of the image formats PIL decodes, by format name
+_IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"BM", "bmp"),
+    (b"II*\x00", "tiff"),
+    (b"MM\x00*", "tiff"),
+)
+
+# PDF readers accept the %PDF- header anywhere in the first 1024 bytes
+_PDF_HEADER = b"%PDF-"
+_PDF_HEADER_WINDOW = 1024
+
+# Anything open_document() accepts
+DocumentSource = Union[
+    str, Path, bytes, bytearray, memoryview, BinaryIO, Image.Image, "numpy.ndarray"
+]
+
+
+class DocumentInput(NamedTuple):
+    """A document ready for processing"""
+    # "pdf" or "image"
+    kind: str
+    # PDF: path string or bytes; image: path string or PIL image
+    data: Any
+    # Description for log messages
+    name: str
+
+
+def sniff_format(data: Union[bytes, bytearray, memoryview]) -> Optional[str]:
+    """
+    Identify a document format from its leading bytes.
+
+    Args:
+        data: The document's bytes (the first 1KB is enough)
+
+    Returns:
+        "pdf" | "png" | "jpeg" | "gif" | "bmp" | "tiff" | "webp", or None if unknown
+    """
+    head = bytes(data[:_PDF_HEADER_WINDOW])
+    if _PDF_HEADER in head:
+        return "pdf"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    for signature, name in _IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return name
+    return None
+
+
+def open_document(source: DocumentSource) -> DocumentInput:
+    """
+    Resolve any supported document argument to a DocumentInput.
+
+    Args:
+        source: Path, bytes-like object, binary file-like object, numpy array
+            or PIL image
+
+    Returns:
+        DocumentInput; paths are passed through unopened
+
+    Raises:
+        ImageProcessingError: If in-memory data is neither a PDF nor a
+            decodable image, or the argument type is not supported
+    """
+    if isinstance(source, (str, Path)):
+        kind = "pdf" if is_pdf_file(source) else "image"
+        return DocumentInput(kind, str(source), str(source))
+
+    if isinstance(source, Image.Image):
+        return DocumentInput("image", source, f"<{source.width}x{source.height} image>")
+
+    if hasattr(source, "__array_interface__"):
+        return DocumentInput("image", _array_to_image(source), f"<{_shape(source)} array>")
+
+    if hasattr(source, "read"):
+        source = source.read()
+
+    if not isinstance(source, (bytes, bytearray, memoryview)):
+        raise ImageProcessingError(
+            f"Unsupported document type {type(source).__name__}: pass a path, bytes, "
+            f"a binary file object, a numpy array or a PIL image"
+        )
+
+    data = bytes(source)
+    kind = sniff_format(data)
+    name = f"<{len(data)} bytes of {kind or 'unknown format'}>"
+    if kind == "pdf":
+        return DocumentInput("pdf", data, name)
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except Exception as e:
+        raise ImageProcessingError(f"Cannot decode document {name}: {e}")
+    return DocumentInput("image", _gray_or_rgb(image), name)
+
+
+def _array_to_image(array) -> Image.Image:
+    """PIL image from a gray, RGB or RGBA array"""
+    try:
+        image = Image.fromarray(array)
+    except Exception as e:
+        raise ImageProcessingError(f"Cannot convert {_shape(array)} array to an image: {e}")
+    return _gray_or_rgb(image)
+
+
+def _gray_or_rgb(image: Image.Image) -> Image.Image:
+    """Convert palette, alpha, CMYK and high bit depth images to RGB"""
+    return image if image.mode in ("L", "RGB") else image.convert("RGB")
+
+
+def _shape(array) -> str:
+    """Shape and dtype of an array, for messages"""
+    interface = array.__array_interface__
+    return f"{'x'.join(map(str, interface['shape']))} {interface['typestr']}"
@@ -3,14 +3,33 @@ Error handling utilities with automatic fallback support
 
 IMPORTANT: DeepSeek-OCR uses a single model with multiple inference modes.
 Fallback changes inference parameters, NOT the model file.
+
+FallbackController remembers which (mode, image size) combinations ran out
+of memory, picks a mode predicted to fit before running an image, and
+periodically probes the higher mode again, so one oversized page does not
+pin the engine to a low mode for the rest of its life.
+
+torch is never imported here: if it has not been loaded by an inference
+backend, no CUDA error can occur and there is no GPU cache to free.
 """
 
+from dataclasses import dataclass
 from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar, Union
 import logging
-import torch
+import math
+import sys
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+# All inference modes in descending order (highest to lowest resolution)
+FALLBACK_ORDER = ["gundam", "large", "base", "small", "tiny"]
+
+T = TypeVar("T")
+
 
 class OCRError(Exception):
     """Base exception for OCR-related errors"""
@@ -22,16 +41,36 @@ class OOMError(OCRError):
     pass
 
 
+# Errors that make inference fall back to a lower mode
+# (torch.cuda.OutOfMemoryError is a RuntimeError; CPU allocations fail with
+# MemoryError or a RuntimeError from the CPU allocator)
+FALLBACK_ERRORS = (RuntimeError, MemoryError, OOMError)
+
+# Lowercased messages of RuntimeErrors that are out-of-memory failures: CUDA/MPS,
+# and PyTorch's CPU allocator ("DefaultCPUAllocator: can't allocate memory: ...")
+_OOM_MESSAGES = ("out of memory", "can't allocate memory", "defaultcpuallocator")
+
+
 class ModelLoadError(OCRError):
     """Model loading error"""
     pass
 
 
+class SnapshotError(ModelLoadError):
+    """Weight snapshot is missing, stale or does not match the model"""
+    pass
+
+
 class ImageProcessingError(OCRError):
     """Image processing error"""
     pass
 
 
+class QueueFullError(OCRError):
+    """Inference request queue is at capacity"""
+    pass
+
+
 def auto_fallback_decorator(func):
     """
     Automatic fallback decorator: Gundam → Large → Base → Small → Tiny
@@ -41,11 +80,13 @@ def auto_fallback_decorator(func):
 
     IMPORTANT: This does NOT reload the model. It only changes the
     inference_mode config, which adjusts base_size/image_size/crop_mode parameters.
+
+    The downgrade is permanent; DeepSeekOCRInference uses FallbackController,
+    which remembers failures per image size and steps back up.
     """
     @wraps(func)
     def wrapper(self, *args, **kwargs):
-        # All inference modes in descending order (highest to lowest resolution)
-        modes = ["gundam", "large", "base", "small", "tiny"]
+        modes = FALLBACK_ORDER
         current_mode = self.config.get("inference_mode", "tiny")
 
         # Start from current mode
@@ -60,10 +101,9 @@ def auto_fallback_decorator(func):
 
                 return func(self, *args, **kwargs)
 
-            except (RuntimeError, torch.cuda.OutOfMemoryError) as e:
+            except FALLBACK_ERRORS as e:
                 logger.error(f"{mode} inference mode failed: {e}")
-                if torch.cuda.is_available():
-                    torch.cuda.empty_cache()  # Clear GPU memory
+                _empty_cuda_cache()
                 continue
 
         raise OCRError(
@@ -73,3 +113,232 @@ def auto_fallback_decorator(func):
         )
 
     return wrapper
+
+
+def _empty_cuda_cache():
+    """Release cached GPU memory, if torch is loaded and has CUDA"""
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+def is_oom_error(error: BaseException) -> bool:
+    """Whether an exception is an out-of-memory failure"""
+    if isinstance(error, (OOMError, MemoryError)):
+        return True
+    torch = sys.modules.get("torch")
+    if torch is not None and isinstance(error, torch.cuda.OutOfMemoryError):
+        return True
+    message = str(error).lower()
+    return any(text in message for text in _OOM_MESSAGES)
+
+
+def size_bucket(image: Union[str, Path, "Image.Image"]) -> int:
+    """
+    Coarse image size class for fallback bookkeeping.
+
+    Bucket 0 holds images up to 512x512 pixels; each further bucket doubles
+    the pixel count (an A4 page at 144 DPI is bucket 3).
+
+    Args:
+        image: PIL image or path to an image file
+
+    Returns:
+        int: Bucket number (0 if the size cannot be read)
+    """
+    from PIL import Image
+
+    try:
+        if isinstance(image, Image.Image):
+            width, height = image.size
+        else:
+            with Image.open(image) as opened:
+                width, height = opened.size
+    except (OSError, ValueError):
+        return 0
+
+    return max(0, math.ceil(math.log2(max(width * height, 1) / (512 * 512))))
+
+
+@dataclass
+class _OOMRecord:
+    """Out-of-memory history of one (mode, size bucket)"""
+    failures: int
+    failed_at: float
+    memory_gb: Optional[float]
+    backoff_s: float
+
+
+class FallbackController:
+    """
+    Choose inference modes from remembered out-of-memory outcomes.
+
+    Each OOM is recorded for its (mode, size bucket). An image is predicted not
+    to fit a mode if an OOM was recorded for that mode or a cheaper one at the
+    same or a smaller size bucket; select_mode() then starts it at the highest
+    mode predicted to fit instead of failing its way down from the top.
+
+    A recorded OOM is retried (probed) once its backoff has passed, or earlier
+    when the available memory has grown by probe_memory_gb since the failure.
+    A successful probe clears the record; another failure doubles the backoff.
+
+    Example:
+        >>> controller = FallbackController()
+        >>> bucket = size_bucket(image)
+        >>> mode = controller.select_mode("gundam", bucket)
+        >>> result = controller.run(mode, bucket, lambda mode: engine.run(image, mode))
+    """
+
+    def __init__(
+        self,
+        probe_after_s: float = 60.0,
+        max_backoff_s: float = 3600.0,
+        memory_gb: Optional[Callable[[], float]] = None,
+        probe_memory_gb: float = 2.0
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            probe_after_s: Time after a first OOM before the mode is tried again
+            max_backoff_s: Upper bound for the doubling backoff after failed probes
+            memory_gb: Returns the currently available memory in GB; None disables
+                memory-triggered probes
+            probe_memory_gb: Growth of available memory since an OOM that allows
+                an early probe
+        """
+        self.probe_after_s = probe_after_s
+        self.max_backoff_s = max_backoff_s
+        self.memory_gb = memory_gb
+        self.probe_memory_gb = probe_memory_gb
+
+        self._records: Dict[Tuple[str, int], _OOMRecord] = {}
+        self._lock = threading.Lock()
+        self._stats = {"ooms": 0, "avoided": 0, "probes": 0, "recovered": 0}
+
+    def select_mode(self, mode: str, bucket: int) -> str:
+        """
+        Highest mode at or below mode predicted to fit an image of this bucket.
+
+        Args:
+            mode: Requested (configured or planned) mode
+            bucket: size_bucket() of the image
+
+        Returns:
+            str: Mode to run; the lowest mode if every mode is predicted to fail
+        """
+        start = FALLBACK_ORDER.index(mode) if mode in FALLBACK_ORDER else 0
+        with self._lock:
+            for candidate in FALLBACK_ORDER[start:]:
+                blocking = self._blocking_record(candidate, bucket)
+                if blocking is None:
+                    break
+                # Probe the mode that actually failed, not every mode above it
+                failed_mode, record = blocking
+                if candidate == failed_mode and self._probe_due(record):
+                    self._stats["probes"] += 1
+                    logger.info(f"Probing {candidate} mode again after an earlier OOM")
+                    break
+            if candidate != mode:
+                self._stats["avoided"] += 1
+                logger.info(f"Using {candidate} mode instead of {mode}: predicted OOM")
+            return candidate
+
+    def run(self, mode: str, bucket: int, attempt: Callable[[str], T]) -> T:
+        """
+        Call attempt(mode), falling back to lower modes on failure.
+
+        Out-of-memory failures are recorded for (mode, bucket); other fallback
+        errors are retried in a lower mode without being remembered.
+
+        Args:
+            mode: First mode to try, usually from select_mode()
+            bucket: size_bucket() of the largest image in the call
+            attempt: Runs the inference in the given mode
+
+        Returns:
+            attempt()'s result
+
+        Raises:
+            OCRError: If every mode down to the lowest fails
+        """
+        start = FALLBACK_ORDER.index(mode) if mode in FALLBACK_ORDER else 0
+        for candidate in FALLBACK_ORDER[start:]:
+            if candidate != mode:
+                logger.warning(f"Falling back to {candidate} inference mode...")
+            try:
+                result = attempt(candidate)
+            except FALLBACK_ERRORS as e:
+                logger.error(f"{candidate} inference mode failed: {e}")
+                if is_oom_error(e):
+                    self.record_oom(candidate, bucket)
+                _empty_cuda_cache()
+                continue
+
+            self.record_success(candidate, bucket)
+            return result
+
+        raise OCRError(
+            "All inference modes failed. Try using CPU mode or reducing image size. "
+            "Available modes: tiny (512x512), small (640x640), base (1024x1024), "
+            "large (1280x1280), gundam (dynamic with cropping)"
+        )
+
+    def record_oom(self, mode: str, bucket: int):
+        """Remember that an image of this bucket ran out of memory in mode"""
+        memory_gb = self.memory_gb() if self.memory_gb is not None else None
+        with self._lock:
+            self._stats["ooms"] += 1
+            record = self._records.get((mode, bucket))
+            if record is None:
+                backoff_s = self.probe_after_s
+                failures = 1
+            else:
+                backoff_s = min(record.backoff_s * 2, self.max_backoff_s)
+                failures = record.failures + 1
+            self._records[(mode, bucket)] = _OOMRecord(
+                failures, time.monotonic(), memory_gb, backoff_s
+            )
+
+    def record_success(self, mode: str, bucket: int):
+        """Forget OOMs contradicted by a success in mode at this bucket"""
+        rank = FALLBACK_ORDER.index(mode) if mode in FALLBACK_ORDER else len(FALLBACK_ORDER)
+        with self._lock:
+            # A success also fits every cheaper mode and smaller image
+            stale = [
+                key for key in self._records
+                if FALLBACK_ORDER.index(key[0]) >= rank and key[1] <= bucket
+            ]
+            if stale:
+                self._stats["recovered"] += 1
+                logger.info(f"{mode} mode fits again; cleared {len(stale)} OOM record(s)")
+            for key in stale:
+                del self._records[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """OOM, avoided-attempt, probe and recovery counters"""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["records"] = {f"{mode}/{bucket}": r.failures for (mode, bucket), r in self._records.items()}
+        return stats
+
+    def _blocking_record(self, mode: str, bucket: int) -> Optional[Tuple[str, _OOMRecord]]:
+        """The most recent OOM (its mode and record) predicting that mode fails at bucket"""
+        rank = FALLBACK_ORDER.index(mode)
+        blocking = [
+            (failed_mode, record) for (failed_mode, failed_bucket), record in self._records.items()
+            if FALLBACK_ORDER.index(failed_mode) >= rank and failed_bucket <= bucket
+        ]
+        return max(blocking, key=lambda item: item[1].failed_at) if blocking else None
+
+    def _probe_due(self, record: _OOMRecord) -> bool:
+        """Whether enough time passed or memory freed up to retry a failed mode"""
+        if time.monotonic() - record.failed_at >= record.backoff_s:
+            # Restart the clock so concurrent callers do not all probe at once
+            record.failed_at = time.monotonic()
+            return True
+        if self.memory_gb is not None and record.memory_gb is not None:
+            if self.memory_gb() >= record.memory_gb + self.probe_memory_gb:
+                record.memory_gb = None
+                return True
+        return False
@@ -5,45 +5,413 @@ Based on DeepSeek-OCR official implementation:
 https://github.com/deepseek-ai/DeepSeek-OCR/blob/master/DeepSeek-OCR-vllm/run_dpsk_ocr_pdf.py
 """
 
-import io
 import logging
+from collections import Counter, deque
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union
 
 from PIL import Image
 
 logger = logging.getLogger(__name__)
 
 
+# PIL raw modes for PyMuPDF pixmaps, keyed by (channel count, has alpha)
+_PIXMAP_MODES = {
+    (1, False): "L",
+    (2, True): "LA",
+    (3, False): "RGB",
+    (4, True): "RGBA",
+}
+
+
+# Supported values for iter_pdf_pages(ocr_policy=...)
+OCR_POLICIES = ("auto", "always", "never")
+
+# A text layer is complete if text spans cover at least this share of the
+# area covered by text and images together (an invoice with a logo is well
+# above it; a scan, or a photo with a caption, is far below)
+_MIN_TEXT_SHARE = 0.5
+
+# ...and at most this share of its characters have no Unicode mapping (fonts
+# without a ToUnicode table extract as U+FFFD)
+_MAX_UNREADABLE = 0.05
+
+# Rows at least this many times the body font size become markdown headings
+_HEADING_SCALE = 1.3
+
+
 class PDFProcessingError(Exception):
     """PDF processing related errors"""
     pass
 
 
-def pdf_to_images(
-    pdf_path: Union[str, Path],
+@dataclass
+class PageText:
+    """
+    A page's embedded text layer, converted to markdown
+
+    Coverages are shares of the page area. complete says whether the text
+    layer can stand in for OCR of the page (see extract_text_layer()).
+    """
+    markdown: str
+    chars: int
+    text_coverage: float
+    image_coverage: float
+    unreadable: float
+    complete: bool
+
+
+def extract_text_layer(
+    page,
+    min_text_share: float = _MIN_TEXT_SHARE,
+    max_unreadable: float = _MAX_UNREADABLE
+) -> PageText:
+    """
+    Extract a PDF page's text layer as markdown and judge whether it is complete
+
+    A text layer is complete when the page has readable text and its text
+    covers more of the page than its images do (by min_text_share). Scanned
+    pages fail this even when they carry an invisible OCR layer, since the
+    scan covers the page and invisible text is not extracted; so do pages
+    whose content is mostly pictures, and pages set in fonts whose characters
+    cannot be mapped to Unicode. Vector drawings are ignored: a page whose
+    content is vector graphics with some text counts as complete.
+
+    Text rows sharing a baseline are joined left to right, paragraphs are
+    separated by blank lines and rows set clearly larger than the body text
+    become headings.
+
+    Args:
+        page: fitz.Page
+        min_text_share: Minimum text area / (text area + image area)
+        max_unreadable: Maximum share of characters without a Unicode mapping
+
+    Returns:
+        PageText with the markdown and the coverage measurements
+    """
+    page_rect = page.rect
+    page_area = max(page_rect.width * page_rect.height, 1.0)
+
+    # (baseline, x0, x1, size, text) per line; text area summed over spans
+    lines = []
+    text_area = 0.0
+    sizes: Counter = Counter()
+    for block in page.get_text("dict", sort=True)["blocks"]:
+        for line in block.get("lines", ()):
+            spans = [span for span in line["spans"] if span["text"].strip()]
+            if not spans:
+                continue
+            for span in spans:
+                x0, y0, x1, y1 = span["bbox"]
+                text_area += max(x1 - x0, 0) * max(y1 - y0, 0)
+                sizes[round(span["size"])] += len(span["text"].strip())
+            text = "".join(span["text"] for span in line["spans"]).strip()
+            size = max(span["size"] for span in spans)
+            x0, _, x1, _ = line["bbox"]
+            lines.append((spans[0]["origin"][1], x0, x1, size, text))
+
+    image_area = 0.0
+    for image in page.get_image_info():
+        bbox = page_rect & image["bbox"]
+        if not bbox.is_empty:
+            image_area += bbox.width * bbox.height
+    image_area = min(image_area, page_area)
+
+    text = "".join(line[-1] for line in lines)
+    chars = sum(1 for c in text if not c.isspace())
+    unreadable = text.count("\ufffd") / chars if chars else 0.0
+    text_share = text_area / (text_area + image_area) if text_area else 0.0
+
+    body_size = sizes.most_common(1)[0][0] if sizes else 0
+    return PageText(
+        markdown=_lines_to_markdown(lines, body_size),
+        chars=chars,
+        text_coverage=round(min(text_area / page_area, 1.0), 4),
+        image_coverage=round(image_area / page_area, 4),
+        unreadable=round(unreadable, 4),
+        complete=chars > 0 and unreadable <= max_unreadable and text_share >= min_text_share
+    )
+
+
+def _lines_to_markdown(lines: List[Tuple[float, float, float, float, str]], body_size: float) -> str:
+    """Join (baseline, x0, x1, size, text) lines into markdown rows and paragraphs"""
+    rows: List[List[Any]] = []
+    for baseline, x0, x1, size, text in sorted(lines, key=lambda line: (line[0], line[1])):
+        # Same baseline (within half a line) and no column gap: the same row continues
+        row = rows[-1] if rows else None
+        if row and baseline - row[0] <= size / 2 and 0 <= x0 - row[1] <= size:
+            row[1], row[2], row[3] = x1, max(row[2], size), f"{row[3]} {text}"
+        else:
+            rows.append([baseline, x1, size, text])
+
+    output: List[str] = []
+    previous_baseline = None
+    for baseline, _, size, text in rows:
+        heading = body_size and size >= body_size * _HEADING_SCALE
+        # A heading, or a gap of more than 1.5 lines, starts a new paragraph
+        if output and output[-1] and (heading or baseline - previous_baseline > size * 1.5):
+            output.append("")
+        output.append(f"# {text}" if heading else text)
+        if heading:
+            output.append("")
+        previous_baseline = baseline
+
+    return "\n".join(output).strip() + "\n" if output else ""
+
+
+def _text_layer_for(page, ocr_policy: str) -> Optional[PageText]:
+    """The page's text layer if ocr_policy lets it stand in for OCR, else None (render the page)"""
+    if ocr_policy == "always":
+        return None
+
+    page_text = extract_text_layer(page)
+    if page_text.complete or ocr_policy == "never":
+        return page_text
+
+    logger.debug(
+        f"Page {page.number} text layer incomplete "
+        f"(text {page_text.text_coverage:.1%}, images {page_text.image_coverage:.1%}); rendering"
+    )
+    return None
+
+
+def pixmap_to_image(pixmap) -> Image.Image:
+    """
+    Build an RGB PIL image directly from a PyMuPDF pixmap's raw samples
+
+    Wraps the pixel buffer with Image.frombuffer() instead of round-tripping
+    through PNG encoding and decoding.
+
+    Args:
+        pixmap: fitz.Pixmap to convert
+
+    Returns:
+        RGB PIL Image with the pixmap's dimensions
+    """
+    return _raw_to_image(
+        pixmap.samples, pixmap.width, pixmap.height, pixmap.n, bool(pixmap.alpha), pixmap.stride
+    )
+
+
+def _raw_to_image(
+    samples: bytes,
+    width: int,
+    height: int,
+    channels: int,
+    alpha: bool,
+    stride: int
+) -> Image.Image:
+    """Build an RGB PIL image from raw pixmap samples (see pixmap_to_image)"""
+    mode = _PIXMAP_MODES.get((channels, alpha))
+    if mode is None:
+        raise PDFProcessingError(
+            f"Unsupported pixmap format: {channels} channels (alpha={alpha})"
+        )
+
+    img = Image.frombuffer(mode, (width, height), samples, "raw", mode, stride, 1)
+
+    # Convert RGBA to RGB if needed
+    if img.mode in ('RGBA', 'LA'):
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img.convert('RGBA'), mask=img.split()[-1])
+        img = background
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    return img
+
+
+def _log_page(page_num: int, img: Union[Image.Image, PageText]):
+    """Debug log of one page leaving iter_pdf_pages()"""
+    if isinstance(img, PageText):
+        logger.debug(f"Extracted text layer of page {page_num}: {img.chars} characters")
+    else:
+        logger.debug(f"Converted page {page_num}: {img.size}")
+
+
+# Document opened once per render worker process by _init_render_worker()
+_worker_document = None
+
+
+def _init_render_worker(pdf_source: Union[str, bytes]):
+    """Process pool initializer: open the PDF once for all pages this worker renders"""
+    global _worker_document
+
+    _worker_document = _open_document(pdf_source)
+
+
+def _open_document(pdf_source: Union[str, bytes]):
+    """Open a PDF from a file path or from the file's bytes"""
+    import fitz  # PyMuPDF
+
+    if isinstance(pdf_source, bytes):
+        return fitz.open(stream=pdf_source, filetype="pdf")
+    return fitz.open(pdf_source)
+
+
+def _pdf_source(pdf_path: Union[str, Path, bytes, bytearray, memoryview]) -> Union[str, bytes]:
+    """
+    Validate a PDF argument: an existing .pdf file (returned as a path string)
+    or the bytes of a PDF document, e.g. an upload (returned as bytes)
+    """
+    if isinstance(pdf_path, (bytes, bytearray, memoryview)):
+        return bytes(pdf_path)
+
+    pdf_path = Path(pdf_path)
+    if not pdf_path.exists():
+        raise PDFProcessingError(f"PDF file not found: {pdf_path}")
+
+    if not pdf_path.suffix.lower() == '.pdf':
+        raise PDFProcessingError(f"File is not a PDF: {pdf_path}")
+
+    return str(pdf_path)
+
+
+def _page_matrix(page, zoom: float, render_planner=None):
+    """Render matrix of a page: the planner's zoom for its size, else the fixed zoom"""
+    import fitz  # PyMuPDF
+
+    if render_planner is not None:
+        zoom = render_planner.zoom(page.rect.width, page.rect.height)
+    return fitz.Matrix(zoom, zoom)
+
+
+def _render_page_raw(
+    page_num: int,
+    zoom: float,
+    ocr_policy: str = "always",
+    render_planner=None
+) -> Union[PageText, Tuple[bytes, int, int, int, bool, int]]:
+    """Render one page in a worker process and return its raw pixmap samples (or its text layer)"""
+    page = _worker_document[page_num]
+    page_text = _text_layer_for(page, ocr_policy)
+    if page_text is not None:
+        return page_text
+
+    pixmap = page.get_pixmap(matrix=_page_matrix(page, zoom, render_planner), alpha=False)
+    return (
+        pixmap.samples, pixmap.width, pixmap.height, pixmap.n, bool(pixmap.alpha), pixmap.stride
+    )
+
+
+def _iter_pages_parallel(
+    pdf_source: Union[str, bytes],
+    zoom: float,
+    page_nums: Sequence[int],
+    workers: int,
+    ocr_policy: str = "always",
+    render_planner=None
+) -> Iterator[Tuple[int, Union[Image.Image, PageText]]]:
+    """
+    Render pages across a pool of worker processes, yielding them in page order
+
+    Each worker opens its own fitz document and sends back raw pixel buffers.
+    Up to 2 * workers pages are rendered ahead of the consumer, so rendering
+    overlaps with whatever the consumer does with each page (e.g. inference)
+    while memory stays bounded.
+
+    Workers are started with forkserver (spawn where unavailable), never
+    fork: the pool is created on a pipeline thread while other threads may
+    be inside the model, and a forked child could inherit their held locks.
+    The workers only need fitz and the PDF source.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    methods = multiprocessing.get_all_start_methods()
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn"),
+        initializer=_init_render_worker,
+        initargs=(pdf_source,)
+    )
+    remaining = iter(page_nums)
+    in_flight = deque()
+
+    def submit_next():
+        page_num = next(remaining, None)
+        if page_num is not None:
+            in_flight.append(
+                (page_num, executor.submit(
+                    _render_page_raw, page_num, zoom, ocr_policy, render_planner
+                ))
+            )
+
+    try:
+        for _ in range(workers * 2):
+            submit_next()
+
+        while in_flight:
+            page_num, future = in_flight.popleft()
+            try:
+                img = future.result()
+                if not isinstance(img, PageText):
+                    img = _raw_to_image(*img)
+            except Exception as e:
+                raise PDFProcessingError(f"Failed to render page {page_num}: {e}")
+
+            # Keep the workers busy while the consumer handles this page
+            submit_next()
+
+            _log_page(page_num, img)
+            yield page_num, img
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_pdf_pages(
+    pdf_path: Union[str, Path, bytes],
     dpi: int = 144,
     start_page: Optional[int] = None,
     end_page: Optional[int] = None,
-) -> List[Image.Image]:
+    workers: int = 1,
+    ocr_policy: str = "always",
+    render_planner=None,
+) -> Iterator[Tuple[int, Union[Image.Image, PageText]]]:
     """
-    Convert PDF pages to PIL images using PyMuPDF (official DeepSeek-OCR method)
+    Lazily render PDF pages to PIL images, one page at a time
+
+    Only the page currently being consumed is held in memory, so memory use is
+    independent of the page count and the first page is available after a
+    single render.
+
+    With workers > 1, pages are rendered in a pool of worker processes and
+    still yielded in page order. A small window of pages (2 per worker) is
+    rendered ahead of the consumer.
+
+    Digital PDFs usually carry their text already: with ocr_policy="auto",
+    pages whose text layer is complete (see extract_text_layer()) are not
+    rendered and a PageText is yielded in place of the image.
+
+    With a render_planner, each page is rendered at the zoom the planner
+    picks for its size (e.g. just large enough for an inference mode, see
+    RenderPlanner) instead of at dpi.
 
     Args:
-        pdf_path: Path to PDF file
+        pdf_path: Path to PDF file, or the PDF's bytes (opened in memory)
         dpi: Resolution for rendering (default: 144, same as DeepSeek-OCR official)
         start_page: First page to process (0-indexed), None for first page
         end_page: Last page to process (0-indexed), None for last page
-
-    Returns:
-        List of PIL Image objects, one per page
+        workers: Number of rendering processes (1 renders in the calling thread)
+        ocr_policy: "auto" | "always" | "never"
+            - auto: PageText for pages with a complete text layer, images otherwise
+            - always: Render every page (default)
+            - never: PageText for every page, however incomplete; nothing is rendered
+        render_planner: Object whose zoom(width, height) returns the zoom for a
+            page of that size in points (overrides dpi); sent to render workers,
+            so it must be picklable
+
+    Yields:
+        (page_num, image) tuples, where page_num is the 0-indexed page number
+        and image is a PIL image or, depending on ocr_policy, a PageText
 
     Raises:
         PDFProcessingError: If PDF cannot be opened or processed
 
     Example:
-        >>> images = pdf_to_images("contract.pdf", dpi=144)
-        >>> print(f"Converted {len(images)} pages")
+        >>> for page_num, image in iter_pdf_pages("contract.pdf"):
+        ...     print(page_num, image.size)
     """
     try:
         import fitz  # PyMuPDF
@@ -52,20 +420,24 @@ def pdf_to_images(
             "PyMuPDF is not installed. Install with: pip install PyMuPDF>=1.23.0"
         )
 
-    pdf_path = Path(pdf_path)
-    if not pdf_path.exists():
-        raise PDFProcessingError(f"PDF file not found: {pdf_path}")
+    pdf_source = _pdf_source(pdf_path)
 
-    if not pdf_path.suffix.lower() == '.pdf':
-        raise PDFProcessingError(f"File is not a PDF: {pdf_path}")
+    if workers < 1:
+        raise ValueError(f"workers must be >= 1, got {workers}")
+    if ocr_policy not in OCR_POLICIES:
+        raise ValueError(f"ocr_policy must be one of {OCR_POLICIES}, got {ocr_policy!r}")
 
     try:
         # Open PDF document
-        pdf_document = fitz.open(str(pdf_path))
+        pdf_document = _open_document(pdf_source)
+    except fitz.FileDataError as e:
+        raise PDFProcessingError(f"Invalid or corrupted PDF file: {e}")
+    except Exception as e:
+        raise PDFProcessingError(f"Failed to process PDF: {e}")
 
+    try:
         # Calculate zoom factor from DPI (72 is the default PDF DPI)
         zoom = dpi / 72.0
-        matrix = fitz.Matrix(zoom, zoom)
 
         # Determine page range
         total_pages = pdf_document.page_count
@@ -82,44 +454,118 @@ def pdf_to_images(
                 f"end_page {end_page} out of range (PDF has {total_pages} pages)"
             )
 
+        resolution = f"{dpi} DPI" if render_planner is None else "planned resolution"
         logger.info(
             f"Converting PDF pages {start} to {end-1} (total: {total_pages} pages) "
-            f"at {dpi} DPI"
+            f"at {resolution} with {workers} worker(s) (OCR policy: {ocr_policy})"
         )
 
-        images = []
+        # Remove PIL image size limit (same as official code)
+        Image.MAX_IMAGE_PIXELS = None
+
+        if workers > 1 and end - start > 1:
+            # Workers open their own copies; do not hold this one open meanwhile
+            pdf_document.close()
+            yield from _iter_pages_parallel(
+                pdf_source, zoom, range(start, end), workers, ocr_policy, render_planner
+            )
+            return
 
         for page_num in range(start, end):
-            page = pdf_document[page_num]
+            try:
+                page = pdf_document[page_num]
+
+                # Use the text layer where ocr_policy allows, otherwise render
+                img = _text_layer_for(page, ocr_policy)
+                if img is None:
+                    matrix = _page_matrix(page, zoom, render_planner)
+                    pixmap = page.get_pixmap(matrix=matrix, alpha=False)
+                    img = pixmap_to_image(pixmap)
+            except Exception as e:
+                raise PDFProcessingError(f"Failed to render page {page_num}: {e}")
+
+            _log_page(page_num, img)
+            yield page_num, img
+
+    finally:
+        if not pdf_document.is_closed:
+            pdf_document.close()
+
+
+def pdf_to_images(
+    pdf_path: Union[str, Path, bytes],
+    dpi: int = 144,
+    start_page: Optional[int] = None,
+    end_page: Optional[int] = None,
+    workers: int = 1,
+    render_planner=None,
+) -> List[Image.Image]:
+    """
+    Convert PDF pages to PIL images using PyMuPDF (official DeepSeek-OCR method)
 
-            # Render page to pixmap (image)
-            pixmap = page.get_pixmap(matrix=matrix, alpha=False)
+    Renders every page in the range up front. Prefer iter_pdf_pages() for
+    large documents, which renders pages on demand.
 
-            # Remove PIL image size limit (same as official code)
-            Image.MAX_IMAGE_PIXELS = None
+    Args:
+        pdf_path: Path to PDF file, or the PDF's bytes
+        dpi: Resolution for rendering (default: 144, same as DeepSeek-OCR official)
+        start_page: First page to process (0-indexed), None for first page
+        end_page: Last page to process (0-indexed), None for last page
+        workers: Number of rendering processes (1 renders in the calling thread)
+        render_planner: Picks each page's zoom instead of dpi (see iter_pdf_pages())
 
-            # Convert pixmap to PIL Image
-            img_data = pixmap.tobytes("png")
-            img = Image.open(io.BytesIO(img_data))
+    Returns:
+        List of PIL Image objects, one per page
 
-            # Convert RGBA to RGB if needed
-            if img.mode in ('RGBA', 'LA'):
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = background
+    Raises:
+        PDFProcessingError: If PDF cannot be opened or processed
 
-            images.append(img)
-            logger.debug(f"Converted page {page_num}: {img.size}")
+    Example:
+        >>> images = pdf_to_images("contract.pdf", dpi=144)
+        >>> print(f"Converted {len(images)} pages")
+    """
+    images = [
+        image for _, image in iter_pdf_pages(
+            pdf_path, dpi, start_page, end_page, workers, render_planner=render_planner
+        )
+    ]
+    logger.info(f"Successfully converted {len(images)} pages")
 
-        pdf_document.close()
-        logger.info(f"Successfully converted {len(images)} pages")
+    return images
 
-        return images
 
-    except fitz.FileDataError as e:
-        raise PDFProcessingError(f"Invalid or corrupted PDF file: {e}")
+def pdf_page_count(pdf_path: Union[str, Path, bytes]) -> int:
+    """
+    Number of pages in a PDF, without rendering anything
+
+    Args:
+        pdf_path: Path to PDF file, or the PDF's bytes
+
+    Returns:
+        Page count
+
+    Raises:
+        PDFProcessingError: If PDF cannot be opened
+    """
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        raise PDFProcessingError(
+            "PyMuPDF is not installed. Install with: pip install PyMuPDF>=1.23.0"
+        )
+
+    if isinstance(pdf_path, (bytes, bytearray, memoryview)):
+        pdf_source = bytes(pdf_path)
+    else:
+        pdf_source = str(pdf_path)
+        if not Path(pdf_source).exists():
+            raise PDFProcessingError(f"PDF file not found: {pdf_path}")
+
+    try:
+        with _open_document(pdf_source) as pdf_document:
+            return pdf_document.page_count
     except Exception as e:
-        raise PDFProcessingError(f"Failed to process PDF: {e}")
+        raise PDFProcessingError(f"Failed to open PDF: {e}")
 
 
 def is_pdf_file(file_path: Union[str, Path]) -> bool:
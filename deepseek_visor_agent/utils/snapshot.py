@@ -0,0 +1,169 @@
+"""
+Weight snapshots - Device-ready model weights for fast cold starts
+
+Loading DeepSeek-OCR normally means deserializing the Hugging Face
+checkpoint and then casting ~14GB of weights to the target dtype, in every
+worker process on every restart. A snapshot stores the weights once, already
+cast, as a single safetensors file. Later starts build the model skeleton
+without allocating weights and attach the snapshot's tensors directly:
+
+- CPU: tensors are memory-mapped from the file (copy-on-write), so loading
+  is nearly free, pages are read on first use, and worker processes on one
+  host share a single copy in the OS page cache
+- CUDA/MPS: tensors are copied from the mapped file straight to the device
+  in their final dtype, with no cast
+
+Every parameter and buffer is saved, including non-persistent buffers that
+a state_dict() would leave out. Tensors sharing storage (tied weights) are
+stored once and re-tied on load.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from .error_handler import SnapshotError
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the snapshot layout changes; older snapshots are rebuilt
+SNAPSHOT_FORMAT = "1"
+
+
+def snapshot_path(snapshot_dir: Union[str, Path], model_id: str, device: str, dtype: str) -> Path:
+    """
+    Snapshot file for a model on a device type in a dtype.
+
+    Args:
+        snapshot_dir: Directory holding snapshots
+        model_id: Hugging Face model ID
+        device: "cuda" | "mps" | "cpu"
+        dtype: torch dtype name, e.g. "bfloat16"
+
+    Returns:
+        Path of the .safetensors file (which may not exist yet)
+    """
+    name = model_id.replace("/", "--")
+    return Path(snapshot_dir) / f"{name}.{device}.{dtype}.safetensors"
+
+
+def save_snapshot(model, path: Union[str, Path], metadata: Optional[Dict[str, str]] = None):
+    """
+    Save every parameter and buffer of a loaded model to a snapshot file.
+
+    The file is written next to its destination and renamed into place, so
+    concurrently starting workers never read a partial snapshot.
+
+    Args:
+        model: torch.nn.Module with its weights on the target device and dtype
+        path: Destination .safetensors file
+        metadata: Extra string metadata checked again by load_snapshot()
+    """
+    from safetensors.torch import save_file
+
+    tensors: Dict[str, Any] = {}
+    aliases: Dict[str, str] = {}
+    owners: Dict[Any, str] = {}
+    storages = set()
+    for name, tensor in _named_tensors(model):
+        key = (tensor.data_ptr(), tensor.dtype, tuple(tensor.shape), tuple(tensor.stride()))
+        if key in owners:
+            aliases[name] = owners[key]
+            continue
+        owners[key] = name
+
+        tensor = tensor.detach().contiguous().cpu()
+        storage = tensor.untyped_storage().data_ptr()
+        # safetensors refuses distinct views of one storage (e.g. split fused weights)
+        tensors[name] = tensor.clone() if storage in storages else tensor
+        storages.add(storage)
+
+    header = {"format": SNAPSHOT_FORMAT, "aliases": json.dumps(aliases), **(metadata or {})}
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f".{path.name}.{os.getpid()}.partial")
+    try:
+        save_file(tensors, str(partial), metadata=header)
+        os.replace(partial, path)
+    finally:
+        if partial.exists():
+            partial.unlink()
+
+    logger.info(f"Saved weight snapshot ({len(tensors)} tensors) to {path}")
+
+
+def load_snapshot(
+    model,
+    path: Union[str, Path],
+    device: str,
+    metadata: Optional[Dict[str, str]] = None
+):
+    """
+    Attach a snapshot's tensors to a model skeleton in place.
+
+    The skeleton is typically built on the meta device, so no memory is
+    allocated for weights before the snapshot's tensors replace them.
+
+    Args:
+        model: torch.nn.Module with the snapshot's architecture
+        path: .safetensors file written by save_snapshot()
+        device: Device to load onto ("cpu" keeps the tensors memory-mapped)
+        metadata: Values the snapshot's metadata must match (e.g. dtype)
+
+    Raises:
+        SnapshotError: If the file is missing, was written for other metadata,
+            or does not cover every parameter and buffer of the model
+    """
+    from safetensors import safe_open
+    from safetensors.torch import load_file
+
+    path = Path(path)
+    if not path.exists():
+        raise SnapshotError(f"No snapshot at {path}")
+
+    with safe_open(str(path), framework="pt") as f:
+        header = f.metadata() or {}
+    expected = {"format": SNAPSHOT_FORMAT, **(metadata or {})}
+    stale = {k: header.get(k) for k, v in expected.items() if header.get(k) != v}
+    if stale:
+        raise SnapshotError(f"Snapshot {path} does not match this model: {stale}")
+
+    tensors = load_file(str(path), device=device)
+    for alias, name in json.loads(header.get("aliases", "{}")).items():
+        tensors[alias] = tensors[name]
+
+    missing = [name for name, _ in _named_tensors(model) if name not in tensors]
+    if missing:
+        raise SnapshotError(
+            f"Snapshot {path} is missing {len(missing)} tensors, e.g. {missing[:3]}"
+        )
+
+    # Tied names share one Parameter again, as after a regular load
+    parameters: Dict[int, Any] = {}
+    for name, _ in list(_named_tensors(model)):
+        _assign(model, name, tensors[name], parameters)
+
+    logger.info(f"Loaded weight snapshot from {path}")
+
+
+def _named_tensors(model):
+    """All parameters and buffers (persistent or not), tied ones under each name"""
+    yield from model.named_parameters(remove_duplicate=False)
+    yield from model.named_buffers(remove_duplicate=False)
+
+
+def _assign(model, name: str, tensor, parameters: Dict[int, Any]):
+    """Replace the parameter or buffer at a dotted name without copying tensor"""
+    import torch
+
+    module_path, _, attr = name.rpartition(".")
+    module = model.get_submodule(module_path) if module_path else model
+    if attr in module._parameters:
+        if id(tensor) not in parameters:
+            parameters[id(tensor)] = torch.nn.Parameter(tensor, requires_grad=False)
+        module._parameters[attr] = parameters[id(tensor)]
+    else:
+        module._buffers[attr] = tensor
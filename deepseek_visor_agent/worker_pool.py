@@ -0,0 +1,353 @@
+"""
+Worker Pool - Fork-after-load multi-process inference on CPU nodes
+
+A single DeepSeekOCRInference runs one page at a time, and PyTorch's
+intra-op parallelism stops paying off long before 64 cores. WorkerPool loads
+the model once in the parent process, then forks N worker processes that
+inherit it copy-on-write: the weight pages stay shared (model tensors are
+never written during inference), so N workers cost about one model's memory.
+
+Each worker is pinned to its own subset of cores and sets
+torch.set_num_threads() to that subset's size, so workers do not fight over
+cores. Pages (infer_batch) or whole documents (run_documents) are spread
+over the workers.
+
+WorkerPool is itself an InferenceBackend, so it drops into the rest of the
+package:
+
+    >>> pool = WorkerPool(DeepSeekOCRInference(device="cpu"), workers=8)
+    >>> tool = VisionDocumentTool(backend=pool)
+    >>> tool.run("report.pdf", pdf_batch_size=8)      # 8 pages in parallel
+    >>> pool.run_documents(["a.pdf", "b.pdf", ...])  # one document per worker
+
+The workers are forked when the pool is constructed, so construct it on the
+main thread before starting other threads: forking a process while another
+thread holds a lock (in torch, OpenMP or logging) can deadlock the child.
+
+Requires the "fork" start method (Linux). CUDA engines cannot be forked;
+use one process per GPU instead.
+"""
+
+import gc
+import itertools
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from .backends import DEFAULT_PROMPT, InferenceBackend
+
+logger = logging.getLogger(__name__)
+
+# Engines by pool ID; set before forking so each worker inherits its pool's engine
+_ENGINES: Dict[int, InferenceBackend] = {}
+_pool_ids = itertools.count()
+
+# Live pools that froze the garbage collector's heap (see _freeze_heap())
+_frozen_pools = 0
+_frozen_lock = threading.Lock()
+
+# Per-worker state, set by _init_worker in the child process
+_worker_index: Optional[int] = None
+_worker_tool = None
+
+
+def _available_cores() -> List[int]:
+    """Cores this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _split(items: Sequence[Any], parts: int) -> List[List[Any]]:
+    """Split items into parts contiguous, nearly equal slices"""
+    size, extra = divmod(len(items), parts)
+    slices, start = [], 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        slices.append(list(items[start:end]))
+        start = end
+    return slices
+
+
+def _freeze_heap():
+    """
+    Keep the collector from touching (and so copying) objects inherited by workers
+
+    gc.freeze() applies to the whole process, so it is counted: the heap is
+    frozen by the first live pool and unfrozen when the last one closes.
+    """
+    global _frozen_pools
+
+    with _frozen_lock:
+        _frozen_pools += 1
+        if _frozen_pools == 1:
+            gc.collect()
+            gc.freeze()
+
+
+def _unfreeze_heap():
+    """Release one pool's hold on the frozen heap (see _freeze_heap())"""
+    global _frozen_pools
+
+    with _frozen_lock:
+        _frozen_pools -= 1
+        if _frozen_pools == 0:
+            gc.unfreeze()
+
+
+def _worker_ready() -> Optional[int]:
+    """Child process: no-op used to make the executor fork its workers"""
+    return _worker_index
+
+
+def _init_worker(core_groups, pin_cores: bool):
+    """Child process: claim a core group, pin to it and size torch's thread pool"""
+    global _worker_index
+
+    _worker_index, cores = core_groups.get()
+    if pin_cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+
+    # torch is already imported if the engine uses it; the stub backend never does
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(len(cores))
+
+
+def _worker_infer_batch(pool_id: int, images, prompt: str, batch_size: int, kwargs):
+    """Child process: run one slice of pages through the inherited engine"""
+    results = _ENGINES[pool_id].infer_batch(images, prompt, batch_size=batch_size, **kwargs)
+    for result in results:
+        result["metadata"]["worker"] = _worker_index
+    return results
+
+
+def _worker_warmup(pool_id: int, image, mode: str) -> Optional[int]:
+    """Child process: warm up the inherited engine in one mode"""
+    _ENGINES[pool_id]._warmup_mode(image, mode)
+    return _worker_index
+
+
+def _worker_run_document(pool_id: int, path: Any, run_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Child process: process one whole document with a tool around the inherited engine"""
+    global _worker_tool
+
+    if _worker_tool is None:
+        from .tool import VisionDocumentTool
+        _worker_tool = VisionDocumentTool(backend=_ENGINES[pool_id])
+
+    result = _worker_tool.run(path, **run_kwargs)
+    result["metadata"]["worker"] = _worker_index
+    return result
+
+
+class WorkerPool(InferenceBackend):
+    """
+    Run an inference engine in several forked CPU worker processes.
+
+    The engine's model is loaded in the parent and the workers are forked in
+    the constructor, from the constructing thread, so workers start warm and
+    share its memory.
+    """
+
+    def __init__(
+        self,
+        engine: InferenceBackend,
+        workers: Optional[int] = None,
+        threads_per_worker: Optional[int] = None,
+        pin_cores: bool = True,
+        max_batch_size: int = 8
+    ):
+        """
+        Initialize the pool: load the model and fork the workers.
+
+        Call this before starting other threads in the process (including a
+        VisionDocumentTool's preload or asyncio executor threads), so no
+        worker is forked while another thread holds a lock.
+
+        Args:
+            engine: Backend whose model the workers share (must run on CPU)
+            workers: Number of worker processes (default: one per
+                threads_per_worker cores, or one per 4 cores)
+            threads_per_worker: Cores (and torch threads) per worker
+                (default: the available cores divided evenly)
+            pin_cores: Restrict each worker to its own cores with sched_setaffinity
+            max_batch_size: Maximum number of concurrent ainfer() requests per batch
+        """
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("WorkerPool requires the 'fork' start method (Linux)")
+        if engine.config.get("device", "cpu") != "cpu":
+            raise ValueError(
+                f"WorkerPool shares a CPU model between forked processes; "
+                f"got an engine on {engine.config['device']}"
+            )
+
+        cores = _available_cores()
+        if workers is None:
+            workers = max(1, len(cores) // (threads_per_worker or 4))
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+        if threads_per_worker is None:
+            threads_per_worker = max(1, len(cores) // workers)
+
+        super().__init__(max_batch_size=max_batch_size)
+        self.engine = engine
+        self.config = dict(engine.config)
+        self.workers = workers
+        self.pin_cores = pin_cores
+
+        # Workers beyond the available cores share groups round-robin
+        groups = _split(cores[:workers * threads_per_worker], min(workers, len(cores)))
+        self.core_groups = [groups[i % len(groups)] for i in range(workers)]
+
+        self._pool_id = next(_pool_ids)
+        self._closed = False
+        self._executor = self._fork_workers()
+
+    def _fork_workers(self) -> ProcessPoolExecutor:
+        """Load the model here, then fork every worker from this thread"""
+        self.engine._load()
+        _ENGINES[self._pool_id] = self.engine
+
+        context = multiprocessing.get_context("fork")
+        core_groups = context.Queue()
+        for assignment in enumerate(self.core_groups):
+            core_groups.put(assignment)
+
+        _freeze_heap()
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(core_groups, self.pin_cores)
+        )
+        # The executor forks all of its workers on the first submit (with the
+        # fork start method), so submit one now rather than from whichever
+        # thread first calls infer_batch()
+        executor.submit(_worker_ready).result()
+
+        logger.info(
+            f"Started {self.workers} inference workers "
+            f"({len(self.core_groups[0])} cores each)"
+        )
+        return executor
+
+    def _start(self) -> ProcessPoolExecutor:
+        """The running workers"""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("WorkerPool is closed")
+            return self._executor
+
+    def _load(self):
+        """The model was loaded and the workers forked by the constructor"""
+        self._start()
+
+    def _warmup_mode(self, image: "Image.Image", mode: str):
+        """Warm up the workers: as many warm-up calls as there are workers, run concurrently"""
+        executor = self._start()
+        futures = [
+            executor.submit(_worker_warmup, self._pool_id, image, mode)
+            for _ in range(self.workers)
+        ]
+        for future in futures:
+            future.result()
+
+    def infer(
+        self,
+        image_path: Union[str, Path, "Image.Image"],
+        prompt: str = DEFAULT_PROMPT,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Run OCR inference on one image in a worker"""
+        return self.infer_batch([image_path], prompt, batch_size=1, **kwargs)[0]
+
+    def infer_batch(
+        self,
+        images: Sequence[Union[str, Path, "Image.Image"]],
+        prompt: str = DEFAULT_PROMPT,
+        batch_size: int = 4,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """
+        Run OCR inference on several images, spread over the workers.
+
+        Images are split into one contiguous slice per worker (fewer if there
+        are fewer images); each worker runs its slice with the engine's
+        infer_batch(batch_size=...). Results are in input order, with
+        metadata["worker"] recording the worker that produced them.
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+
+        images = [str(image) if isinstance(image, Path) else image for image in images]
+        if not images:
+            return []
+
+        executor = self._start()
+        slices = _split(images, min(self.workers, len(images)))
+        futures = [
+            executor.submit(_worker_infer_batch, self._pool_id, chunk, prompt, batch_size, kwargs)
+            for chunk in slices
+        ]
+        return [result for future in futures for result in future.result()]
+
+    def run_documents(
+        self,
+        paths: Sequence[Any],
+        **run_kwargs
+    ) -> List[Dict[str, Any]]:
+        """
+        Process whole documents in parallel, one document per worker at a time.
+
+        Args:
+            paths: Image or PDF files, or documents in memory such as bytes
+                (anything VisionDocumentTool.run() accepts that can be pickled)
+            **run_kwargs: Arguments for VisionDocumentTool.run()
+
+        Returns:
+            list: VisionDocumentTool.run() results in input order, with
+                metadata["worker"] recording the worker that produced them
+        """
+        executor = self._start()
+        futures = [
+            executor.submit(
+                _worker_run_document,
+                self._pool_id,
+                str(path) if isinstance(path, Path) else path,
+                run_kwargs
+            )
+            for path in paths
+        ]
+        return [future.result() for future in futures]
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool layout"""
+        return {
+            "workers": self.workers,
+            "cores_per_worker": [len(group) for group in self.core_groups],
+            "pinned": self.pin_cores,
+            "started": not self._closed,
+        }
+
+    def close(self):
+        """Stop the workers and the async scheduler"""
+        super().close()
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._executor.shutdown()
+        _unfreeze_heap()
+        _ENGINES.pop(self._pool_id, None)
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -20,3 +20,79 @@ def sample_invoice_path(test_data_dir):
 def sample_contract_path(test_data_dir):
     """Path to sample contract image"""
     return test_data_dir / "contract_sample.pdf"
+
+
+@pytest.fixture
+def make_pdf(tmp_path):
+    """
+    Factory for small PDFs written to tmp_path.
+
+    pages is a page count (pages read "Page 1", "Page 2", ...) or a list of
+    page texts, with None for a blank page. sizes optionally gives each
+    page's (width, height) in points.
+    """
+    fitz = pytest.importorskip("fitz")
+
+    def make(pages, sizes=None, fontsize=12, name="doc.pdf"):
+        if isinstance(pages, int):
+            pages = [f"Page {i + 1}" for i in range(pages)]
+        sizes = sizes or [(595, 842)] * len(pages)
+        doc = fitz.open()
+        for text, (width, height) in zip(pages, sizes):
+            page = doc.new_page(width=width, height=height)
+            if text:
+                page.insert_text(fitz.Point(50, 50), text, fontsize=fontsize)
+        path = tmp_path / name
+        doc.save(str(path))
+        doc.close()
+        return path
+
+    return make
+
+
+@pytest.fixture
+def remote_model(monkeypatch):
+    """
+    Factory for a stand-in of DeepSeek-OCR's remote model code.
+
+    Returns a module registered in sys.modules that holds a FakeModel class
+    and, unless with_loader is False, the module-level load_image() the
+    engine patches to serve in-memory images. FakeModel.infer() records
+    every image_file in module.seen and returns respond(image_file, **kwargs),
+    or the decoded image's "WIDTHxHEIGHT" when respond is None.
+    """
+    import itertools
+    import sys
+    import types
+
+    from PIL import Image
+
+    counter = itertools.count()
+
+    def make(respond=None, with_loader=True):
+        module = types.ModuleType(f"fake_remote_{next(counter)}")
+        module.seen = []
+
+        if with_loader:
+            def load_image(image_path):
+                return Image.open(image_path)
+
+            module.load_image = load_image
+
+        class FakeModel:
+            def infer(self, tokenizer, prompt, image_file, **kwargs):
+                module.seen.append(image_file)
+                if respond is not None:
+                    return respond(image_file, **kwargs)
+                if with_loader:
+                    image = module.load_image(f"{image_file}")
+                else:
+                    image = Image.open(image_file)
+                return f"{image.size[0]}x{image.size[1]}"
+
+        FakeModel.__module__ = module.__name__
+        module.FakeModel = FakeModel
+        monkeypatch.setitem(sys.modules, module.__name__, module)
+        return module
+
+    return make
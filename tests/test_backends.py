@@ -0,0 +1,108 @@
+"""Tests for inference backends"""
+
+import asyncio
+import time
+
+import pytest
+from PIL import Image
+
+from deepseek_visor_agent import VisionDocumentTool, InferenceBackend, StubBackend
+from deepseek_visor_agent.backends import create_backend
+from deepseek_visor_agent.infer import DeepSeekOCRInference
+
+
+def test_inference_backend_is_abstract():
+    with pytest.raises(TypeError):
+        InferenceBackend()
+
+
+def test_deepseek_engine_implements_backend():
+    assert issubclass(DeepSeekOCRInference, InferenceBackend)
+
+
+class TestStubBackend:
+    """Deterministic synthetic backend"""
+
+    def test_same_image_same_markdown(self):
+        backend = StubBackend()
+        first = backend.infer(Image.new("RGB", (20, 20), "white"))
+        second = backend.infer(Image.new("RGB", (20, 20), "white"))
+        other = backend.infer(Image.new("RGB", (20, 20), "black"))
+
+        assert first["markdown"] == second["markdown"]
+        assert first["markdown"] != other["markdown"]
+        assert first["metadata"]["model"] == "stub"
+
+    def test_synthetic_markdown_parses_as_invoice(self):
+        tool = VisionDocumentTool(backend="stub")
+        image = Image.new("RGB", (30, 30), "white")
+
+        result = tool.engine.infer(image)
+        document_type, fields, confidence = tool._analyze(result["markdown"])
+
+        assert document_type == "invoice"
+        assert fields["total"].startswith("$")
+        assert confidence == 1.0
+
+    def test_canned_and_callable_markdown(self):
+        image = Image.new("RGB", (10, 10), "white")
+
+        assert StubBackend(markdown="fixed").infer(image)["markdown"] == "fixed"
+        sized = StubBackend(markdown=lambda img: f"{img.size[0]}px")
+        assert sized.infer(image)["markdown"] == "10px"
+
+    def test_latency_is_simulated_per_image_and_per_batch(self):
+        backend = StubBackend(latency_ms=10, batch_overhead_ms=30)
+        images = [Image.new("RGB", (10, 10), "white")] * 4
+
+        start = time.perf_counter()
+        results = backend.infer_batch(images, batch_size=4)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        assert len(results) == 4
+        assert elapsed_ms >= 70
+        assert backend.calls == 1
+        assert backend.images_processed == 4
+
+    @pytest.mark.asyncio
+    async def test_ainfer_uses_scheduler(self):
+        backend = StubBackend(markdown="async", latency_ms=5)
+
+        results = await asyncio.gather(
+            *(backend.ainfer(Image.new("RGB", (5, 5), "white")) for _ in range(6))
+        )
+
+        assert [r["markdown"] for r in results] == ["async"] * 6
+        assert backend.calls < 6
+        backend.close()
+
+
+    def test_warmup_runs_every_enabled_mode(self):
+        assert StubBackend(inference_mode="base").warmup_modes() == ["base"]
+
+        backend = StubBackend(inference_mode="adaptive", latency_ms={"gundam": 5})
+        report = backend.warmup()
+
+        assert list(report["modes"]) == ["tiny", "small", "base", "large", "gundam"]
+        assert report["modes"]["gundam"]["warmup_time_ms"] >= 5
+        assert backend.calls == 5
+
+
+class TestCreateBackend:
+    """Backend selection"""
+
+    def test_instance_is_returned_as_is(self):
+        backend = StubBackend()
+        assert create_backend(backend) is backend
+
+    def test_stub_by_name(self):
+        assert isinstance(create_backend("stub"), StubBackend)
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError, match="Unknown backend"):
+            create_backend("tpu")
+
+    def test_tool_backend_argument(self):
+        tool = VisionDocumentTool(backend="stub", inference_mode="base")
+        assert isinstance(tool.engine, StubBackend)
+        assert tool.engine.config["inference_mode"] == "base"
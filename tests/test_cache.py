@@ -0,0 +1,98 @@
+"""Tests for the OCR result cache"""
+
+import pytest
+from PIL import Image
+
+from deepseek_visor_agent.utils.cache import OCRCache, hash_image
+
+MODE = {"base_size": 512, "image_size": 512, "crop_mode": False}
+
+
+def _result(markdown):
+    return {"markdown": markdown, "raw_output": markdown, "metadata": {"inference_time_ms": 5}}
+
+
+class TestHashImage:
+    """Content hashing of images"""
+
+    def test_identical_images_hash_equal(self):
+        a = Image.new("RGB", (10, 10), "white")
+        b = Image.new("RGB", (10, 10), "white")
+        assert hash_image(a) == hash_image(b)
+
+    def test_different_pixels_hash_differently(self):
+        a = Image.new("RGB", (10, 10), "white")
+        b = Image.new("RGB", (10, 10), "black")
+        assert hash_image(a) != hash_image(b)
+
+    def test_file_hash_uses_content(self, tmp_path):
+        first = tmp_path / "a.bin"
+        second = tmp_path / "b.bin"
+        first.write_bytes(b"same")
+        second.write_bytes(b"same")
+        assert hash_image(first) == hash_image(second)
+
+
+class TestMakeKey:
+    """Cache key composition"""
+
+    def test_key_depends_on_prompt_and_mode(self):
+        base = OCRCache.make_key("abc", "prompt", MODE, "model")
+        assert base == OCRCache.make_key("abc", "prompt", dict(MODE), "model")
+        assert base != OCRCache.make_key("abc", "other prompt", MODE, "model")
+        assert base != OCRCache.make_key("abc", "prompt", {**MODE, "base_size": 1024}, "model")
+        assert base != OCRCache.make_key("abc", "prompt", {**MODE, "crop_mode": True}, "model")
+        assert base != OCRCache.make_key("abd", "prompt", MODE, "model")
+
+
+class TestOCRCache:
+    """Memory LRU and SQLite tiers"""
+
+    def test_get_returns_copy(self):
+        cache = OCRCache()
+        cache.put("k", _result("hello"))
+
+        first = cache.get("k")
+        first["markdown"] = "mutated"
+
+        assert cache.get("k")["markdown"] == "hello"
+        assert cache.stats()["hits"] == 2
+
+    def test_miss_is_counted(self):
+        cache = OCRCache()
+        assert cache.get("missing") is None
+        assert cache.stats()["misses"] == 1
+
+    def test_lru_eviction_by_bytes(self):
+        entry_size = len(b'{"markdown": "x", "raw_output": "x", "metadata": {"inference_time_ms": 5}}')
+        cache = OCRCache(max_memory_bytes=entry_size * 2)
+
+        cache.put("a", _result("x"))
+        cache.put("b", _result("x"))
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", _result("x"))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.stats()["memory_bytes"] <= entry_size * 2
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        db_path = tmp_path / "cache.db"
+        cache = OCRCache(disk_path=db_path)
+        cache.put("k", _result("persisted"))
+        cache.close()
+
+        reopened = OCRCache(disk_path=db_path)
+
+        assert reopened.get("k")["markdown"] == "persisted"
+        assert reopened.stats()["disk_hits"] == 1
+        reopened.close()
+
+    def test_clear(self, tmp_path):
+        cache = OCRCache(disk_path=tmp_path / "cache.db")
+        cache.put("k", _result("x"))
+        cache.clear()
+
+        assert cache.get("k") is None
+        cache.close()
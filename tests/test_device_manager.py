@@ -2,6 +2,7 @@
 
 import pytest
 from deepseek_visor_agent import DeviceManager
+from deepseek_visor_agent.device_manager import MemoryBudget
 
 
 def test_device_detection():
@@ -22,3 +23,52 @@ def test_device_info():
     info = DeviceManager.get_device_info()
     assert isinstance(info, str)
     assert len(info) > 0
+
+
+class TestMemoryBudget:
+    """Peak memory bookkeeping and admission"""
+
+    @pytest.fixture
+    def budget(self, monkeypatch):
+        budget = MemoryBudget("cpu", margin=0.0)
+        monkeypatch.setattr(budget, "headroom_bytes", lambda: 10e9)
+        return budget
+
+    def test_unmeasured_work_fits(self, budget):
+        assert budget.predict("base", 3) is None
+        assert budget.fits("base", 3, count=100)
+        assert budget.max_batch_size("base", 3, 8) == 8
+
+    def test_records_largest_peak_per_image(self, budget):
+        budget.record("base", 3, 4e9, batch_size=2)
+        budget.record("base", 3, 1e9)
+
+        assert budget.predict("base", 3, count=3) == pytest.approx(6e9)
+        assert budget.fits("base", 3, count=5)
+        assert not budget.fits("base", 3, count=6)
+        assert budget.max_batch_size("base", 3, 8) == 5
+
+    def test_smaller_images_borrow_larger_measurement(self, budget):
+        budget.record("base", 4, 3e9)
+        budget.record("base", 6, 9e9)
+
+        assert budget.predict("base", 2) == pytest.approx(3e9)
+        assert budget.predict("base", 5) == pytest.approx(9e9)
+        assert budget.predict("base", 7) is None
+        assert budget.predict("large", 2) is None
+
+    def test_never_shrinks_batch_below_one(self, budget):
+        budget.record("gundam", 3, 20e9)
+
+        assert budget.max_batch_size("gundam", 3, 8) == 1
+
+    def test_measure_records_allocation(self):
+        budget = MemoryBudget("cpu")
+        with budget.measure("tiny", 0, batch_size=1):
+            buffer = bytearray(64 * 1024 * 1024)
+            buffer[::4096] = b"x" * len(buffer[::4096])
+
+        assert budget.predict("tiny", 0) > 32e6
+
+    def test_shared_per_device(self):
+        assert DeviceManager.memory_budget("cpu") is DeviceManager.memory_budget("cpu")
@@ -0,0 +1,73 @@
+"""Tests for accepting documents from memory"""
+
+import io
+
+import pytest
+from PIL import Image
+
+from deepseek_visor_agent.utils.document_input import open_document, sniff_format
+from deepseek_visor_agent.utils.error_handler import ImageProcessingError
+
+
+def _image_bytes(fmt="PNG", mode="RGB"):
+    buffer = io.BytesIO()
+    Image.new(mode, (30, 20), "white").save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def test_sniff_format():
+    assert sniff_format(b"%PDF-1.7\n...") == "pdf"
+    # Junk before the header is allowed within the first 1KB
+    assert sniff_format(b"\x00" * 100 + b"%PDF-1.4") == "pdf"
+    assert sniff_format(_image_bytes("PNG")) == "png"
+    assert sniff_format(_image_bytes("JPEG")) == "jpeg"
+    assert sniff_format(_image_bytes("WEBP")) == "webp"
+    assert sniff_format(b"plain text") is None
+
+
+def test_paths_pass_through(tmp_path):
+    assert open_document(tmp_path / "scan.PDF")[:2] == ("pdf", str(tmp_path / "scan.PDF"))
+    assert open_document("page.png")[:2] == ("image", "page.png")
+
+
+@pytest.mark.parametrize("wrap", [bytes, bytearray, memoryview, io.BytesIO])
+def test_pdf_from_memory(wrap, make_pdf):
+    data = make_pdf(2).read_bytes()
+
+    document = open_document(wrap(data))
+
+    assert document.kind == "pdf"
+    assert document.data == data
+
+
+@pytest.mark.parametrize("fmt, mode", [("PNG", "RGBA"), ("JPEG", "L"), ("GIF", "P")])
+def test_image_from_memory(fmt, mode):
+    document = open_document(io.BytesIO(_image_bytes(fmt, mode)))
+
+    assert document.kind == "image"
+    assert document.data.size == (30, 20)
+    assert document.data.mode in ("L", "RGB")
+
+
+def test_numpy_array():
+    np = pytest.importorskip("numpy")
+
+    rgba = open_document(np.zeros((20, 30, 4), dtype=np.uint8))
+    gray = open_document(np.zeros((20, 30), dtype=np.uint8))
+
+    assert rgba.kind == "image"
+    assert (rgba.data.size, rgba.data.mode) == ((30, 20), "RGB")
+    assert gray.data.mode == "L"
+
+
+def test_pil_image_passes_through():
+    image = Image.new("RGB", (10, 10))
+
+    assert open_document(image).data is image
+
+
+def test_unsupported_input():
+    with pytest.raises(ImageProcessingError, match="Cannot decode"):
+        open_document(b"definitely not a document")
+    with pytest.raises(ImageProcessingError, match="Unsupported document type"):
+        open_document(42)
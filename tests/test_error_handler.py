@@ -0,0 +1,182 @@
+"""Tests for OOM fallback handling"""
+
+import pytest
+from PIL import Image
+
+from deepseek_visor_agent.infer import DeepSeekOCRInference
+from deepseek_visor_agent.utils.error_handler import (
+    FallbackController,
+    OCRError,
+    is_oom_error,
+    size_bucket,
+)
+
+
+def _oom():
+    return RuntimeError("CUDA out of memory. Tried to allocate 2.00 GiB")
+
+
+def test_size_bucket(tmp_path):
+    assert size_bucket(Image.new("L", (512, 512))) == 0
+    assert size_bucket(Image.new("L", (1024, 1024))) == 2
+    assert size_bucket(Image.new("L", (1191, 1684))) == 3
+
+    path = tmp_path / "page.png"
+    Image.new("L", (1024, 1024)).save(path)
+    assert size_bucket(path) == 2
+    assert size_bucket(tmp_path / "missing.png") == 0
+
+
+def test_is_oom_error():
+    assert is_oom_error(_oom())
+    assert is_oom_error(MemoryError())
+    assert is_oom_error(RuntimeError(
+        "[enforce fail at alloc_cpu.cpp:114] . DefaultCPUAllocator: can't allocate memory: "
+        "you tried to allocate 4294967296 bytes. Error code 12 (Cannot allocate memory)"
+    ))
+    assert not is_oom_error(RuntimeError("shape mismatch"))
+
+
+class TestFallbackController:
+    """Remembered OOM outcomes and upward probing"""
+
+    def test_predicts_oom_for_same_or_larger_images(self):
+        controller = FallbackController()
+        controller.record_oom("gundam", 3)
+
+        assert controller.select_mode("gundam", 3) == "large"
+        assert controller.select_mode("gundam", 4) == "large"
+        assert controller.select_mode("gundam", 2) == "gundam"
+        assert controller.select_mode("base", 3) == "base"
+
+    def test_oom_in_cheaper_mode_blocks_higher_modes(self):
+        controller = FallbackController()
+        controller.record_oom("base", 3)
+
+        assert controller.select_mode("gundam", 3) == "small"
+
+    def test_run_falls_back_and_remembers(self):
+        controller = FallbackController()
+        attempts = []
+
+        def attempt(mode):
+            attempts.append(mode)
+            if mode in ("gundam", "large"):
+                raise _oom()
+            return mode
+
+        assert controller.run("gundam", 3, attempt) == "base"
+        assert attempts == ["gundam", "large", "base"]
+
+        attempts.clear()
+        mode = controller.select_mode("gundam", 3)
+        assert controller.run(mode, 3, attempt) == "base"
+        assert attempts == ["base"]
+        assert controller.stats()["avoided"] == 1
+
+    def test_memory_error_falls_back_and_is_remembered(self):
+        controller = FallbackController()
+
+        def attempt(mode):
+            if mode == "gundam":
+                raise MemoryError()
+            return mode
+
+        assert controller.run("gundam", 3, attempt) == "large"
+        assert controller.stats()["ooms"] == 1
+        assert controller.select_mode("gundam", 3) == "large"
+
+    def test_other_errors_fall_back_without_being_remembered(self):
+        controller = FallbackController()
+
+        def attempt(mode):
+            if mode == "gundam":
+                raise RuntimeError("shape mismatch")
+            return mode
+
+        assert controller.run("gundam", 3, attempt) == "large"
+        assert controller.select_mode("gundam", 3) == "gundam"
+
+    def test_all_modes_failing_raises(self):
+        def attempt(mode):
+            raise _oom()
+
+        with pytest.raises(OCRError):
+            FallbackController().run("base", 0, attempt)
+
+    def test_probes_after_backoff_and_recovers(self):
+        controller = FallbackController(probe_after_s=0)
+        controller.record_oom("gundam", 3)
+
+        mode = controller.select_mode("gundam", 3)
+        assert mode == "gundam"
+        assert controller.run(mode, 3, lambda mode: mode) == "gundam"
+        assert controller.stats()["recovered"] == 1
+        assert controller.stats()["records"] == {}
+
+    def test_failed_probe_doubles_backoff(self):
+        controller = FallbackController(probe_after_s=10, max_backoff_s=15)
+        controller.record_oom("gundam", 3)
+        controller.record_oom("gundam", 3)
+        controller.record_oom("gundam", 3)
+
+        record = controller._records[("gundam", 3)]
+        assert record.failures == 3
+        assert record.backoff_s == 15
+
+    def test_probes_when_memory_frees_up(self):
+        memory = [10.0]
+        controller = FallbackController(memory_gb=lambda: memory[0], probe_memory_gb=2.0)
+        controller.record_oom("gundam", 3)
+
+        assert controller.select_mode("gundam", 3) == "large"
+        memory[0] = 13.0
+        assert controller.select_mode("gundam", 3) == "gundam"
+        assert controller.stats()["probes"] == 1
+
+
+def test_engine_starts_at_predicted_mode(remote_model):
+    modes = []
+
+    def respond(image_file, image_size, crop_mode, **kwargs):
+        modes.append((image_size, crop_mode))
+        if crop_mode:
+            raise _oom()
+        return "page"
+
+    engine = DeepSeekOCRInference(inference_mode="gundam", device="cpu")
+    engine.model = remote_model(respond).FakeModel()
+    engine.tokenizer, engine._initialized = object(), True
+    page = Image.new("RGB", (1191, 1684), "white")
+
+    first = engine.infer(page)
+    second = engine.infer_batch([page, page], batch_size=2)
+
+    assert first["metadata"]["inference_mode"] == "large"
+    assert [r["metadata"]["inference_mode"] for r in second] == ["large", "large"]
+    # gundam was attempted once; afterwards the recorded OOM predicted the failure
+    assert modes == [(640, True), (1280, False), (1280, False), (1280, False)]
+    # The configured mode is left alone, so the engine can step back up later
+    assert engine.config["inference_mode"] == "gundam"
+
+
+def test_batch_falls_back_per_image(remote_model):
+    modes = []
+
+    def respond(image_file, image_size, **kwargs):
+        modes.append(image_size)
+        if len(modes) == 2:
+            raise _oom()
+        return f"page {len(modes)}"
+
+    engine = DeepSeekOCRInference(inference_mode="gundam", device="cpu")
+    engine.model = remote_model(respond).FakeModel()
+    engine.tokenizer, engine._initialized = object(), True
+    pages = [Image.new("RGB", (600, 800), "white") for _ in range(3)]
+
+    results = engine.infer_batch(pages, batch_size=3)
+
+    # Only the page that ran out of memory is redone, in a lower mode
+    assert modes == [640, 640, 1280, 640]
+    assert [r["metadata"]["inference_mode"] for r in results] == ["gundam", "large", "gundam"]
+    assert [r["markdown"] for r in results] == ["page 1", "page 3", "page 4"]
@@ -0,0 +1,46 @@
+"""Tests that the document-processing modules import without inference dependencies"""
+
+import subprocess
+import sys
+
+import pytest
+from PIL import Image
+
+HEAVY_MODULES = ("torch", "transformers", "psutil")
+
+
+@pytest.mark.parametrize("target", [
+    "deepseek_visor_agent",
+    "deepseek_visor_agent.tool",
+    "deepseek_visor_agent.parsers.classifier",
+    "deepseek_visor_agent.parsers.invoice",
+    "deepseek_visor_agent.parsers.contract",
+    "deepseek_visor_agent.utils",
+])
+def test_import_does_not_load_inference_dependencies(target):
+    code = (
+        f"import sys, {target}\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert completed.stdout.strip() == ""
+
+
+def test_stub_pipeline_runs_without_torch(tmp_path):
+    image_path = tmp_path / "page.png"
+    Image.new("RGB", (200, 300), "white").save(image_path)
+    code = (
+        "import sys\n"
+        "from deepseek_visor_agent import StubBackend, VisionDocumentTool\n"
+        "tool = VisionDocumentTool(backend=StubBackend())\n"
+        f"tool.run({str(image_path)!r})\n"
+        "print('torch' in sys.modules)"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert completed.stdout.strip() == "False"
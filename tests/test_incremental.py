@@ -0,0 +1,115 @@
+"""Tests for page-by-page classification and field merging"""
+
+from unittest.mock import patch
+
+from deepseek_visor_agent.parsers.classifier import IncrementalClassifier, classify_document
+from deepseek_visor_agent.parsers.contract import ContractParser
+from deepseek_visor_agent.parsers.incremental import DocumentAnalysis, IncrementalExtractor
+from deepseek_visor_agent.parsers.invoice import InvoiceParser
+
+INVOICE_PAGES = [
+    "INVOICE #1001\nVendor: Acme Corp\nDate: 2024-01-15\nSubtotal: $90.00",
+    "Item list continued\nTotal: $100.00",
+    "Adjustments\nGrand Total: $120.00",
+]
+
+
+class TestIncrementalExtractor:
+    """Merging one parser's fields across pages"""
+
+    def test_first_and_best_strategies(self):
+        extractor = IncrementalExtractor(InvoiceParser())
+        for page_num, markdown in enumerate(INVOICE_PAGES):
+            extractor.add(page_num, markdown)
+
+        assert extractor.fields["vendor"] == "Acme Corp"
+        assert extractor.fields["date"] == "2024-01-15"
+        assert extractor.fields["total"] == "$120.00"
+        assert extractor.field_pages == {"total": [2], "date": [0], "vendor": [0], "items": []}
+        assert extractor.confidence == 1.0
+        assert extractor.is_complete
+
+    def test_labelled_total_beats_later_fallback_amount(self):
+        pages = ["INVOICE\nGrand Total: $500.00", "Late fee per month: $25.00"]
+        extractor = IncrementalExtractor(InvoiceParser())
+        for page_num, markdown in enumerate(pages):
+            extractor.add(page_num, markdown)
+
+        # Same as parsing the pages as one document
+        assert InvoiceParser().parse("\n".join(pages))["total"] == "$500.00"
+        assert extractor.fields["total"] == "$500.00"
+        assert extractor.field_pages["total"] == [0]
+
+    def test_later_total_wins_at_equal_rank(self):
+        extractor = IncrementalExtractor(InvoiceParser())
+        extractor.add(0, "Total: $90.00")
+        extractor.add(1, "Total: $99.00")
+
+        assert extractor.fields["total"] == "$99.00"
+        assert extractor.field_pages["total"] == [1]
+
+    def test_union_strategy(self):
+        extractor = IncrementalExtractor(ContractParser())
+        extractor.add(0, "Party A: Alpha Holdings\n")
+        extractor.add(1, "Party B: Beta Services\nParty A: Alpha Holdings")
+
+        assert sorted(extractor.fields["parties"]) == ["Alpha Holdings", "Beta Services"]
+        assert extractor.field_pages["parties"] == [0, 1]
+
+    def test_settled_fields_are_not_extracted_again(self):
+        parser = InvoiceParser()
+        extractor = IncrementalExtractor(parser)
+        extractor.add(0, INVOICE_PAGES[0])
+
+        with patch.object(parser, "extract_ranked", wraps=parser.extract_ranked) as extract:
+            extractor.add(1, INVOICE_PAGES[1])
+
+        requested = extract.call_args[0][1]
+        assert "vendor" not in requested and "date" not in requested
+        assert "total" in requested
+
+    def test_incomplete_until_required_fields_found(self):
+        extractor = IncrementalExtractor(InvoiceParser())
+        extractor.add(0, "Vendor: Acme\nDate: 2024-01-15")
+
+        assert not extractor.is_complete
+        assert extractor.confidence == 2 / 3
+
+
+class TestIncrementalClassifier:
+    """Classifying a document one page at a time"""
+
+    def test_matches_whole_document(self):
+        pages = ["Cover page", "This Agreement between Alpha and Beta", "Governing law: Ohio"]
+        classifier = IncrementalClassifier()
+        for page in pages:
+            classifier.add(page)
+
+        assert classifier.document_type == classify_document("\n".join(pages))
+        assert classifier.document_type == "contract"
+
+    def test_empty_is_general(self):
+        assert IncrementalClassifier().document_type == "general"
+
+
+class TestDocumentAnalysis:
+    """Running classification with merged fields"""
+
+    def test_type_change_replays_earlier_pages(self):
+        parsers = {"invoice": InvoiceParser(), "contract": ContractParser()}
+        analysis = DocumentAnalysis(parsers)
+
+        analysis.add(0, "Effective Date: 2024-01-01\nPayment")
+        analysis.add(1, "This Agreement between Alpha Corp and Beta LLC. Whereas the parties hereby agree")
+
+        assert analysis.document_type == "contract"
+        assert analysis.fields["effective_date"] == "2024-01-01"
+        assert analysis.field_pages["effective_date"] == [0]
+
+    def test_fixed_type_without_extraction(self):
+        analysis = DocumentAnalysis({"invoice": InvoiceParser()}, "invoice", extract_fields=False)
+        analysis.add(0, INVOICE_PAGES[0])
+
+        assert analysis.document_type == "invoice"
+        assert analysis.fields == {}
+        assert analysis.confidence == 1.0
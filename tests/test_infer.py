@@ -0,0 +1,159 @@
+"""Tests for DeepSeekOCRInference using a stand-in for the remote model code"""
+
+import pytest
+from PIL import Image
+
+from deepseek_visor_agent.infer import DeepSeekOCRInference, MEMORY_IMAGE_PREFIX
+from deepseek_visor_agent.registry import ModelRegistry
+from deepseek_visor_agent.utils.cache import OCRCache
+
+
+@pytest.fixture
+def engine():
+    engine = DeepSeekOCRInference(inference_mode="tiny", device="cpu")
+    engine.tokenizer = object()
+    engine._initialized = True
+    return engine
+
+
+def test_pil_image_served_from_memory(engine, remote_model, tmp_path, monkeypatch):
+    module = remote_model()
+    engine.model = module.FakeModel()
+    monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+
+    result = engine.infer(Image.new("RGB", (32, 16), "white"))
+
+    assert result["markdown"] == "32x16"
+    assert module.seen[0].startswith(MEMORY_IMAGE_PREFIX)
+    # Only the scratch output directory may exist; no image files were written
+    assert not any(p.is_file() for p in tmp_path.rglob("*"))
+
+
+def test_path_input_uses_original_loader(engine, remote_model, tmp_path):
+    module = remote_model()
+    engine.model = module.FakeModel()
+    image_path = tmp_path / "page.png"
+    Image.new("RGB", (8, 4), "white").save(image_path)
+
+    result = engine.infer(image_path)
+
+    assert result["markdown"] == "8x4"
+    assert module.seen == [str(image_path)]
+
+
+def test_pil_image_falls_back_to_temp_file(engine, remote_model):
+    module = remote_model(with_loader=False)
+    engine.model = module.FakeModel()
+
+    result = engine.infer(Image.new("RGB", (20, 10), "white"))
+
+    assert result["markdown"] == "20x10"
+    assert module.seen[0].endswith(".bmp")
+
+
+def test_infer_batch_preserves_order(engine, remote_model):
+    module = remote_model()
+    engine.model = module.FakeModel()
+    images = [Image.new("RGB", (10 + i, 5), "white") for i in range(5)]
+
+    results = engine.infer_batch(images, batch_size=2)
+
+    assert [r["markdown"] for r in results] == [f"{10 + i}x5" for i in range(5)]
+    assert [r["metadata"]["batch_size"] for r in results] == [2, 2, 2, 2, 1]
+
+
+def test_infer_batch_records_peak_memory_per_image(engine, remote_model, monkeypatch):
+    module = remote_model()
+    engine.model = module.FakeModel()
+    recorded = []
+    monkeypatch.setattr(
+        engine.memory_budget, "record",
+        lambda mode, bucket, peak_bytes, batch_size=1: recorded.append(batch_size)
+    )
+
+    engine.infer_batch([Image.new("RGB", (10, 5), "white") for _ in range(3)], batch_size=3)
+
+    # Images are decoded one at a time, so no peak is divided by the batch size
+    assert recorded == [1, 1, 1]
+
+
+def test_infer_batch_rejects_invalid_batch_size(engine):
+    with pytest.raises(ValueError):
+        engine.infer_batch([], batch_size=0)
+
+
+def test_cache_skips_repeated_inference(engine, remote_model, tmp_path):
+    module = remote_model()
+    engine.model = module.FakeModel()
+    engine.cache = OCRCache(disk_path=tmp_path / "cache.db")
+    image = Image.new("RGB", (12, 6), "white")
+
+    first = engine.infer(image)
+    second = engine.infer(image.copy())
+
+    assert len(module.seen) == 1
+    assert second["markdown"] == first["markdown"]
+    assert second["metadata"]["cache_hit"] is True
+    assert "cache_hit" not in first["metadata"]
+
+
+def test_cache_is_keyed_on_mode(engine, remote_model):
+    module = remote_model()
+    engine.model = module.FakeModel()
+    engine.cache = OCRCache()
+    image = Image.new("RGB", (12, 6), "white")
+
+    engine.infer(image)
+    engine.config["inference_mode"] = "small"
+    engine.infer(image)
+
+    assert len(module.seen) == 2
+
+
+def test_infer_batch_only_runs_uncached_images(engine, remote_model):
+    module = remote_model()
+    engine.model = module.FakeModel()
+    engine.cache = OCRCache()
+    images = [Image.new("RGB", (10 + i, 5), "white") for i in range(3)]
+    engine.infer(images[1])
+
+    results = engine.infer_batch(images, batch_size=4)
+
+    assert [r["markdown"] for r in results] == ["10x5", "11x5", "12x5"]
+    assert len(module.seen) == 3
+    assert results[1]["metadata"]["cache_hit"] is True
+    assert results[0]["metadata"]["batch_size"] == 2
+
+
+def test_warmup_loads_model_and_runs_each_mode(engine, remote_model, monkeypatch):
+    module = remote_model()
+    engine._initialized = False
+    engine.registry = ModelRegistry()
+    loads = []
+    monkeypatch.setattr(engine, "_load_model", lambda: loads.append("model") or module.FakeModel())
+    monkeypatch.setattr(engine, "_load_tokenizer", lambda: object())
+    engine.cache = OCRCache()
+
+    report = engine.warmup(modes=["tiny", "base"])
+
+    assert loads == ["model"]
+    assert set(report["modes"]) == {"tiny", "base"}
+    assert all("warmup_time_ms" in entry for entry in report["modes"].values())
+    assert report["total_time_ms"] >= report["load_time_ms"]
+    assert len(module.seen) == 2
+    assert engine.cache.stats()["memory_entries"] == 0
+
+
+def test_warmup_reports_and_records_oom(engine, remote_model):
+    def respond(image_file, image_size, **kwargs):
+        if image_size > 512:
+            raise RuntimeError("CUDA out of memory")
+        return "page"
+
+    engine.model = remote_model(respond).FakeModel()
+
+    report = engine.warmup(modes=["tiny", "large"])
+
+    assert "warmup_time_ms" in report["modes"]["tiny"]
+    assert "out of memory" in report["modes"]["large"]["error"]
+    assert engine.fallback.stats()["ooms"] == 1
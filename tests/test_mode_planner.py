@@ -0,0 +1,113 @@
+"""Tests for per-page inference mode planning"""
+
+import pytest
+from PIL import Image, ImageDraw
+
+from deepseek_visor_agent import ModePlanner, StubBackend
+from deepseek_visor_agent.infer import DeepSeekOCRInference
+from deepseek_visor_agent.mode_planner import ink_ratio
+
+
+def _page(size, ink_rows):
+    """White page with ink_rows share of its height covered by black text bars"""
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    for y in range(0, size[1], 20):
+        if (y // 20) % 100 < ink_rows * 100:
+            draw.rectangle([10, y, size[0] - 10, y + 1], fill="black")
+    return image
+
+
+def test_ink_ratio():
+    assert ink_ratio(Image.new("RGB", (400, 600), "white")) == pytest.approx(0.0)
+    assert ink_ratio(Image.new("L", (400, 600), 0)) == pytest.approx(1.0)
+    assert ink_ratio(Image.new("RGBA", (50, 50), (0, 0, 0, 255))) == pytest.approx(1.0)
+    assert 0.0 < ink_ratio(_page((1000, 1400), 1.0)) < 0.2
+
+
+class TestModePlanner:
+    """Mode choice from size, ink density and memory"""
+
+    def test_small_image_gets_small_mode(self):
+        assert ModePlanner().plan(_page((300, 500), 1.0)) == "tiny"
+
+    def test_sparse_page_downscaled_more_than_dense_page(self):
+        planner = ModePlanner()
+        sparse = planner.plan(_page((1200, 1700), 0.1))
+        normal = Image.new("RGB", (1200, 1700), (235, 235, 235))
+        dense = Image.new("RGB", (1200, 1700), (200, 200, 200))
+
+        assert sparse == "base"
+        assert planner.plan(normal) == "large"
+        assert planner.plan(dense) == "gundam"
+
+    def test_max_mode_caps_choice(self):
+        dense = Image.new("RGB", (2400, 3400), (200, 200, 200))
+
+        assert ModePlanner(max_mode="base").plan(dense) == "base"
+        assert ModePlanner().plan(dense, max_mode="small") == "small"
+
+    def test_memory_budget_caps_choice(self):
+        dense = Image.new("RGB", (2400, 3400), (200, 200, 200))
+        budget = [64.0]
+        planner = ModePlanner(memory_budget_gb=lambda: budget[0])
+
+        assert planner.plan(dense) == "gundam"
+        budget[0] = 10.0
+        assert planner.plan(dense) == "small"
+        budget[0] = 1.0
+        assert planner.plan(dense) == "tiny"
+
+    def test_plans_image_files(self, tmp_path):
+        path = tmp_path / "receipt.jpg"
+        _page((300, 500), 1.0).save(path)
+
+        assert ModePlanner().plan(path) == "tiny"
+
+    def test_stats_count_plans(self):
+        planner = ModePlanner()
+        planner.plan(_page((300, 500), 1.0))
+        planner.plan(_page((300, 500), 1.0))
+
+        assert planner.stats()["tiny"] == 2
+        assert sum(planner.stats().values()) == 2
+
+    def test_unknown_max_mode_rejected(self):
+        with pytest.raises(ValueError):
+            ModePlanner(max_mode="huge")
+
+
+def test_stub_backend_batches_each_mode_separately():
+    backend = StubBackend(
+        markdown="page",
+        inference_mode="adaptive",
+        latency_ms={"tiny": 1, "gundam": 20}
+    )
+    small = _page((300, 500), 1.0)
+    dense = Image.new("RGB", (2400, 3400), (200, 200, 200))
+
+    results = backend.infer_batch([small, dense, small], batch_size=4)
+
+    assert [r["metadata"]["inference_mode"] for r in results] == ["tiny", "gundam", "tiny"]
+    assert [r["metadata"]["batch_size"] for r in results] == [2, 1, 2]
+    assert backend.calls == 2
+
+
+def test_deepseek_engine_runs_planned_modes(remote_model):
+    modes = []
+
+    def respond(image_file, image_size, crop_mode, **kwargs):
+        modes.append((image_size, crop_mode))
+        return "page"
+
+    engine = DeepSeekOCRInference(inference_mode="adaptive", device="cpu")
+    engine.config["inference_mode"] = "gundam"
+    engine.mode_planner.memory_budget_gb = None
+    engine.model = remote_model(respond).FakeModel()
+    engine.tokenizer, engine._initialized = object(), True
+
+    dense = Image.new("RGB", (2400, 3400), (200, 200, 200))
+    results = engine.infer_batch([_page((300, 500), 1.0), dense], batch_size=2)
+
+    assert [r["metadata"]["inference_mode"] for r in results] == ["tiny", "gundam"]
+    assert modes == [(512, False), (640, True)]
@@ -0,0 +1,111 @@
+"""Tests for blank and duplicate page detection"""
+
+import random
+
+import pytest
+from PIL import Image, ImageDraw
+
+from deepseek_visor_agent.page_filter import PageFilter, dhash, hash_distance, ink_coverage
+from deepseek_visor_agent.utils.pdf_processor import pdf_to_images
+
+
+def _text_page(seed, size=(1190, 1684)):
+    """Page with random-length dark bars standing in for lines of text"""
+    rng = random.Random(seed)
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    for y in range(120, size[1] - 120, 30):
+        draw.rectangle([100, y, 100 + rng.randint(200, size[0] - 200), y + 10], fill="black")
+    return image
+
+
+def test_ink_coverage():
+    assert ink_coverage(Image.new("RGB", (1190, 1684), "white")) == 0.0
+    assert ink_coverage(_text_page(0)) > 0.05
+
+
+def test_gray_scanner_paper_is_blank():
+    paper = Image.effect_noise((1190, 1684), 8).point(lambda v: min(255, v + 110))
+
+    assert ink_coverage(paper) < 1e-4
+    assert PageFilter().check(0, paper) == {"skipped": "blank"}
+
+
+def test_one_line_of_text_is_not_blank():
+    image = Image.new("RGB", (1190, 1684), "white")
+    ImageDraw.Draw(image).rectangle([100, 100, 250, 118], fill="black")
+
+    assert PageFilter().check(0, image) is None
+
+
+@pytest.mark.parametrize("dpi", [72, 144, 300])
+def test_single_character_is_not_blank(make_pdf, dpi):
+    page = pdf_to_images(make_pdf(["1"], fontsize=8), dpi=dpi)[0]
+
+    # Far less ink than one line of text, at every resolution
+    assert ink_coverage(page) < 1e-4
+    assert PageFilter().check(0, page) is None
+
+
+def test_specks_of_dust_are_blank():
+    image = Image.new("RGB", (1190, 1684), "white")
+    draw = ImageDraw.Draw(image)
+    for x, y in [(200, 300), (700, 900), (1000, 1500)]:
+        draw.rectangle([x, y, x + 2, y + 2], fill="black")
+
+    assert PageFilter().check(0, image) == {"skipped": "blank"}
+    assert PageFilter(min_mark_pixels=1).check(0, image) is None
+
+
+def test_dhash_distance():
+    page = _text_page(1)
+    shifted = Image.new("RGB", page.size, "white")
+    shifted.paste(page, (2, 3))
+
+    assert hash_distance(dhash(page), dhash(page.copy())) == 0
+    assert hash_distance(dhash(page), dhash(shifted)) <= 10
+    assert hash_distance(dhash(page), dhash(page.transpose(Image.FLIP_LEFT_RIGHT))) > 10
+
+
+class TestPageFilter:
+    """Per-document skip decisions"""
+
+    def test_duplicates_refer_to_first_occurrence(self):
+        page_filter = PageFilter()
+        cover, body = _text_page(3), _text_page(4)
+
+        assert page_filter.check(0, cover) is None
+        assert page_filter.check(1, body) is None
+        assert page_filter.check(2, cover.copy()) == {"skipped": "duplicate", "duplicate_of": 0}
+        assert page_filter.check(3, body.copy()) == {"skipped": "duplicate", "duplicate_of": 1}
+
+    def test_rescanned_duplicate_with_noise(self):
+        page_filter = PageFilter()
+        page = _text_page(5)
+        noisy = Image.blend(page, Image.effect_noise(page.size, 20).convert("RGB"), 0.1)
+
+        assert page_filter.check(0, page) is None
+        assert page_filter.check(1, noisy) == {"skipped": "duplicate", "duplicate_of": 0}
+
+    def test_page_differing_in_one_number_kept(self):
+        page_filter = PageFilter()
+        first, second = _text_page(6), _text_page(6)
+        ImageDraw.Draw(first).text((600, 60), "Invoice 1001", fill="black")
+        ImageDraw.Draw(second).text((600, 60), "Invoice 1007", fill="black")
+
+        assert page_filter.check(0, first) is None
+        assert page_filter.check(1, second) is None
+
+    def test_checks_can_be_disabled(self):
+        page_filter = PageFilter(skip_blank=False, skip_duplicates=False)
+        blank = Image.new("RGB", (100, 140), "white")
+
+        assert page_filter.check(0, blank) is None
+        assert page_filter.check(1, blank) is None
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_distinct_pages_kept(self, seed):
+        page_filter = PageFilter()
+
+        assert page_filter.check(0, _text_page(seed)) is None
+        assert page_filter.check(1, _text_page(seed + 100)) is None
@@ -168,6 +168,24 @@ class TestInvoiceParser:
             # All should normalize to $ format
             assert fields["total"].startswith("$")
 
+    def test_pattern_priority_across_document(self):
+        """Higher-priority patterns win even when a lower one matches earlier"""
+        parser = InvoiceParser()
+
+        markdown = "SUBTOTAL: $90.00\nTotal: $100.00\n" + "filler line\n" * 1000 + "Grand Total: $120.00"
+        fields = parser.parse(markdown)
+
+        assert fields["total"] == "$120.00"
+
+    def test_original_case_is_preserved(self):
+        """Matching is case-insensitive but values keep their original case"""
+        parser = InvoiceParser()
+
+        fields = parser.parse("INVOICE DATE: 15 January 2024\nVENDOR: ACME Widgets Inc.")
+
+        assert fields["date"] == "15 January 2024"
+        assert fields["vendor"] == "ACME Widgets"
+
     def test_complex_invoice_example(self):
         """Test parsing a realistic complex invoice"""
         parser = InvoiceParser()
@@ -328,6 +346,21 @@ class TestContractParser:
         assert fields["effective_date"] == ""
         assert fields["term_duration"] == ""
         assert fields["governing_law"] == ""
+        assert parser.get_confidence() == 0.0
+
+    def test_confidence_counts_required_fields(self):
+        """Confidence is the share of parties, effective date and governing law found"""
+        parser = ContractParser()
+
+        parser.parse("This agreement is between Acme Corp and Tech Solutions\n"
+                     "Effective Date: 2024-01-15")
+        partial = parser.get_confidence()
+        parser.parse("This agreement is between Acme Corp and Tech Solutions\n"
+                     "Effective Date: 2024-01-15\n"
+                     "Governed by the laws of California")
+
+        assert partial == pytest.approx(2 / 3)
+        assert parser.get_confidence() == 1.0
 
     def test_complex_contract_example(self):
         """Test parsing a realistic complex contract"""
@@ -449,3 +482,22 @@ class TestDocumentClassifier:
         for text, expected in test_cases:
             result = classify_document(text)
             assert result == expected, f"Failed for: {text[:30]}, expected: {expected}, got: {result}"
+
+    def test_long_document_uses_whole_text_when_prefix_is_ambiguous(self):
+        """Signals past the prefix still count unless the prefix is decisive"""
+        filler = "Notes from the meeting.\n" * 4000
+        text = "Invoice\n" + filler + "This Agreement between Party A and Party B\nWhereas the parties hereby agree"
+
+        assert classify_document(text) == "contract"
+
+    def test_long_document_decided_by_prefix(self):
+        """A decisive prefix is kept without scanning the rest"""
+        header = "INVOICE #A-1\nVendor: Acme\nSubtotal: $90.00\nTax: $9.00\nTotal: $99.00\nPayment due\n"
+        filler = "Notes from the meeting.\n" * 4000
+        text = header + filler + (
+            "Resume / CV / Curriculum Vitae\nObjective\nEducation\nExperience\nSkills\n"
+            "Qualifications\nEmployment History\n2019 - present\nReferences\n"
+        )
+
+        assert classify_document(text) == "invoice"
+        assert classify_document(text, prefix_chars=0) == "resume"
@@ -8,6 +8,9 @@ from PIL import Image
 import io
 
 from deepseek_visor_agent.utils.pdf_processor import (
+    PageText,
+    extract_text_layer,
+    iter_pdf_pages,
     pdf_to_images,
     is_pdf_file,
     PDFProcessingError
@@ -228,3 +231,177 @@ class TestPdfProcessingIntegration:
 
         # Verify RGB mode
         assert images[0].mode == 'RGB'
+
+
+@pytest.mark.skipif(not _pymupdf_available(), reason="PyMuPDF not installed")
+class TestIterPdfPages:
+    """Tests for lazy page-by-page rendering"""
+
+    def test_yields_page_numbers_and_images(self, make_pdf):
+        pdf_path = make_pdf(3)
+
+        pages = list(iter_pdf_pages(pdf_path, start_page=1))
+
+        assert [num for num, _ in pages] == [1, 2]
+        assert all(isinstance(img, Image.Image) for _, img in pages)
+        assert all(img.mode == "RGB" for _, img in pages)
+
+    def test_renders_on_demand(self, make_pdf):
+        pdf_path = make_pdf(3)
+
+        pages = iter_pdf_pages(pdf_path)
+        page_num, image = next(pages)
+        pages.close()
+
+        assert page_num == 0
+        assert image.size[0] > 0
+
+    def test_invalid_page_range(self, make_pdf):
+        pdf_path = make_pdf(2)
+
+        with pytest.raises(PDFProcessingError, match="out of range"):
+            list(iter_pdf_pages(pdf_path, start_page=5))
+
+    def test_parallel_matches_sequential(self, make_pdf):
+        pdf_path = make_pdf(5)
+
+        sequential = list(iter_pdf_pages(pdf_path, start_page=1))
+        parallel = list(iter_pdf_pages(pdf_path, start_page=1, workers=2))
+
+        assert [num for num, _ in parallel] == [1, 2, 3, 4]
+        for (_, expected), (_, actual) in zip(sequential, parallel):
+            assert actual.mode == "RGB"
+            assert actual.tobytes() == expected.tobytes()
+
+    def test_parallel_early_close(self, make_pdf):
+        pdf_path = make_pdf(6)
+
+        pages = iter_pdf_pages(pdf_path, workers=2)
+        page_num, _ = next(pages)
+        pages.close()
+
+        assert page_num == 0
+
+    def test_parallel_workers_are_not_forked(self, make_pdf, monkeypatch):
+        import concurrent.futures
+
+        start_methods = []
+
+        class RecordingExecutor(concurrent.futures.ProcessPoolExecutor):
+            def __init__(self, *args, mp_context=None, **kwargs):
+                start_methods.append(mp_context.get_start_method())
+                super().__init__(*args, mp_context=mp_context, **kwargs)
+
+        monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", RecordingExecutor)
+        pdf_path = make_pdf(2)
+
+        assert len(list(iter_pdf_pages(pdf_path, workers=2))) == 2
+        assert start_methods and start_methods[0] != "fork"
+
+    def test_invalid_workers(self, make_pdf):
+        pdf_path = make_pdf(2)
+
+        with pytest.raises(ValueError, match="workers"):
+            list(iter_pdf_pages(pdf_path, workers=0))
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_renders_pdf_bytes(self, make_pdf, workers):
+        pdf_path = make_pdf(3)
+
+        from_disk = list(iter_pdf_pages(pdf_path))
+        from_memory = list(iter_pdf_pages(pdf_path.read_bytes(), workers=workers))
+
+        assert [num for num, _ in from_memory] == [0, 1, 2]
+        for (_, expected), (_, actual) in zip(from_disk, from_memory):
+            assert actual.tobytes() == expected.tobytes()
+
+
+def _add_scanned_page(doc, text=None):
+    """A page covered by a picture (like a scan), with optional visible text on top"""
+    import fitz
+
+    page = doc.new_page()
+    buffer = io.BytesIO()
+    Image.new("RGB", (300, 400), "white").save(buffer, format="PNG")
+    page.insert_image(page.rect, stream=buffer.getvalue())
+    if text:
+        page.insert_text(fitz.Point(50, 50), text, fontsize=12)
+    return page
+
+
+@pytest.mark.skipif(not _pymupdf_available(), reason="PyMuPDF not installed")
+class TestTextLayer:
+    """Text-layer extraction and the ocr_policy of iter_pdf_pages"""
+
+    def _make_invoice_page(self, doc):
+        import fitz
+
+        page = doc.new_page(width=595, height=842)
+        page.insert_text(fitz.Point(50, 60), "INVOICE INV-0042", fontsize=20)
+        page.insert_text(fitz.Point(50, 100), "Vendor: Acme Corp", fontsize=10)
+        page.insert_text(fitz.Point(50, 114), "Date: 2024-01-15", fontsize=10)
+        page.insert_text(fitz.Point(50, 200), "Total: $199.00", fontsize=10)
+        return page
+
+    def _make_mixed_pdf(self, path):
+        import fitz
+
+        doc = fitz.open()
+        self._make_invoice_page(doc)
+        _add_scanned_page(doc, "Page 2")
+        doc.new_page()
+        doc.save(str(path))
+        doc.close()
+        return path
+
+    def test_digital_page_becomes_markdown(self):
+        import fitz
+
+        with fitz.open() as doc:
+            page_text = extract_text_layer(self._make_invoice_page(doc))
+
+        assert page_text.complete
+        assert page_text.markdown == (
+            "# INVOICE INV-0042\n\nVendor: Acme Corp\nDate: 2024-01-15\n\nTotal: $199.00\n"
+        )
+        assert page_text.chars == len("".join(page_text.markdown.lstrip("# ").split()))
+        assert page_text.image_coverage == 0.0
+
+    def test_scanned_and_empty_pages_are_incomplete(self):
+        import fitz
+
+        with fitz.open() as doc:
+            scanned = extract_text_layer(_add_scanned_page(doc, "Page 2"))
+            empty = extract_text_layer(doc.new_page())
+
+        assert not scanned.complete
+        assert scanned.image_coverage > 0.9
+        assert not empty.complete
+        assert empty.markdown == ""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_auto_renders_only_incomplete_pages(self, tmp_path, workers):
+        pdf_path = self._make_mixed_pdf(tmp_path / "mixed.pdf")
+
+        pages = list(iter_pdf_pages(pdf_path, workers=workers, ocr_policy="auto"))
+
+        assert [num for num, _ in pages] == [0, 1, 2]
+        assert isinstance(pages[0][1], PageText)
+        assert isinstance(pages[1][1], Image.Image)
+        assert isinstance(pages[2][1], Image.Image)
+
+    def test_never_and_always(self, tmp_path):
+        pdf_path = self._make_mixed_pdf(tmp_path / "mixed.pdf")
+
+        never = [page for _, page in iter_pdf_pages(pdf_path, ocr_policy="never")]
+        always = [page for _, page in iter_pdf_pages(pdf_path)]
+
+        assert all(isinstance(page, PageText) for page in never)
+        assert never[1].markdown == "Page 2\n"
+        assert all(isinstance(page, Image.Image) for page in always)
+
+    def test_invalid_policy(self, tmp_path):
+        pdf_path = self._make_mixed_pdf(tmp_path / "mixed.pdf")
+
+        with pytest.raises(ValueError, match="ocr_policy"):
+            list(iter_pdf_pages(pdf_path, ocr_policy="sometimes"))
@@ -0,0 +1,115 @@
+"""Tests for the staged page pipeline"""
+
+import threading
+import time
+
+import pytest
+
+from deepseek_visor_agent.pipeline import PagePipeline
+
+
+def _pages(count, delay=0.0):
+    for page_num in range(count):
+        time.sleep(delay)
+        yield page_num, f"image-{page_num}"
+
+
+def _infer(images):
+    return [{"markdown": f"md:{image}", "metadata": {}} for image in images]
+
+
+def _parse(page_num, result):
+    return {"page": page_num, "markdown": result["markdown"], "metadata": result["metadata"]}
+
+
+def test_pages_come_out_in_order():
+    pipeline = PagePipeline(_pages(7), _infer, _parse, batch_size=3)
+
+    pages = list(pipeline)
+
+    assert [p["page"] for p in pages] == list(range(7))
+    assert pages[4]["markdown"] == "md:image-4"
+    assert set(pages[0]["metadata"]["stage_timings_ms"]) == {"render", "inference", "parse"}
+
+
+def test_prefiltered_pages_bypass_inference():
+    inferred = []
+
+    def infer(images):
+        inferred.append(list(images))
+        return _infer(images)
+
+    def prefilter(page_num, image):
+        if page_num % 2:
+            return {"markdown": "", "metadata": {"skipped": "blank"}}
+        return None
+
+    pages = list(PagePipeline(_pages(5), infer, _parse, batch_size=2, prefilter=prefilter))
+
+    assert [p["markdown"] for p in pages] == ["md:image-0", "", "md:image-2", "", "md:image-4"]
+    assert inferred == [["image-0"], ["image-2"], ["image-4"]]
+    assert pages[1]["metadata"]["stage_timings_ms"]["inference"] == 0.0
+    assert "prefilter" in pages[0]["metadata"]["stage_timings_ms"]
+
+
+def test_stages_overlap():
+    delay = 0.05
+
+    def slow_infer(images):
+        time.sleep(delay * len(images))
+        return _infer(images)
+
+    def slow_parse(page_num, result):
+        time.sleep(delay)
+        return _parse(page_num, result)
+
+    start = time.perf_counter()
+    pages = list(PagePipeline(_pages(8, delay), slow_infer, slow_parse))
+    elapsed = time.perf_counter() - start
+
+    assert len(pages) == 8
+    # Serial execution would take 8 pages * 3 stages * delay = 1.2s
+    assert elapsed < 8 * 3 * delay * 0.7
+
+
+def test_error_in_stage_is_raised():
+    def failing_infer(images):
+        if "image-2" in images:
+            raise RuntimeError("model failed")
+        return _infer(images)
+
+    with pytest.raises(RuntimeError, match="model failed"):
+        list(PagePipeline(_pages(5), failing_infer, _parse))
+
+
+def test_source_error_is_raised():
+    def broken_pages():
+        yield 0, "image-0"
+        raise ValueError("bad page")
+
+    with pytest.raises(ValueError, match="bad page"):
+        list(PagePipeline(broken_pages(), _infer, _parse))
+
+
+def test_closing_stops_stages_and_closes_source():
+    closed = threading.Event()
+
+    def endless_pages():
+        try:
+            page_num = 0
+            while True:
+                yield page_num, f"image-{page_num}"
+                page_num += 1
+        finally:
+            closed.set()
+
+    stream = iter(PagePipeline(endless_pages(), _infer, _parse))
+    assert next(stream)["page"] == 0
+    stream.close()
+
+    assert closed.wait(timeout=2)
+
+
+def test_invalid_batch_size():
+    with pytest.raises(ValueError):
+        PagePipeline(_pages(1), _infer, _parse, batch_size=0)
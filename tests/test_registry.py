@@ -0,0 +1,195 @@
+"""Tests for the shared, reference-counted model registry"""
+
+import gc
+import threading
+import time
+
+import pytest
+import torch
+from PIL import Image
+
+from deepseek_visor_agent import ModelRegistry
+from deepseek_visor_agent.infer import DeepSeekOCRInference
+from deepseek_visor_agent.registry import ModelKey
+
+KEY = ModelKey("deepseek-ai/DeepSeek-OCR", "cpu", "float32", "default")
+
+
+class CountingLoader:
+    """Loader returning a small torch model, counting how often it runs"""
+
+    def __init__(self, delay: float = 0.0):
+        self.loads = 0
+        self.delay = delay
+
+    def __call__(self):
+        self.loads += 1
+        time.sleep(self.delay)
+        return torch.nn.Linear(256, 256), object()
+
+
+def test_same_key_shares_one_model():
+    registry = ModelRegistry()
+    load = CountingLoader()
+
+    first = registry.acquire(KEY, load)
+    second = registry.acquire(KEY, load)
+
+    assert load.loads == 1
+    assert first.model is second.model
+    assert registry.stats()["models"][0]["refs"] == 2
+
+
+def test_different_keys_load_separately():
+    registry = ModelRegistry()
+    load = CountingLoader()
+
+    registry.acquire(KEY, load)
+    registry.acquire(KEY._replace(dtype="bfloat16"), load)
+
+    assert load.loads == 2
+
+
+def test_concurrent_acquires_load_once():
+    registry = ModelRegistry()
+    load = CountingLoader(delay=0.1)
+    handles = []
+
+    threads = [threading.Thread(target=lambda: handles.append(registry.acquire(KEY, load)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert load.loads == 1
+    assert len({id(handle.model) for handle in handles}) == 1
+
+
+def test_last_release_unloads():
+    registry = ModelRegistry()
+    load = CountingLoader()
+    first = registry.acquire(KEY, load)
+    second = registry.acquire(KEY, load)
+
+    first.release()
+    first.release()
+    assert registry.stats()["models"][0]["refs"] == 1
+
+    second.release()
+    assert registry.stats()["models"] == []
+
+    registry.acquire(KEY, load)
+    assert load.loads == 2
+
+
+def test_keep_idle_until_unload():
+    registry = ModelRegistry(keep_idle=True)
+    load = CountingLoader()
+    registry.acquire(KEY, load).release()
+
+    assert registry.stats()["models"][0]["refs"] == 0
+    registry.acquire(KEY, load).release()
+    assert load.loads == 1
+
+    in_use = registry.acquire(KEY._replace(device="mps"), load)
+    assert registry.unload() == [KEY]
+    assert [m["device"] for m in registry.stats()["models"]] == ["mps"]
+    in_use.release()
+
+
+def test_failed_load_leaves_no_entry():
+    registry = ModelRegistry()
+
+    def broken():
+        raise RuntimeError("download failed")
+
+    with pytest.raises(RuntimeError):
+        registry.acquire(KEY, broken)
+
+    assert registry.stats()["models"] == []
+    assert registry.acquire(KEY, CountingLoader()).model is not None
+
+
+def test_stats_report_memory():
+    registry = ModelRegistry()
+    registry.acquire(KEY, CountingLoader())
+
+    stats = registry.stats()
+
+    # 256x256 float32 weights plus bias
+    assert stats["models"][0]["memory_gb"] == pytest.approx(257 * 256 * 4 / 1e9, abs=1e-3)
+    assert stats["total_memory_gb"] == stats["models"][0]["memory_gb"]
+
+
+def test_engines_share_and_release_model():
+    registry = ModelRegistry()
+    load = CountingLoader()
+
+    def make_engine():
+        engine = DeepSeekOCRInference(inference_mode="tiny", device="cpu", registry=registry)
+        engine._load_model = lambda: load()[0]
+        engine._load_tokenizer = object
+        engine._ensure_initialized()
+        return engine
+
+    first, second, third = make_engine(), make_engine(), make_engine()
+
+    assert load.loads == 1
+    assert first.model is third.model
+    assert registry.stats()["models"][0]["refs"] == 3
+
+    first.unload()
+    assert first.model is None
+    assert registry.stats()["models"][0]["refs"] == 2
+
+    del second, third
+    gc.collect()
+    assert registry.stats()["models"] == []
+
+
+def test_engines_sharing_a_model_never_run_it_concurrently(tmp_path):
+    registry = ModelRegistry()
+
+    class OverlapModel:
+        """Records the most model.infer() calls ever in flight at once"""
+
+        def __init__(self):
+            self.in_flight = 0
+            self.max_in_flight = 0
+            self.counter_lock = threading.Lock()
+
+        def infer(self, tokenizer, prompt, image_file, **kwargs):
+            with self.counter_lock:
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            time.sleep(0.01)
+            with self.counter_lock:
+                self.in_flight -= 1
+            return "page"
+
+    model = OverlapModel()
+
+    def make_engine():
+        engine = DeepSeekOCRInference(inference_mode="tiny", device="cpu", registry=registry)
+        engine._load_model = lambda: model
+        engine._load_tokenizer = object
+        return engine
+
+    engines = [make_engine(), make_engine()]
+    paths = []
+    for i in range(8):
+        paths.append(tmp_path / f"page{i}.png")
+        Image.new("RGB", (10 + i, 10), "white").save(paths[-1])
+
+    threads = [
+        threading.Thread(target=engine.infer_batch, args=(paths[i::2],), kwargs={"batch_size": 2})
+        for i, engine in enumerate(engines)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert registry.stats()["models"][0]["refs"] == 2
+    assert model.max_in_flight == 1
@@ -0,0 +1,82 @@
+"""Tests for planning PDF render resolution from the inference mode"""
+
+import pytest
+
+from deepseek_visor_agent import RenderPlanner, StubBackend, VisionDocumentTool
+from deepseek_visor_agent.render_planner import crop_grid, mode_input_size
+from deepseek_visor_agent.utils.pdf_processor import iter_pdf_pages
+
+# A4 in points
+A4 = (595, 842)
+
+
+def test_crop_grid_follows_aspect_ratio():
+    assert crop_grid(*A4) == (2, 3)
+    assert crop_grid(842, 595) == (3, 2)
+    assert crop_grid(1000, 1000) == (2, 2)
+    # A long receipt
+    assert crop_grid(200, 1000) == (1, 5)
+
+
+@pytest.mark.parametrize("mode,long_side", [
+    ("tiny", 512), ("small", 640), ("base", 1024), ("large", 1280),
+])
+def test_single_view_modes_fit_long_side_to_base_size(mode, long_side):
+    width, height = mode_input_size(*A4, mode)
+
+    assert height == long_side
+    assert width == round(long_side * A4[0] / A4[1])
+
+
+def test_crop_mode_covers_its_tiles():
+    width, height = mode_input_size(*A4, "gundam")
+
+    # 2 x 3 tiles of 640px, and never less than the 1024px global view
+    assert width >= 2 * 640 and height >= 3 * 640
+    assert min(width, height) == 2 * 640 or max(width, height) == 3 * 640
+
+
+def test_zoom_and_dpi():
+    planner = RenderPlanner("tiny")
+
+    assert planner.zoom(*A4) == pytest.approx(512 / 842)
+    assert planner.dpi(*A4) == pytest.approx(512 / 842 * 72)
+    assert RenderPlanner("base").zoom(*A4) == pytest.approx(2 * planner.zoom(*A4))
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError, match="Unknown inference mode"):
+        RenderPlanner("huge")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_pages_render_at_planned_size(make_pdf, workers):
+    pdf_path = make_pdf(["Total: $10.00"] * 3, sizes=[A4, (842, 595), (300, 1500)])
+
+    pages = list(iter_pdf_pages(pdf_path, workers=workers, render_planner=RenderPlanner("tiny")))
+
+    assert [image.size for _, image in pages] == [(362, 512), (512, 362), (103, 512)]
+
+
+class TestToolRendering:
+    """pdf_dpi="auto" renders for the engine's mode"""
+
+    def _sizes(self, tool, pdf_path, **kwargs):
+        return [page["markdown"] for page in tool.run_stream(pdf_path, **kwargs)]
+
+    def _tool(self, **kwargs):
+        return VisionDocumentTool(
+            backend=StubBackend(markdown=lambda image: "x".join(map(str, image.size)), **kwargs)
+        )
+
+    def test_auto_renders_for_the_mode(self, make_pdf):
+        pdf_path = make_pdf(["Total: $10.00"], sizes=[A4])
+
+        assert self._sizes(self._tool(inference_mode="tiny"), pdf_path) == ["362x512"]
+        assert self._sizes(self._tool(inference_mode="base"), pdf_path) == ["724x1024"]
+
+    def test_fixed_dpi_and_adaptive_mode_keep_the_dpi(self, make_pdf):
+        pdf_path = make_pdf(["Total: $10.00"], sizes=[A4])
+
+        assert self._sizes(self._tool(), pdf_path, pdf_dpi=72) == ["595x842"]
+        assert self._sizes(self._tool(inference_mode="adaptive"), pdf_path) == ["1190x1684"]
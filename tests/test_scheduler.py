@@ -0,0 +1,140 @@
+"""Tests for the coalescing inference scheduler"""
+
+import asyncio
+import threading
+
+import pytest
+
+from deepseek_visor_agent.scheduler import _SHUTDOWN, InferenceScheduler
+
+
+class RecordingEngine:
+    """Engine stub whose first batch blocks until released, so later requests queue up"""
+
+    def __init__(self):
+        self.batches = []
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def infer_batch(self, images, prompt="p", batch_size=4, **kwargs):
+        self.batches.append((list(images), prompt))
+        self.started.set()
+        self.release.wait(5)
+        if "fail" in images:
+            raise RuntimeError("boom")
+        return [{"markdown": f"{prompt}:{image}", "metadata": {}} for image in images]
+
+
+@pytest.fixture
+def engine():
+    return RecordingEngine()
+
+
+def test_concurrent_requests_are_coalesced(engine):
+    scheduler = InferenceScheduler(engine, max_batch_size=4)
+
+    first = scheduler.submit("a", "p")
+    engine.started.wait(5)
+    rest = [scheduler.submit(name, "p") for name in "bcdef"]
+    engine.release.set()
+
+    assert first.result(5)["markdown"] == "p:a"
+    assert [f.result(5)["markdown"] for f in rest] == [f"p:{n}" for n in "bcdef"]
+    assert [len(images) for images, _ in engine.batches] == [1, 4, 1]
+    scheduler.close()
+
+
+def test_requests_with_different_prompts_are_not_mixed(engine):
+    scheduler = InferenceScheduler(engine, max_batch_size=8)
+
+    scheduler.submit("a", "p")
+    engine.started.wait(5)
+    futures = [scheduler.submit("b", "p"), scheduler.submit("c", "q"), scheduler.submit("d", "p")]
+    engine.release.set()
+
+    assert [f.result(5)["markdown"] for f in futures] == ["p:b", "q:c", "p:d"]
+    assert [(images, prompt) for images, prompt in engine.batches[1:]] == [
+        (["b", "d"], "p"),
+        (["c"], "q"),
+    ]
+    scheduler.close()
+
+
+def test_batch_errors_propagate_to_every_caller(engine):
+    scheduler = InferenceScheduler(engine)
+    engine.release.set()
+
+    future = scheduler.submit("fail", "p")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        future.result(5)
+    scheduler.close()
+
+
+def test_failed_batch_only_fails_the_bad_request(engine):
+    scheduler = InferenceScheduler(engine, max_batch_size=4)
+
+    scheduler.submit("a", "p")
+    engine.started.wait(5)
+    bad, good = scheduler.submit("fail", "p"), scheduler.submit("b", "p")
+    engine.release.set()
+
+    with pytest.raises(RuntimeError, match="boom"):
+        bad.result(5)
+    assert good.result(5)["markdown"] == "p:b"
+    # The coalesced batch failed and was retried request by request
+    assert [images for images, _ in engine.batches[1:]] == [["fail", "b"], ["fail"], ["b"]]
+    scheduler.close()
+
+
+def test_requests_left_at_shutdown_are_failed(engine):
+    scheduler = InferenceScheduler(engine)
+    scheduler.submit("a", "p")
+    engine.started.wait(5)
+
+    # A request that lands behind the shutdown marker must not wait forever
+    scheduler._queue.put(_SHUTDOWN)
+    late = scheduler.submit("b", "p")
+    engine.release.set()
+    scheduler.close()
+
+    with pytest.raises(RuntimeError, match="closed"):
+        late.result(5)
+
+
+def test_submit_after_close_raises(engine):
+    scheduler = InferenceScheduler(engine)
+    scheduler.close()
+
+    with pytest.raises(RuntimeError):
+        scheduler.submit("a", "p")
+
+
+@pytest.mark.asyncio
+async def test_ainfer_does_not_block_event_loop(engine):
+    scheduler = InferenceScheduler(engine, max_batch_size=8)
+
+    tasks = [asyncio.ensure_future(scheduler.ainfer(name, "p")) for name in "abc"]
+    # The loop keeps running while inference is blocked in the worker thread
+    await asyncio.sleep(0.05)
+    assert not any(task.done() for task in tasks)
+    engine.release.set()
+
+    results = await asyncio.gather(*tasks)
+    assert [r["markdown"] for r in results] == ["p:a", "p:b", "p:c"]
+    scheduler.close()
+
+
+def test_batches_only_grow_while_they_fit_in_memory(engine):
+    engine.batch_fits = lambda images: len(images) <= 2
+    scheduler = InferenceScheduler(engine, max_batch_size=8)
+
+    scheduler.submit("a", "p")
+    engine.started.wait(5)
+    futures = [scheduler.submit(name, "p") for name in "bcde"]
+    engine.release.set()
+
+    assert [f.result(5)["markdown"] for f in futures] == [f"p:{n}" for n in "bcde"]
+    assert [images for images, _ in engine.batches[1:]] == [["b", "c"], ["d", "e"]]
+    assert scheduler.stats()["deferred_for_memory"] == 1
+    scheduler.close()
@@ -0,0 +1,220 @@
+"""Tests for the REST API server using a stub model"""
+
+import io
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from deepseek_visor_agent import VisionDocumentTool
+from deepseek_visor_agent.server import create_app, LatencyTracker
+from deepseek_visor_agent.utils.error_handler import QueueFullError
+
+
+def _install_stub_model(tool, delay=0.0, gate=None):
+    """Replace the engine's model with a stub that returns invoice markdown"""
+    module = types.ModuleType("stub_server_model")
+    module.calls = 0
+    module.modes = []
+
+    def load_image(image_path):
+        return Image.open(image_path)
+
+    class StubModel:
+        def infer(self, tokenizer, prompt, image_file, **kwargs):
+            if gate is not None:
+                gate.wait(5)
+            time.sleep(delay)
+            module.calls += 1
+            image = module.load_image(f"{image_file}")
+            module.modes.append(image.mode)
+            return f"Invoice\nVendor: Acme Corp\nDate: 2024-01-15\nTotal: ${image.size[0]}.00"
+
+    module.load_image = load_image
+    StubModel.__module__ = module.__name__
+    sys.modules[module.__name__] = module
+
+    tool.engine.model = StubModel()
+    tool.engine.tokenizer = object()
+    tool.engine._initialized = True
+    return module
+
+
+def _png(width=40, height=20, mode="RGB"):
+    buffer = io.BytesIO()
+    Image.new(mode, (width, height), "white").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def tool():
+    return VisionDocumentTool(device="cpu", inference_mode="tiny")
+
+
+def test_ocr_endpoint(tool):
+    _install_stub_model(tool)
+    with TestClient(create_app(tool, max_wait_ms=1)) as client:
+        response = client.post("/v1/ocr", files={"file": ("page.png", _png(40), "image/png")})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["markdown"].endswith("Total: $40.00")
+    assert set(body["latency_ms"]) == {"total", "queue_wait", "inference"}
+
+
+def test_documents_endpoint_extracts_fields(tool):
+    _install_stub_model(tool)
+    with TestClient(create_app(tool)) as client:
+        response = client.post(
+            "/v1/documents", files={"file": ("invoice.png", _png(64), "image/png")}
+        )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["document_type"] == "invoice"
+    assert body["fields"]["total"] == "$64.00"
+    assert body["pages"] == 1
+
+
+def test_documents_endpoint_reads_pdf_upload_in_memory(tool, make_pdf, monkeypatch):
+    pdf = make_pdf(2).read_bytes()
+    _install_stub_model(tool)
+    # Uploads must not go through the filesystem
+    monkeypatch.setattr("tempfile.NamedTemporaryFile", None)
+
+    with TestClient(create_app(tool)) as client:
+        response = client.post(
+            "/v1/documents", files={"file": ("scan.pdf", pdf, "application/pdf")}
+        )
+
+    assert response.status_code == 200
+    assert response.json()["pages"] == 2
+
+
+def test_ocr_rejects_undecodable_upload(tool):
+    _install_stub_model(tool)
+    with TestClient(create_app(tool)) as client:
+        response = client.post("/v1/ocr", files={"file": ("x.png", b"not an image", "image/png")})
+
+    assert response.status_code == 400
+
+
+def test_ocr_converts_uploads_like_documents(tool):
+    module = _install_stub_model(tool)
+    with TestClient(create_app(tool)) as client:
+        responses = [
+            client.post("/v1/ocr", files={"file": ("page.png", _png(40, mode=mode), "image/png")})
+            for mode in ("RGBA", "P", "I;16")
+        ]
+
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert module.modes == ["RGB", "RGB", "RGB"]
+
+
+def test_ocr_rejects_pdf_upload(tool):
+    _install_stub_model(tool)
+    with TestClient(create_app(tool)) as client:
+        response = client.post(
+            "/v1/ocr", files={"file": ("doc.pdf", b"%PDF-1.7\n", "application/pdf")}
+        )
+
+    assert response.status_code == 400
+    assert "/v1/documents" in response.json()["detail"]
+
+
+def test_documents_endpoint_rejects_unknown_document_type(tool):
+    _install_stub_model(tool)
+    with TestClient(create_app(tool)) as client:
+        response = client.post(
+            "/v1/documents",
+            files={"file": ("invoice.png", _png(64), "image/png")},
+            data={"document_type": "receipt"}
+        )
+
+    assert response.status_code == 400
+    assert "document_type" in response.json()["detail"]
+
+
+def test_concurrent_requests_are_batched(tool):
+    gate = threading.Event()
+    _install_stub_model(tool, gate=gate)
+    app = create_app(tool, max_batch_size=4, max_wait_ms=50)
+
+    with TestClient(app) as client:
+        responses = []
+
+        def post():
+            responses.append(client.post("/v1/ocr", files={"file": ("p.png", _png(), "image/png")}))
+
+        threads = [threading.Thread(target=post) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        gate.set()
+        for thread in threads:
+            thread.join(10)
+
+        stats = client.get("/v1/stats").json()
+
+    assert [r.status_code for r in responses] == [200] * 4
+    assert stats["scheduler"]["completed"] == 4
+    assert stats["scheduler"]["batches"] < 4
+    assert stats["latency"]["/v1/ocr"]["requests"] == 4
+
+
+def test_backpressure_returns_503(tool, monkeypatch):
+    _install_stub_model(tool)
+    app = create_app(tool, max_queue_size=1)
+
+    def reject(*args, **kwargs):
+        raise QueueFullError("Inference queue is full")
+
+    monkeypatch.setattr(app.state.scheduler, "submit", reject)
+
+    with TestClient(app) as client:
+        response = client.post("/v1/ocr", files={"file": ("p.png", _png(), "image/png")})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_scheduler_rejects_when_queue_full(tool):
+    gate = threading.Event()
+    _install_stub_model(tool, gate=gate)
+    scheduler = tool.engine.start_scheduler(max_batch_size=1, max_queue_size=2)
+    image = Image.new("RGB", (8, 8), "white")
+
+    futures = [scheduler.submit(image, "p")]
+    # Wait until the worker has taken the first request off the queue
+    deadline = time.time() + 5
+    while scheduler.pending() and time.time() < deadline:
+        time.sleep(0.01)
+    futures += [scheduler.submit(image, "p"), scheduler.submit(image, "p")]
+
+    with pytest.raises(QueueFullError):
+        scheduler.submit(image, "p")
+
+    gate.set()
+    assert all(f.result(5)["markdown"] for f in futures)
+    assert scheduler.stats()["rejected"] == 1
+    scheduler.close()
+
+
+def test_latency_tracker_percentiles():
+    tracker = LatencyTracker()
+    for latency in range(1, 101):
+        tracker.record("/v1/ocr", latency)
+
+    summary = tracker.summary()["/v1/ocr"]
+
+    assert summary["requests"] == 100
+    assert summary["p50_ms"] == 51
+    assert summary["max_ms"] == 100
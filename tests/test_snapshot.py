@@ -0,0 +1,83 @@
+"""Tests for device-ready weight snapshots"""
+
+import pytest
+import torch
+
+from deepseek_visor_agent.infer import DeepSeekOCRInference
+from deepseek_visor_agent.utils.error_handler import ModelLoadError, SnapshotError
+from deepseek_visor_agent.utils.snapshot import load_snapshot, save_snapshot, snapshot_path
+
+
+class TinyModel(torch.nn.Module):
+    """Tied embedding/head weights and a non-persistent buffer, like a language model"""
+
+    def __init__(self):
+        super().__init__()
+        self.embed = torch.nn.Embedding(16, 8)
+        self.head = torch.nn.Linear(8, 16, bias=False)
+        self.head.weight = self.embed.weight
+        self.proj = torch.nn.Linear(8, 8)
+        self.register_buffer("inv_freq", torch.arange(4.0), persistent=False)
+
+    def forward(self, tokens):
+        return self.head(self.proj(self.embed(tokens)) * self.inv_freq.sum())
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    model = TinyModel().eval()
+    path = tmp_path / "tiny.safetensors"
+    save_snapshot(model, path, metadata={"dtype": "float32"})
+    return model, path
+
+
+def test_round_trip_restores_weights_buffers_and_ties(snapshot):
+    model, path = snapshot
+    with torch.device("meta"):
+        skeleton = TinyModel()
+
+    load_snapshot(skeleton, path, "cpu", metadata={"dtype": "float32"})
+
+    tokens = torch.tensor([1, 2, 3])
+    assert torch.equal(skeleton(tokens), model(tokens))
+    assert skeleton.head.weight is skeleton.embed.weight
+    assert not any(t.is_meta for t in skeleton.state_dict().values())
+
+
+def test_stale_or_incomplete_snapshot_rejected(snapshot, tmp_path):
+    _, path = snapshot
+
+    with pytest.raises(SnapshotError, match="does not match"):
+        load_snapshot(TinyModel(), path, "cpu", metadata={"dtype": "bfloat16"})
+
+    class BiggerModel(TinyModel):
+        def __init__(self):
+            super().__init__()
+            self.extra = torch.nn.Linear(8, 8)
+
+    with pytest.raises(SnapshotError, match="missing 2 tensors"):
+        load_snapshot(BiggerModel(), path, "cpu")
+
+    with pytest.raises(SnapshotError, match="No snapshot"):
+        load_snapshot(TinyModel(), tmp_path / "absent.safetensors", "cpu")
+
+    assert issubclass(SnapshotError, ModelLoadError)
+
+
+def test_snapshot_path_per_device_and_dtype(tmp_path):
+    path = snapshot_path(tmp_path, "deepseek-ai/DeepSeek-OCR", "cuda", "bfloat16")
+
+    assert path == tmp_path / "deepseek-ai--DeepSeek-OCR.cuda.bfloat16.safetensors"
+
+
+def test_engine_writes_snapshot_and_falls_back_without_one(tmp_path):
+    engine = DeepSeekOCRInference(inference_mode="tiny", device="cpu", snapshot_dir=tmp_path)
+
+    assert engine._load_from_snapshot() is None
+
+    engine._save_to_snapshot(TinyModel())
+    path = engine._snapshot_file()
+    assert path.name == "deepseek-ai--DeepSeek-OCR.cpu.float32.safetensors"
+
+    skeleton = TinyModel()
+    load_snapshot(skeleton, path, "cpu", metadata=engine._snapshot_metadata())
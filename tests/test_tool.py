@@ -1,9 +1,13 @@
 """Tests for VisionDocumentTool"""
 
+import asyncio
 import pytest
 import os
+import threading
+import time
 from pathlib import Path
-from deepseek_visor_agent import VisionDocumentTool
+from deepseek_visor_agent import VisionDocumentTool, StubBackend
+from deepseek_visor_agent.tool import PAGE_SEPARATOR
 
 
 # Skip model tests in CI environment (no GPU, slow downloads)
@@ -55,3 +59,346 @@ def test_document_types(tool, document_type):
     """Test different document types"""
     # TODO: Add test fixtures
     pytest.skip(f"Requires test {document_type} image")
+
+
+INVOICE_MARKDOWN = "Invoice\nVendor: Acme Corp\nDate: 2024-01-15\nTotal: $199.00"
+
+# Cover, blank, body, the cover again and another blank page
+SCAN_PAGES = ["Cover" * 20, None, "Body" * 20, "Cover" * 20, None]
+
+
+@pytest.fixture
+def fake_tool():
+    return VisionDocumentTool(backend=StubBackend(markdown=INVOICE_MARKDOWN, max_batch_size=4))
+
+
+class TestRunStream:
+    """Page-by-page streaming with a fake inference engine"""
+
+    def test_stream_yields_each_page(self, fake_tool, make_pdf):
+        pdf_path = make_pdf(3)
+
+        pages = list(fake_tool.run_stream(pdf_path))
+
+        assert [p["page"] for p in pages] == [0, 1, 2]
+        assert all(p["document_type"] == "invoice" for p in pages)
+        assert pages[0]["fields"]["total"] == "$199.00"
+
+    def test_stream_reads_ahead_boundedly(self, fake_tool, make_pdf):
+        pdf_path = make_pdf(20)
+
+        stream = fake_tool.run_stream(pdf_path)
+        first = next(stream)
+        time.sleep(0.2)
+
+        assert first["page"] == 0
+        assert fake_tool.engine.images_processed < 20
+        stream.close()
+
+    def test_stream_reports_stage_timings(self, fake_tool, make_pdf):
+        pdf_path = make_pdf(2)
+
+        pages = list(fake_tool.run_stream(pdf_path))
+        result = fake_tool.run(pdf_path)
+
+        for page in pages:
+            assert set(page["metadata"]["stage_timings_ms"]) == {"render", "inference", "parse"}
+        assert set(result["metadata"]["stage_timings_ms"]) == {"render", "inference", "parse"}
+        assert result["metadata"]["wall_time_ms"] >= 0
+
+    def test_stream_respects_page_range(self, fake_tool, make_pdf):
+        pdf_path = make_pdf(4)
+
+        pages = list(fake_tool.run_stream(pdf_path, pdf_start_page=1, pdf_end_page=2))
+
+        assert [p["page"] for p in pages] == [1, 2]
+
+    def test_stream_batches_pages(self, fake_tool, make_pdf):
+        pdf_path = make_pdf(5)
+
+        pages = list(fake_tool.run_stream(pdf_path, pdf_batch_size=2))
+
+        assert [p["page"] for p in pages] == [0, 1, 2, 3, 4]
+        assert [p["metadata"]["batch_size"] for p in pages] == [2, 2, 2, 2, 1]
+        assert fake_tool.engine.calls == 3
+
+    def test_run_with_parallel_rendering(self, fake_tool, make_pdf):
+        pdf_path = make_pdf(4)
+
+        sequential = fake_tool.run(pdf_path)
+        parallel = fake_tool.run(pdf_path, workers=2)
+
+        assert parallel["pages"] == 4
+        assert parallel["markdown"] == sequential["markdown"]
+
+    def test_run_combines_streamed_pages(self, fake_tool, make_pdf):
+        pdf_path = make_pdf(2)
+
+        result = fake_tool.run(pdf_path)
+
+        assert result["pages"] == 2
+        assert result["markdown"].count("<--- Page Split --->") == 1
+        assert result["document_type"] == "invoice"
+        assert result["metadata"]["total_inference_time_ms"] >= 0
+        assert result["metadata"]["model"] == "stub"
+
+
+    def test_run_merges_fields_page_by_page(self, make_pdf):
+        pages = iter([
+            "INVOICE\nVendor: Acme Corp\nDate: 2024-01-15",
+            "Subtotal: $90.00\nTotal: $99.00",
+            "Grand Total: $120.00",
+        ])
+        tool = VisionDocumentTool(backend=StubBackend(markdown=lambda image: next(pages)))
+        pdf_path = make_pdf(3)
+
+        result = tool.run(pdf_path)
+
+        assert result["document_type"] == "invoice"
+        assert result["fields"]["total"] == "$120.00"
+        assert result["field_pages"]["vendor"] == [0]
+        assert result["field_pages"]["total"] == [2]
+        assert result["confidence"] == 1.0
+
+    def test_run_stops_once_fields_complete(self, fake_tool, make_pdf):
+        pdf_path = make_pdf(12)
+
+        result = fake_tool.run(pdf_path, stop_when="fields_complete")
+
+        assert result["pages"] == 1
+        assert result["fields"]["total"] == "$199.00"
+        assert result["metadata"]["stop_reason"] == "fields_complete"
+        assert result["metadata"]["pages_skipped"] == 11
+        # Only the bounded read-ahead past the stopping page reaches the model
+        assert fake_tool.engine.images_processed < 12
+
+    def test_run_stop_ignores_pages_read_ahead(self, make_pdf):
+        pages = iter([INVOICE_MARKDOWN] + [f"Grand Total: ${n}00.00" for n in range(1, 6)])
+        tool = VisionDocumentTool(backend=StubBackend(markdown=lambda image: next(pages)))
+        pdf_path = make_pdf(6)
+
+        result = tool.run(pdf_path, stop_when="fields_complete")
+
+        # Pages parsed after the stop decision never reach the merged fields
+        assert result["pages"] == 1
+        assert result["fields"]["total"] == "$199.00"
+        assert result["field_pages"]["total"] == [0]
+        assert not [t for t in threading.enumerate() if t.name.startswith("deepseek-visor-")]
+
+    def test_run_stop_waits_for_min_confidence(self, make_pdf):
+        pages = iter([
+            "INVOICE\nVendor: Acme Corp\nPayment terms: 30 days",
+            "Date: 2024-01-15\nAmount due",
+            "Total: $99.00",
+            "Appendix",
+        ])
+        tool = VisionDocumentTool(backend=StubBackend(markdown=lambda image: next(pages)))
+        pdf_path = make_pdf(4)
+
+        result = tool.run(pdf_path, stop_when="fields_complete", min_confidence=0.6)
+
+        assert result["pages"] == 2
+        assert result["metadata"]["pages_skipped"] == 2
+        assert not result["fields"].get("total")
+
+    def test_run_max_pages(self, fake_tool, make_pdf):
+        pdf_path = make_pdf(5)
+
+        result = fake_tool.run(pdf_path, pdf_start_page=1, max_pages=2)
+
+        assert result["pages"] == 2
+        assert result["metadata"]["stop_reason"] == "max_pages"
+        assert result["metadata"]["pages_skipped"] == 2
+        assert fake_tool.engine.images_processed == 2
+
+    def test_run_without_required_fields_reads_every_page(self, make_pdf):
+        tool = VisionDocumentTool(backend=StubBackend(markdown="Meeting notes"))
+        pdf_path = make_pdf(3)
+
+        result = tool.run(pdf_path, stop_when="fields_complete")
+
+        assert result["pages"] == 3
+        assert result["metadata"]["stop_reason"] is None
+        assert result["metadata"]["pages_skipped"] == 0
+
+    def test_run_rejects_unknown_stop_condition(self, fake_tool, make_pdf):
+        pdf_path = make_pdf(1)
+
+        with pytest.raises(ValueError):
+            fake_tool.run(pdf_path, stop_when="first_page")
+
+    def test_run_rejects_stop_when_without_field_extraction(self, fake_tool, make_pdf):
+        pdf_path = make_pdf(3)
+
+        with pytest.raises(ValueError, match="extract_fields"):
+            fake_tool.run(pdf_path, extract_fields=False, stop_when="fields_complete")
+        assert fake_tool.engine.images_processed == 0
+
+    def test_run_skips_blank_and_duplicate_pages(self, make_pdf):
+        pdf_path = make_pdf(SCAN_PAGES, fontsize=14)
+
+        backend = StubBackend(markdown=lambda image: f"page {backend.images_processed}")
+        tool = VisionDocumentTool(backend=backend)
+
+        result = tool.run(pdf_path, skip_pages=True)
+        pages = list(tool.run_stream(pdf_path, skip_pages=True))
+
+        assert result["pages"] == 5
+        assert result["metadata"]["blank_pages"] == [1, 4]
+        assert result["metadata"]["duplicate_pages"] == {3: 0}
+        assert result["markdown"].split(PAGE_SEPARATOR) == ["page 0", "", "page 1", "page 0", ""]
+        assert backend.images_processed == 4
+        assert pages[3]["metadata"]["skipped"] == "duplicate"
+        assert pages[3]["markdown"] == pages[0]["markdown"]
+
+
+    def test_text_layer_pages_skip_inference(self, tmp_path):
+        fitz = pytest.importorskip("fitz")
+        import io
+        from PIL import Image
+
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_text(fitz.Point(50, 50), "Vendor: Acme Corp", fontsize=12)
+        page.insert_text(fitz.Point(50, 64), "Date: 2024-01-15", fontsize=12)
+        page.insert_text(fitz.Point(50, 78), "Total: $199.00", fontsize=12)
+        scan = doc.new_page()
+        buffer = io.BytesIO()
+        Image.new("RGB", (300, 400), "white").save(buffer, format="PNG")
+        scan.insert_image(scan.rect, stream=buffer.getvalue())
+        pdf_path = tmp_path / "mixed.pdf"
+        doc.save(str(pdf_path))
+        doc.close()
+
+        backend = StubBackend(markdown="scanned page")
+        tool = VisionDocumentTool(backend=backend)
+
+        result = tool.run(pdf_path, ocr_policy="auto")
+        pages = list(tool.run_stream(pdf_path, ocr_policy="auto"))
+
+        assert backend.images_processed == 2
+        assert result["metadata"]["text_layer_pages"] == [0]
+        assert result["markdown"].split(PAGE_SEPARATOR) == [
+            "Vendor: Acme Corp\nDate: 2024-01-15\nTotal: $199.00\n", "scanned page"
+        ]
+        assert result["fields"]["total"] == "$199.00"
+        assert [p["metadata"]["source"] for p in pages] == ["text_layer", "ocr"]
+        assert pages[0]["metadata"]["inference_time_ms"] == 0
+
+    def test_invalid_ocr_policy(self, fake_tool, make_pdf):
+        pdf_path = make_pdf(1)
+
+        with pytest.raises(ValueError, match="ocr_policy"):
+            fake_tool.run(pdf_path, ocr_policy="sometimes")
+
+
+class TestArun:
+    """Asynchronous processing with a fake inference engine"""
+
+    @pytest.mark.asyncio
+    async def test_arun_pdf(self, fake_tool, make_pdf):
+        pdf_path = make_pdf(3)
+
+        result = await fake_tool.arun(pdf_path)
+
+        assert result["pages"] == 3
+        assert result["document_type"] == "invoice"
+        assert result["fields"]["total"] == "$199.00"
+        assert fake_tool.engine.images_processed == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrent_aruns_share_engine(self, fake_tool, make_pdf):
+        pdf_path = make_pdf(2)
+
+        results = await asyncio.gather(*(fake_tool.arun(pdf_path) for _ in range(3)))
+
+        assert [r["pages"] for r in results] == [2, 2, 2]
+        assert fake_tool.engine.images_processed == 6
+
+    @pytest.mark.asyncio
+    async def test_arun_stops_once_fields_complete(self, fake_tool, make_pdf):
+        pdf_path = make_pdf(12)
+
+        result = await fake_tool.arun(pdf_path, stop_when="fields_complete")
+
+        assert result["pages"] == 1
+        assert result["fields"]["total"] == "$199.00"
+        assert result["metadata"]["stop_reason"] == "fields_complete"
+        assert result["metadata"]["pages_skipped"] == 11
+        assert fake_tool.engine.images_processed < 12
+
+    @pytest.mark.asyncio
+    async def test_arun_rejects_stop_when_without_field_extraction(self, fake_tool, make_pdf):
+        pdf_path = make_pdf(3)
+
+        with pytest.raises(ValueError, match="extract_fields"):
+            await fake_tool.arun(pdf_path, extract_fields=False, stop_when="fields_complete")
+
+    @pytest.mark.asyncio
+    async def test_arun_max_pages_and_skip_pages(self, fake_tool, make_pdf):
+        pdf_path = make_pdf(SCAN_PAGES, fontsize=14)
+
+        result = await fake_tool.arun(pdf_path, max_pages=4, skip_pages=True)
+
+        assert result["pages"] == 4
+        assert result["metadata"]["stop_reason"] == "max_pages"
+        assert result["metadata"]["blank_pages"] == [1]
+        assert result["metadata"]["duplicate_pages"] == {3: 0}
+        assert fake_tool.engine.images_processed == 2
+        assert result["markdown"].split(PAGE_SEPARATOR)[3] == INVOICE_MARKDOWN
+
+    @pytest.mark.asyncio
+    async def test_arun_in_memory_documents(self, fake_tool, make_pdf):
+        import io
+        from PIL import Image
+
+        pdf_bytes = make_pdf(2).read_bytes()
+        png = io.BytesIO()
+        Image.new("RGB", (64, 32), "white").save(png, format="PNG")
+
+        pdf_result = await fake_tool.arun(pdf_bytes)
+        image_result = await fake_tool.arun(io.BytesIO(png.getvalue()))
+
+        assert pdf_result["pages"] == 2
+        assert image_result["pages"] == 1
+        assert image_result["fields"]["total"] == "$199.00"
+
+    @pytest.mark.asyncio
+    async def test_arun_missing_pdf_raises(self, fake_tool, tmp_path):
+        from deepseek_visor_agent.utils.pdf_processor import PDFProcessingError
+
+        with pytest.raises(PDFProcessingError):
+            await fake_tool.arun(tmp_path / "missing.pdf")
+
+
+class TestPreload:
+    """Model warm-up before the first request"""
+
+    def test_preload_warms_up_in_background(self):
+        tool = VisionDocumentTool(backend=StubBackend(latency_ms=20), preload=True)
+
+        report = tool.wait_until_ready(timeout=5)
+
+        assert report["modes"]["tiny"]["warmup_time_ms"] >= 20
+        assert tool.engine.calls == 1
+        assert tool.wait_until_ready() is report
+
+    def test_wait_until_ready_without_preload_warms_up_once(self):
+        tool = VisionDocumentTool(backend=StubBackend())
+
+        first = tool.wait_until_ready()
+
+        assert tool.wait_until_ready() is first
+        assert tool.engine.calls == 1
+
+    def test_preload_load_failure_is_raised(self):
+        from deepseek_visor_agent.utils.error_handler import ModelLoadError
+
+        class MissingWeightsBackend(StubBackend):
+            def _load(self):
+                raise ModelLoadError("no weights")
+
+        tool = VisionDocumentTool(backend=MissingWeightsBackend(), preload=True)
+
+        with pytest.raises(ModelLoadError, match="no weights"):
+            tool.wait_until_ready(timeout=5)
@@ -0,0 +1,128 @@
+"""Tests for the fork-after-load CPU worker pool"""
+
+import gc
+import multiprocessing
+import os
+
+import pytest
+from PIL import Image
+
+from deepseek_visor_agent import StubBackend, VisionDocumentTool
+from deepseek_visor_agent.worker_pool import WorkerPool, _split
+
+pytestmark = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="requires fork"
+)
+
+
+class LoadTrackingBackend(StubBackend):
+    """Stub recording where it was loaded; markdown reports the page width and worker process"""
+
+    def __init__(self):
+        super().__init__(markdown=lambda image: f"{image.size[0]} {os.getpid()} {_affinity()}")
+        self.loaded_in = None
+
+    def _load(self):
+        self.loaded_in = os.getpid()
+
+
+def _affinity():
+    return sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(LoadTrackingBackend(), workers=2, threads_per_worker=1)
+    yield pool
+    pool.close()
+
+
+def test_split_is_contiguous_and_balanced():
+    assert _split(list(range(7)), 3) == [[0, 1, 2], [3, 4], [5, 6]]
+    assert _split([0], 1) == [[0]]
+
+
+def test_pages_are_spread_over_workers_in_order(pool):
+    images = [Image.new("RGB", (20 + i, 20), "white") for i in range(6)]
+
+    results = pool.infer_batch(images, batch_size=2)
+
+    assert [int(r["markdown"].split()[0]) for r in results] == [20, 21, 22, 23, 24, 25]
+    # One slice of three pages per worker, each run in batches of two
+    assert [r["metadata"]["batch_size"] for r in results] == [2, 2, 1, 2, 2, 1]
+    assert {r["metadata"]["worker"] for r in results} <= {0, 1}
+    assert str(os.getpid()) not in {r["markdown"].split()[1] for r in results}
+
+
+def test_model_is_loaded_and_workers_forked_by_constructor():
+    children = len(multiprocessing.active_children())
+
+    with WorkerPool(LoadTrackingBackend(), workers=2, threads_per_worker=1) as pool:
+        # Forked from this thread, before any call could come from another one
+        assert len(multiprocessing.active_children()) == children + 2
+        assert pool.engine.loaded_in == os.getpid()
+        assert pool.stats()["started"]
+
+    assert not pool.stats()["started"]
+    with pytest.raises(RuntimeError, match="closed"):
+        pool.infer(Image.new("RGB", (20, 20), "white"))
+
+
+def test_heap_stays_frozen_while_any_pool_is_open():
+    first = WorkerPool(StubBackend(), workers=1)
+    second = WorkerPool(StubBackend(), workers=1)
+
+    first.close()
+    assert gc.get_freeze_count() > 0
+    second.close()
+    assert gc.get_freeze_count() == 0
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_getaffinity"), reason="requires sched_getaffinity")
+def test_workers_are_pinned_to_their_cores(pool):
+    results = pool.infer_batch([Image.new("RGB", (20, 20), "white")] * 4, batch_size=1)
+
+    for result in results:
+        affinity = result["markdown"].split(" ", 2)[2]
+        assert affinity == str(pool.core_groups[result["metadata"]["worker"]])
+
+
+def test_run_documents_in_workers(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"page{i}.png"
+        Image.new("RGB", (100, 100 + i), "white").save(path)
+        paths.append(path)
+
+    with WorkerPool(StubBackend(), workers=2) as pool:
+        results = pool.run_documents(paths, document_type="invoice")
+
+    assert [r["document_type"] for r in results] == ["invoice"] * 3
+    assert {r["metadata"]["worker"] for r in results} <= {0, 1}
+
+
+def test_pool_as_tool_backend(tmp_path):
+    path = tmp_path / "page.png"
+    Image.new("RGB", (100, 100), "white").save(path)
+
+    with WorkerPool(StubBackend(), workers=2) as pool:
+        result = VisionDocumentTool(backend=pool).run(path)
+
+    assert result["metadata"]["worker"] in (0, 1)
+
+
+def test_gpu_engines_are_rejected():
+    engine = StubBackend()
+    engine.config["device"] = "cuda"
+
+    with pytest.raises(ValueError, match="cuda"):
+        WorkerPool(engine)
+
+
+def test_warmup_runs_in_workers(pool):
+    report = pool.warmup()
+
+    assert "warmup_time_ms" in report["modes"]["tiny"]
+    assert pool.engine.loaded_in == os.getpid()
+    # Warm-up calls ran in the workers, not in the parent's engine
+    assert pool.engine.calls == 0